@@ -1,84 +1,343 @@
-from flask import Flask, render_template, request, jsonify
+import time
+
+# Taken before the framework imports so the startup report covers them
+BOOT_STARTED = time.perf_counter()
+
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, g, send_file
 from flask_cors import CORS
 from flask_mail import Mail
-import pandas as pd
+from functools import wraps
 import sys
 import os
+import hmac
+import math
 import json
+import signal
+import threading
 from datetime import datetime
 
 # Add the project root to the path
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from src.recommender.content_based import ContentBasedRecommender
+from src.catalog import CatalogReloader
+from src.compact import to_records, widen
+from src.itinerary.optimizer import validate_limits
+from src.itinerary.routing import START_LOCATIONS
+from src.search.inverted_index import tokenize
 from src.models import db, UserPreference, Lead, ConversionRequest, Analytics
+from src.database import configure_database, install_query_spans
 from src.email_service import (
     send_itinerary_email, send_expert_consultation_notification,
     send_quote_request_notification, send_confirmation_email
 )
+from src.export import (
+    EXPORT_FORMATS, LEAD_EXPORT_COLUMNS, ANALYTICS_EXPORT_COLUMNS, stream_export
+)
+from src.utils.timing import PhaseTimer
+from src.utils.singleflight import SingleFlight
+from src.admission import (
+    AdmissionController, MemoryStore, FileStore, client_address, parse_costs, MESSAGES as SHED_MESSAGES, RATE_LIMITED
+)
+from src.observability.metrics import REGISTRY as metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE, observe_cache
+from src.observability.profiling import RequestProfiler, SORT_KEYS as PROFILE_SORT_KEYS
+from src.observability import tracing
+from src.recommender.content_based import RECOMMENDER_SECONDS
 from config import config
 
+startup_timer = PhaseTimer()
+startup_timer.record('imports', time.perf_counter() - BOOT_STARTED)
+
 app = Flask(__name__)
 CORS(app)
 
-# Load configuration
-config_name = os.environ.get('FLASK_ENV', 'development')
-app.config.from_object(config[config_name])
+with startup_timer.phase('config'):
+    # Load configuration (FLASK_-prefixed environment variables override config.py)
+    config_name = os.environ.get('FLASK_ENV', 'development')
+    app.config.from_object(config[config_name])
+    app.config.from_prefixed_env()
+    
+    # Initialize extensions
+    configure_database(app, db)
+    mail = Mail(app)
+    
+    # METRICS_DIR: shared directory that merges metrics across gunicorn workers
+    metrics.configure(app.config.get('METRICS_DIR'), float(app.config.get('METRICS_FLUSH_INTERVAL', 5)))
+    
+    # TRACE_EXPORTER: 'json' (lines to TRACE_FILE, or stderr) or 'otlp-file' (TRACE_FILE)
+    tracing.configure(app.config.get('TRACE_EXPORTER') or None, app.config.get('TRACE_FILE'))
+    if tracing.enabled():
+        with app.app_context():
+            for engine in db.engines.values():
+                install_query_spans(engine)
+
+# Catalog, model and indexes live in an immutable snapshot that reloads swap out
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_PATH = app.config.get('CATALOG_PATH') or os.path.join(BASE_DIR, 'data', 'processed', 'attractions.csv')
+ARTIFACT_DIR = app.config.get('RECOMMENDER_ARTIFACT_DIR') or os.path.join(BASE_DIR, 'data', 'artifacts', 'recommender')
+COLUMNAR_DIR = app.config.get('CATALOG_COLUMNAR_DIR') or os.path.join(BASE_DIR, 'data', 'columnar', 'attractions')
 
-# Initialize extensions
-db.init_app(app)
-mail = Mail(app)
+# Fast startup: serve as soon as the catalog, model and database tables are
+# ready, and build the search/geo indexes in the background afterwards.
+# Tables are never deferred: the first write could otherwise reach a table
+# that does not exist yet.
+FAST_STARTUP = bool(app.config.get('FAST_STARTUP', False))
 
-# Global variables
-attractions_df = None
-recommender = None
+catalog = CatalogReloader(DATA_PATH, artifact_dir=ARTIFACT_DIR, columnar_dir=COLUMNAR_DIR)
 
 
 def initialize_system():
-    global attractions_df, recommender
-    import os
-    import pandas as pd
+    """Load the catalog and install the reload triggers (SIGHUP, mtime polling)."""
+    if not catalog.load(defer=FAST_STARTUP, timer=startup_timer):
+        print(f"ERROR: {catalog.last_error}. The API will not work until the catalog loads.")
 
-    # Determine absolute path relative to this file
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(BASE_DIR, 'data', 'processed', 'attractions.csv')
+    # SIGHUP reloads in the background; handlers can only be set from the main thread
+    if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGHUP, lambda signum, frame: catalog.reload())
 
-    print("===== DEBUG =====")
-    print("BASE_DIR:", BASE_DIR)
-    print("Looking for CSV at:", data_path)
-    print("Exists?", os.path.exists(data_path))
+    poll_interval = float(app.config.get('CATALOG_POLL_INTERVAL', 0) or 0)
+    if poll_interval > 0:
+        catalog.watch(poll_interval)
 
-    # List directories for debugging
-    try:
-        print("Contents of BASE_DIR:", os.listdir(BASE_DIR))
-        if os.path.exists(os.path.join(BASE_DIR, 'data')):
-            print("Contents of data folder:", os.listdir(os.path.join(BASE_DIR, 'data')))
-        if os.path.exists(os.path.join(BASE_DIR, 'data', 'processed')):
-            print("Contents of processed folder:", os.listdir(os.path.join(BASE_DIR, 'data', 'processed')))
-    except Exception as e:
-        print("Error listing directories:", e)
 
-    # If CSV not found, fail gracefully
-    if not os.path.exists(data_path):
-        print("ERROR: CSV file not found! The API will not work.")
-        attractions_df = None
-        return
+def current_catalog():
+    """
+    The catalog snapshot for this request.
 
-    try:
-        attractions_df = pd.read_csv(data_path)
-        print(f"Loaded {len(attractions_df)} attractions")
-    except Exception as e:
-        print("ERROR reading CSV:", e)
-        attractions_df = None
+    The snapshot is pinned on first use, so a reload that lands mid-request
+    does not mix data from two catalog versions in one response.
+    """
+    if 'catalog' not in g:
+        g.catalog = catalog.current()
+    if g.catalog is None:
+        raise RuntimeError('Catalog is not loaded')
+    return g.catalog
+
+
+@app.after_request
+def add_catalog_version(response):
+    snapshot = g.get('catalog')
+    if snapshot is not None:
+        response.headers['X-Catalog-Version'] = snapshot.version
+    return response
+
+
+HTTP_REQUESTS = metrics.counter(
+    'http_requests_total', 'HTTP requests by endpoint, method and status', ('endpoint', 'method', 'status')
+)
+HTTP_LATENCY = metrics.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by endpoint', ('endpoint', 'method')
+)
+HTTP_IN_FLIGHT = metrics.gauge(
+    'http_requests_in_flight', 'Requests currently being handled', ('endpoint',)
+)
+CACHE_REQUESTS = metrics.counter(
+    'cache_requests_total', 'Cache lookups by cache and result (hit or miss)', ('cache', 'result')
+)
+SHED_REQUESTS = metrics.counter(
+    'shed_requests_total', 'Requests rejected before running by endpoint and reason', ('endpoint', 'reason')
+)
+COALESCED_REQUESTS = metrics.counter(
+    'coalesced_requests_total', 'Coalesced requests by endpoint and result (computed or shared)', ('endpoint', 'result')
+)
+
+
+@app.before_request
+def start_request_metrics():
+    metrics.start()
+    endpoint = request.endpoint or 'unmatched'
+    g.metrics_request = (time.perf_counter(), endpoint, request.method)
+    HTTP_IN_FLIGHT.inc(endpoint=endpoint)
+
+
+@app.after_request
+def record_response_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    started = g.pop('metrics_request', None)
+    if started is None:
         return
+    started, endpoint, method = started
+    # Teardown also runs for unhandled exceptions, which become 500s
+    HTTP_IN_FLIGHT.dec(endpoint=endpoint)
+    HTTP_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, method=method)
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=method, status=g.get('metrics_status', 500))
 
-    try:
-        recommender = ContentBasedRecommender()
-        recommender.fit(attractions_df)
-        print("Model ready!")
-    except Exception as e:
-        print("ERROR initializing recommender:", e)
-        recommender = None
+
+# Each request is the root span of a trace; nothing is installed with tracing off
+if tracing.enabled():
+    @app.before_request
+    def start_request_span():
+        g.trace_span = tracing.start_span(
+            'http.request', kind=tracing.KIND_SERVER,
+            **{'http.method': request.method, 'http.route': request.url_rule.rule if request.url_rule else None,
+               'endpoint': request.endpoint}
+        )
+
+    @app.after_request
+    def add_trace_id(response):
+        trace_span = g.get('trace_span')
+        if trace_span is not None:
+            response.headers['X-Trace-Id'] = trace_span.trace_id
+        return response
+
+    @app.teardown_request
+    def end_request_span(exc):
+        trace_span = g.pop('trace_span', None)
+        if trace_span is not None:
+            trace_span.set(**{'http.status_code': g.get('metrics_status', 500)})
+            trace_span.end(exc)
+
+
+def collect_cache_metrics():
+    snapshot = catalog.current()
+    if snapshot is not None:
+        observe_cache(CACHE_REQUESTS, 'route_plans', snapshot.route_planner.cache)
+        observe_cache(CACHE_REQUESTS, 'itinerary_solutions', snapshot.itinerary_optimizer.cache)
+
+
+metrics.add_collector(collect_cache_metrics)
+
+
+# Identical recommendation requests in flight at the same time share one computation
+inflight = SingleFlight()
+
+
+def coalesced(key, build):
+    """
+    Response of build(), computed once for identical concurrent requests.
+    
+    Requests with the same key (which must include the catalog version)
+    arriving while another one computes it wait and reuse its body and
+    status, or re-raise its exception. Each still gets its own response
+    object, so per-request headers are unaffected.
+    """
+    def run():
+        response = app.make_response(build())
+        return response.get_data(), response.status_code
+    
+    (body, status), shared = inflight.do(key, run)
+    COALESCED_REQUESTS.inc(endpoint=request.endpoint, result='shared' if shared else 'computed')
+    return app.response_class(body, status=status, mimetype=app.json.mimetype)
+
+
+def has_admin_token():
+    """Whether the request's X-Admin-Token header matches ADMIN_TOKEN (never, if it is unset)."""
+    token = app.config.get('ADMIN_TOKEN')
+    supplied = request.headers.get('X-Admin-Token', '')
+    return bool(token) and hmac.compare_digest(supplied.encode(), str(token).encode())
+
+
+def require_admin(view):
+    """Reject requests without a matching X-Admin-Token header (403 if ADMIN_TOKEN is unset)."""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not has_admin_token():
+            return jsonify({
+                'success': False,
+                'error': 'Admin token required'
+            }), 403
+        return view(*args, **kwargs)
+    return wrapped
+
+
+def client_key():
+    """Identity that rate limits apply to: the client's IP address (see RATE_LIMIT_PROXY_HEADER)."""
+    return client_address(request.remote_addr, request.headers, RATE_LIMIT_PROXY_HEADER)
+
+
+def shed_response(status, retry_after):
+    response = jsonify({
+        'success': False,
+        'error': SHED_MESSAGES[status]
+    })
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+# Admission control: per-client token buckets refilled at RATE_LIMIT_RATE
+# tokens/s up to RATE_LIMIT_BURST, where heavy endpoints cost more
+# (RATE_LIMIT_COSTS), and at most MAX_CONCURRENT_REQUESTS in flight. With
+# RATE_LIMIT_FILE the limits hold across all workers; with both limits off
+# no hooks are installed. Clients are told apart by IP address, taken from
+# RATE_LIMIT_PROXY_HEADER only when a trusted proxy sets it.
+RATE_LIMIT_PROXY_HEADER = app.config.get('RATE_LIMIT_PROXY_HEADER')
+RATE_LIMIT_RATE = float(app.config.get('RATE_LIMIT_RATE', 0) or 0)
+MAX_CONCURRENT_REQUESTS = int(app.config.get('MAX_CONCURRENT_REQUESTS', 0) or 0)
+admission = None
+if RATE_LIMIT_RATE > 0 or MAX_CONCURRENT_REQUESTS > 0:
+    RATE_LIMIT_FILE = app.config.get('RATE_LIMIT_FILE')
+    admission = AdmissionController(
+        FileStore(RATE_LIMIT_FILE, slots=int(app.config.get('RATE_LIMIT_SLOTS', 65536))) if RATE_LIMIT_FILE else MemoryStore(),
+        rate=RATE_LIMIT_RATE,
+        burst=float(app.config.get('RATE_LIMIT_BURST', 0) or 0),
+        costs=parse_costs(app.config.get('RATE_LIMIT_COSTS')),
+        max_concurrent=MAX_CONCURRENT_REQUESTS
+    )
+    
+    @app.before_request
+    def admit_request():
+        endpoint = request.endpoint or 'unmatched'
+        status, retry_after = admission.enter(client_key(), endpoint)
+        if status is None:
+            g.admitted_endpoint = endpoint
+            return None
+        SHED_REQUESTS.inc(endpoint=endpoint, reason='rate_limited' if status == RATE_LIMITED else 'overloaded')
+        return shed_response(status, retry_after)
+    
+    @app.teardown_request
+    def release_admission(exc):
+        endpoint = g.pop('admitted_endpoint', None)
+        if endpoint is not None:
+            admission.leave(endpoint)
+
+
+# Opt-in request profiling: an admin request with "X-Profile: 1", or a
+# PROFILE_SAMPLE_RATE share of requests (optionally only PROFILE_ENDPOINTS).
+# Without PROFILE_DIR no hooks are installed, so requests pay nothing.
+PROFILE_DIR = app.config.get('PROFILE_DIR')
+profiler = None
+if PROFILE_DIR:
+    profiler = RequestProfiler(
+        PROFILE_DIR,
+        sample_rate=float(app.config.get('PROFILE_SAMPLE_RATE', 0) or 0),
+        keep=int(app.config.get('PROFILE_KEEP', 100))
+    )
+    PROFILE_ENDPOINTS = {name.strip() for name in str(app.config.get('PROFILE_ENDPOINTS', '')).split(',') if name.strip()}
+
+    @app.before_request
+    def start_profile():
+        forced = request.headers.get('X-Profile') == '1' and has_admin_token()
+        if not forced and PROFILE_ENDPOINTS and request.endpoint not in PROFILE_ENDPOINTS:
+            return
+        handle = profiler.start(forced)
+        if handle is not None:
+            g.profile = handle
+
+    def finish_profile(status):
+        handle = g.pop('profile', None)
+        if handle is None:
+            return None
+        return profiler.finish(
+            handle, endpoint=request.endpoint, method=request.method,
+            path=request.full_path.rstrip('?'), status=status
+        )
+
+    @app.after_request
+    def save_profile(response):
+        profile_id = finish_profile(response.status_code)
+        if profile_id is not None:
+            response.headers['X-Profile-Id'] = profile_id
+        return response
+
+    @app.teardown_request
+    def save_failed_profile(exc):
+        # after_request is skipped when a view raises
+        finish_profile(500)
 
 
 # Initialize database
@@ -89,10 +348,22 @@ def init_db():
         print("Database initialized!")
 
 
+def finish_deferred_startup():
+    """Build the indexes FAST_STARTUP skipped; runs on a background thread."""
+    snapshot = catalog.current()
+    if snapshot is not None:
+        with startup_timer.phase('deferred_indexes'):
+            snapshot.warm()
+
+
 # Initialize the system immediately when the module is loaded
 # This ensures data loads both in development and production (Gunicorn)
 initialize_system()
-init_db()
+with startup_timer.phase('database'):
+    init_db()
+if FAST_STARTUP:
+    threading.Thread(target=finish_deferred_startup, name='deferred-startup', daemon=True).start()
+print(f"Startup: {startup_timer.summary()}")
 
 
 @app.route('/')
@@ -105,6 +376,8 @@ def home():
 def get_all_attractions():
     """Get all attractions with optional filters."""
     try:
+        attractions_df = current_catalog().attractions_df
+        
         df = attractions_df.copy()
         
         # Apply filters if provided
@@ -128,7 +401,7 @@ def get_all_attractions():
         return jsonify({
             'success': True,
             'count': len(df),
-            'attractions': df.to_dict('records')
+            'attractions': to_records(df)
         })
     
     except Exception as e:
@@ -143,6 +416,8 @@ def get_all_attractions():
 def get_attraction(attraction_id):
     """Get details of a specific attraction."""
     try:
+        attractions_df = current_catalog().attractions_df
+        
         attraction = attractions_df[attractions_df['attraction_id'] == attraction_id]
         
         if len(attraction) == 0:
@@ -153,7 +428,7 @@ def get_attraction(attraction_id):
         
         return jsonify({
             'success': True,
-            'attraction': attraction.iloc[0].to_dict()
+            'attraction': to_records(attraction)[0]
         })
     
     except Exception as e:
@@ -164,32 +439,241 @@ def get_attraction(attraction_id):
         }), 500
 
 
-@app.route('/api/recommend/similar/<int:attraction_id>', methods=['GET'])
-def recommend_similar(attraction_id):
-    """Get recommendations similar to a specific attraction."""
+@app.route('/api/search', methods=['GET'])
+def search_attractions():
+    """Full-text search over attraction names, descriptions, categories and regions."""
     try:
-        top_n = request.args.get('top_n', default=5, type=int)
+        snapshot = current_catalog()
+        attractions_df = snapshot.attractions_df
         
-        # Get recommendations
-        recommendations = recommender.recommend(
-            attraction_id=attraction_id,
-            top_n=top_n
-        )
+        query = (request.args.get('q') or '').strip()
+        limit = request.args.get('limit', default=10, type=int)
+        fuzzy = request.args.get('fuzzy', default=0, type=int)
+        
+        if not query:
+            return jsonify({
+                'success': False,
+                'error': 'Query parameter q is required'
+            }), 400
         
-        # Get original attraction
-        original = attractions_df[attractions_df['attraction_id'] == attraction_id].iloc[0]
+        terms = tokenize(query)
+        corrections = {}
+        if fuzzy:
+            # Swap misspelled terms for their closest indexed terms
+            terms, corrections = snapshot.fuzzy_matcher.correct(terms)
+        
+        positions, scores = snapshot.search_index.search(query, limit=max(1, limit), terms=terms)
+        
+        results = attractions_df.iloc[positions].copy()
+        results['score'] = scores.astype(float).round(4)
+        
+        response = {
+            'success': True,
+            'query': query,
+            'count': len(results),
+            'results': to_records(results)
+        }
+        if fuzzy:
+            response['corrections'] = corrections
+        
+        return jsonify(response)
+    
+    except Exception as e:
+        print(f"Error in search_attractions: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/autocomplete', methods=['GET'])
+def autocomplete():
+    """Type-ahead suggestions for attraction and region names."""
+    try:
+        snapshot = current_catalog()
+        
+        prefix = request.args.get('q', '')
+        limit = request.args.get('limit', default=8, type=int)
+        
+        suggestions = snapshot.autocomplete_index.suggest(prefix, limit=max(1, limit))
         
         return jsonify({
             'success': True,
-            'original': {
-                'id': int(original['attraction_id']),
-                'name': original['name'],
-                'category': original['category'],
-                'region': original['region']
+            'query': prefix,
+            'suggestions': suggestions
+        })
+    
+    except Exception as e:
+        print(f"Error in autocomplete: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _resolve_location(snapshot, args):
+    """
+    Resolve the query point of a nearby search.
+    
+    Accepts lat/lon, an attraction_id, or near=<attraction, region or town name>.
+    Returns (latitude, longitude, label, excluded positions).
+    """
+    attractions_df = snapshot.attractions_df
+    
+    if args.get('lat') is not None and args.get('lon') is not None:
+        try:
+            latitude, longitude = float(args['lat']), float(args['lon'])
+        except ValueError:
+            raise ValueError('lat and lon must be numbers') from None
+        if not (math.isfinite(latitude) and math.isfinite(longitude)):
+            raise ValueError('lat and lon must be numbers')
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError('lat must be between -90 and 90, and lon between -180 and 180')
+        return latitude, longitude, 'coordinates', []
+    
+    attraction_id = args.get('attraction_id', type=int)
+    if attraction_id is not None:
+        matches = attractions_df.index[attractions_df['attraction_id'] == attraction_id]
+        if len(matches) == 0:
+            raise LookupError('Attraction not found')
+        position = attractions_df.index.get_loc(matches[0])
+        latitude, longitude = snapshot.spatial_index.location(position)
+        return latitude, longitude, attractions_df.iloc[position]['name'], [position]
+    
+    near = (args.get('near') or '').strip()
+    if not near:
+        raise ValueError('Provide lat and lon, attraction_id or near')
+    
+    by_name = attractions_df[attractions_df['name'].str.lower() == near.lower()]
+    if len(by_name):
+        position = attractions_df.index.get_loc(by_name.index[0])
+        latitude, longitude = snapshot.spatial_index.location(position)
+        return latitude, longitude, by_name.iloc[0]['name'], [position]
+    
+    region = START_LOCATIONS.get(near.title(), near)
+    in_region = attractions_df[attractions_df['region'].str.lower() == region.lower()]
+    if len(in_region) == 0:
+        raise LookupError(f"Unknown location: {near}")
+    return float(in_region['latitude'].mean()), float(in_region['longitude'].mean()), in_region.iloc[0]['region'], []
+
+
+def _nearby_suggestions(snapshot, itinerary, attraction_ids, k=3):
+    """Closest unselected attractions to the last scheduled stop."""
+    attractions_df = snapshot.attractions_df
+    stops = [day['attraction']['id'] for day in itinerary if day['attraction']]
+    if not stops:
+        return []
+    
+    position = attractions_df.index.get_loc(
+        attractions_df.index[attractions_df['attraction_id'] == stops[-1]][0]
+    )
+    selected = attractions_df.index[attractions_df['attraction_id'].isin(attraction_ids)]
+    exclude = [attractions_df.index.get_loc(i) for i in selected]
+    
+    latitude, longitude = snapshot.spatial_index.location(position)
+    positions, distances = snapshot.spatial_index.nearest(latitude, longitude, k=k, exclude=exclude)
+    
+    return [
+        {
+            'id': int(attractions_df.iloc[p]['attraction_id']),
+            'name': attractions_df.iloc[p]['name'],
+            'region': attractions_df.iloc[p]['region'],
+            'distance_km': round(float(d), 2)
+        }
+        for p, d in zip(positions, distances)
+    ]
+
+
+@app.route('/api/attractions/nearby', methods=['GET'])
+def get_nearby_attractions():
+    """Find attractions near a point, an attraction, or a named place."""
+    try:
+        snapshot = current_catalog()
+        attractions_df = snapshot.attractions_df
+        
+        if snapshot.spatial_index is None:
+            return jsonify({
+                'success': False,
+                'error': 'Attraction coordinates are not available'
+            }), 503
+        
+        k = request.args.get('k', type=int)
+        radius_km = request.args.get('radius_km', type=float)
+        
+        latitude, longitude, label, exclude = _resolve_location(snapshot, request.args)
+        
+        if radius_km is not None and k is None:
+            positions, distances = snapshot.spatial_index.within(latitude, longitude, radius_km, exclude=exclude)
+        else:
+            positions, distances = snapshot.spatial_index.nearest(
+                latitude, longitude, k=k or 10, radius_km=radius_km, exclude=exclude
+            )
+        
+        nearby = attractions_df.iloc[positions].copy()
+        nearby['distance_km'] = distances.round(2)
+        
+        return jsonify({
+            'success': True,
+            'origin': {
+                'label': label,
+                'latitude': latitude,
+                'longitude': longitude
             },
-            'recommendations': recommendations.to_dict('records')
+            'count': len(nearby),
+            'attractions': to_records(nearby)
         })
     
+    except LookupError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        print(f"Error in get_nearby_attractions: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/recommend/similar/<int:attraction_id>', methods=['GET'])
+def recommend_similar(attraction_id):
+    """Get recommendations similar to a specific attraction."""
+    try:
+        snapshot = current_catalog()
+        attractions_df = snapshot.attractions_df
+        
+        top_n = request.args.get('top_n', default=5, type=int)
+        
+        def build():
+            # Get recommendations
+            recommendations = snapshot.recommender.recommend(
+                attraction_id=attraction_id,
+                top_n=top_n
+            )
+            
+            # Get original attraction
+            original = attractions_df[attractions_df['attraction_id'] == attraction_id].iloc[0]
+            
+            with RECOMMENDER_SECONDS.time(operation='serialize'):
+                return jsonify({
+                    'success': True,
+                    'original': {
+                        'id': int(original['attraction_id']),
+                        'name': original['name'],
+                        'category': original['category'],
+                        'region': original['region']
+                    },
+                    'recommendations': to_records(recommendations)
+                })
+        
+        return coalesced(('recommend_similar', snapshot.version, attraction_id, top_n), build)
+    
     except ValueError as e:
         print(f"ValueError in recommend_similar: {e}")
         return jsonify({
@@ -208,25 +692,32 @@ def recommend_similar(attraction_id):
 def recommend_by_preferences():
     """Get recommendations based on user preferences."""
     try:
+        snapshot = current_catalog()
+        
         data = request.get_json()
         
-        category = data.get('category')
-        max_cost = data.get('max_cost')
-        difficulty = data.get('difficulty')
+        category = data.get('category') or None
+        max_cost = data.get('max_cost') or None
+        difficulty = data.get('difficulty') or None
         top_n = data.get('top_n', 10)
         
-        recommendations = recommender.recommend_by_preferences(
-            preferred_category=category if category else None,
-            max_cost=max_cost if max_cost else None,
-            difficulty=difficulty if difficulty else None,
-            top_n=top_n
-        )
+        def build():
+            recommendations = snapshot.recommender.recommend_by_preferences(
+                preferred_category=category,
+                max_cost=max_cost,
+                difficulty=difficulty,
+                top_n=top_n
+            )
+            
+            with RECOMMENDER_SECONDS.time(operation='serialize'):
+                return jsonify({
+                    'success': True,
+                    'count': len(recommendations),
+                    'recommendations': to_records(recommendations)
+                })
         
-        return jsonify({
-            'success': True,
-            'count': len(recommendations),
-            'recommendations': recommendations.to_dict('records')
-        })
+        key = json.dumps([category, max_cost, difficulty, top_n], default=str)
+        return coalesced(('recommend_by_preferences', snapshot.version, key), build)
     
     except Exception as e:
         print(f"Error in recommend_by_preferences: {e}")
@@ -240,11 +731,13 @@ def recommend_by_preferences():
 def get_stats():
     """Get overall statistics."""
     try:
+        attractions_df = current_catalog().attractions_df
+        
         stats = {
             'total_attractions': int(len(attractions_df)),
             'categories': {k: int(v) for k, v in attractions_df['category'].value_counts().to_dict().items()},
             'regions': {k: int(v) for k, v in attractions_df['region'].value_counts().to_dict().items()},
-            'avg_rating': float(attractions_df['rating'].mean()),
+            'avg_rating': float(widen(attractions_df['rating']).mean()),
             'avg_cost': float(attractions_df['avg_cost_usd'].mean()),
             'cost_range': {
                 'min': float(attractions_df['avg_cost_usd'].min()),
@@ -265,10 +758,121 @@ def get_stats():
         }), 500
 
 
+@app.route('/api/catalog', methods=['GET'])
+def get_catalog_version():
+    """Version of the catalog snapshot currently serving, and reload status."""
+    snapshot = catalog.current()
+    return jsonify({
+        'success': snapshot is not None,
+        'catalog': snapshot.info() if snapshot is not None else None,
+        'reloading': catalog.reloading,
+        'last_error': catalog.last_error,
+        'startup': startup_timer.report()
+    }), 200 if snapshot is not None else 503
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, recommender and cache metrics in the Prometheus text format."""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+@app.route('/api/admin/profiles', methods=['GET'])
+@require_admin
+def list_profiles():
+    """Most recent request profiles, newest first (?limit=N, default 50)."""
+    if profiler is None:
+        return jsonify({
+            'success': False,
+            'error': 'Profiling is disabled (set PROFILE_DIR)'
+        }), 404
+    
+    profiles = profiler.list(limit=request.args.get('limit', default=50, type=int))
+    return jsonify({
+        'success': True,
+        'count': len(profiles),
+        'profiles': profiles
+    })
+
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+@require_admin
+def get_profile(profile_id):
+    """
+    One saved profile: a pstats report as JSON, or with ?format=pstats the
+    raw cProfile file (for snakeviz, pstats, etc.).
+    """
+    path = profiler.path(profile_id) if profiler is not None else None
+    if path is None:
+        return jsonify({
+            'success': False,
+            'error': 'Profile not found'
+        }), 404
+    
+    if request.args.get('format') == 'pstats':
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                         download_name=os.path.basename(path))
+    
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in PROFILE_SORT_KEYS:
+        return jsonify({
+            'success': False,
+            'error': f"sort must be one of {', '.join(PROFILE_SORT_KEYS)}"
+        }), 400
+    
+    metadata, report = profiler.summary(profile_id, sort=sort)
+    return jsonify({
+        'success': True,
+        'profile': metadata,
+        'report': report
+    })
+
+
+@app.route('/api/admin/catalog/reload', methods=['POST'])
+@require_admin
+def reload_catalog():
+    """
+    Rebuild the catalog snapshot in the background and swap it in.
+    
+    Body (optional): {"force": bool, "wait": bool}. Requests keep being served
+    from the previous snapshot while the rebuild runs; with wait, the response
+    is sent once the rebuild has finished.
+    """
+    data = request.get_json(silent=True) or {}
+    previous = catalog.current()
+    
+    thread = catalog.reload(force=bool(data.get('force', False)))
+    if thread is None:
+        return jsonify({
+            'success': False,
+            'error': 'A reload is already in progress'
+        }), 409
+    
+    if not data.get('wait', False):
+        return jsonify({
+            'success': True,
+            'reloading': True,
+            'previous_version': previous.version if previous is not None else None
+        }), 202
+    
+    thread.join()
+    snapshot = catalog.current()
+    return jsonify({
+        'success': catalog.last_error is None,
+        'reloaded': snapshot is not previous,
+        'previous_version': previous.version if previous is not None else None,
+        'catalog': snapshot.info() if snapshot is not None else None,
+        'error': catalog.last_error
+    }), 200 if catalog.last_error is None else 500
+
+
 @app.route('/api/recommend/explain', methods=['POST'])
 def explain_recommendation():
     """Explain why a recommendation was made based on user preferences."""
     try:
+        snapshot = current_catalog()
+        attractions_df = snapshot.attractions_df
+        
         data = request.get_json()
         attraction_id = data.get('attraction_id')
         user_preferences = data.get('preferences', {})
@@ -279,175 +883,218 @@ def explain_recommendation():
                 'error': 'attraction_id is required'
             }), 400
         
-        attraction = attractions_df[attractions_df['attraction_id'] == attraction_id]
-        if len(attraction) == 0:
+        def build():
+            attraction = attractions_df[attractions_df['attraction_id'] == attraction_id]
+            if len(attraction) == 0:
+                return jsonify({
+                    'success': False,
+                    'error': 'Attraction not found'
+                }), 404
+            
+            attraction = attraction.iloc[0]
+            explanations = []
+            
+            # Check category match
+            if user_preferences.get('category'):
+                if attraction['category'] == user_preferences['category']:
+                    explanations.append(f"Matches your interest in {attraction['category']}")
+            
+            # Check budget match
+            if user_preferences.get('max_cost'):
+                if attraction['avg_cost_usd'] <= user_preferences['max_cost']:
+                    explanations.append(f"Fits your budget (${attraction['avg_cost_usd']} < ${user_preferences['max_cost']})")
+                else:
+                    explanations.append(f"Above budget but highly rated option")
+            
+            # Check difficulty match
+            if user_preferences.get('difficulty'):
+                if attraction['difficulty'] == user_preferences['difficulty']:
+                    explanations.append(f"Matches your preferred difficulty level ({attraction['difficulty']})")
+            
+            # Rating explanation
+            if attraction['rating'] >= 4.0:
+                explanations.append(f"Highly rated ({attraction['rating']}/5.0) with {attraction['num_reviews']} reviews")
+            
+            # Season explanation
+            explanations.append(f"Best visited in {attraction['best_season']}")
+            
+            # Default explanation if no specific matches
+            if not explanations:
+                explanations.append("Popular destination with good ratings")
+            
             return jsonify({
-                'success': False,
-                'error': 'Attraction not found'
-            }), 404
-        
-        attraction = attraction.iloc[0]
-        explanations = []
+                'success': True,
+                'explanations': explanations,
+                'attraction': {
+                    'name': attraction['name'],
+                    'category': attraction['category'],
+                    'region': attraction['region']
+                }
+            })
         
-        # Check category match
-        if user_preferences.get('category'):
-            if attraction['category'] == user_preferences['category']:
-                explanations.append(f"Matches your interest in {attraction['category']}")
+        # Only the preferences the explanation reads are part of the key
+        key = json.dumps([attraction_id] + [user_preferences.get(name) for name in ('category', 'max_cost', 'difficulty')], default=str)
+        return coalesced(('explain_recommendation', snapshot.version, key), build)
+    
+    except Exception as e:
+        print(f"Error in explain_recommendation: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/itinerary/generate', methods=['POST'])
+def generate_itinerary():
+    """Generate a multi-day itinerary from selected attractions."""
+    try:
+        snapshot = current_catalog()
         
-        # Check budget match
-        if user_preferences.get('max_cost'):
-            if attraction['avg_cost_usd'] <= user_preferences['max_cost']:
-                explanations.append(f"Fits your budget (${attraction['avg_cost_usd']} < ${user_preferences['max_cost']})")
-            else:
-                explanations.append(f"Above budget but highly rated option")
+        data = request.get_json()
+        attraction_ids = data.get('attraction_ids', [])
+        days = data.get('days', 5)
+        start_location = data.get('start_location', 'Kathmandu')
+        optimize_route = data.get('optimize_route', False)
+        include_nearby = data.get('include_nearby', False)
         
-        # Check difficulty match
-        if user_preferences.get('difficulty'):
-            if attraction['difficulty'] == user_preferences['difficulty']:
-                explanations.append(f"Matches your preferred difficulty level ({attraction['difficulty']})")
+        if not attraction_ids:
+            return jsonify({
+                'success': False,
+                'error': 'Please select at least one attraction'
+            }), 400
         
-        # Rating explanation
-        if attraction['rating'] >= 4.0:
-            explanations.append(f"Highly rated ({attraction['rating']}/5.0) with {attraction['num_reviews']} reviews")
+        if optimize_route:
+            # Order stops by travel time from the start location
+            plan = snapshot.route_planner.plan(attraction_ids, start_location)
+            result = None
+            if plan is not None:
+                positions, route = plan
+                result = snapshot.itinerary_builder.build(attraction_ids, days, positions=positions)
+                result['summary']['route'] = dict(route)
+        else:
+            result = snapshot.itinerary_builder.build(attraction_ids, days)
         
-        # Season explanation
-        explanations.append(f"Best visited in {attraction['best_season']}")
+        if result is None:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid attraction IDs'
+            }), 400
         
-        # Default explanation if no specific matches
-        if not explanations:
-            explanations.append("Popular destination with good ratings")
+        if include_nearby and snapshot.spatial_index is not None:
+            result['summary']['nearby_suggestions'] = _nearby_suggestions(snapshot, result['itinerary'], attraction_ids)
         
         return jsonify({
             'success': True,
-            'explanations': explanations,
-            'attraction': {
-                'name': attraction['name'],
-                'category': attraction['category'],
-                'region': attraction['region']
-            }
+            **result
         })
     
     except Exception as e:
-        print(f"Error in explain_recommendation: {e}")
+        print(f"Error in generate_itinerary: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 
-@app.route('/api/itinerary/generate', methods=['POST'])
-def generate_itinerary():
-    """Generate a multi-day itinerary from selected attractions."""
+@app.route('/api/itinerary/optimize', methods=['POST'])
+def optimize_itinerary():
+    """Pick the best attractions that fit a days and budget limit."""
     try:
+        snapshot = current_catalog()
+        
         data = request.get_json()
-        attraction_ids = data.get('attraction_ids', [])
         days = data.get('days', 5)
+        max_budget = data.get('max_budget')
+        attraction_ids = data.get('attraction_ids') or None
+        objective = data.get('objective', 'rating')
         start_location = data.get('start_location', 'Kathmandu')
+        optimize_route = data.get('optimize_route', False)
         
-        if not attraction_ids:
+        if max_budget is None:
             return jsonify({
                 'success': False,
-                'error': 'Please select at least one attraction'
+                'error': 'max_budget is required'
             }), 400
+        days, max_budget = validate_limits(days, max_budget)
         
-        # Get attractions
-        selected = attractions_df[attractions_df['attraction_id'].isin(attraction_ids)].copy()
+        positions, optimization = snapshot.itinerary_optimizer.optimize(
+            days=days,
+            max_budget=max_budget,
+            attraction_ids=attraction_ids,
+            objective=objective
+        )
         
-        if len(selected) == 0:
+        if len(positions) == 0:
             return jsonify({
                 'success': False,
-                'error': 'Invalid attraction IDs'
+                'error': 'No attractions fit within the given days and budget'
+            }), 400
+        
+        route = None
+        if optimize_route:
+            positions, route = snapshot.route_planner.route(positions, start_location)
+        else:
+            positions = snapshot.itinerary_builder.order(positions)
+        
+        result = snapshot.itinerary_builder.build(None, days, positions=positions)
+        result['summary']['optimization'] = optimization
+        if route is not None:
+            result['summary']['route'] = dict(route)
+        
+        return jsonify({
+            'success': True,
+            **result
+        })
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        print(f"Error in optimize_itinerary: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/itinerary/generate/batch', methods=['POST'])
+def generate_itineraries():
+    """Generate itineraries for several carts in one request."""
+    try:
+        snapshot = current_catalog()
+        
+        data = request.get_json()
+        carts = data.get('requests', [])
+        
+        if not carts:
+            return jsonify({
+                'success': False,
+                'error': 'Please provide at least one itinerary request'
             }), 400
         
-        # Group by region for logical routing
-        selected['region_order'] = selected['region'].map({
-            'Kathmandu Valley': 1,
-            'Pokhara Region': 2,
-            'Everest Region': 3,
-            'Annapurna Region': 2,
-            'Mustang Region': 4,
-            'Langtang Region': 3,
-            'Manaslu Region': 3,
-            'Chitwan': 5,
-            'Lumbini': 5,
-            'Far West Nepal': 6
-        }).fillna(10)
-        
-        selected = selected.sort_values(['region_order', 'difficulty', 'duration_days'])
-        
-        # Build itinerary
-        itinerary = []
-        current_day = 1
-        total_cost = 0
-        
-        # Add travel days and rest days for difficult treks
-        for idx, row in selected.iterrows():
-            attraction = row.to_dict()
+        results = []
+        for cart in carts:
+            try:
+                result = snapshot.itinerary_builder.build(cart.get('attraction_ids', []), cart.get('days', 5))
+            except Exception as e:
+                results.append({'success': False, 'error': str(e)})
+                continue
             
-            # For hard/extreme treks, add acclimatization day
-            if attraction['difficulty'] in ['Hard', 'Extreme'] and attraction['category'] == 'Trekking':
-                days_needed = int(attraction['duration_days']) + 1
+            if result is None:
+                results.append({'success': False, 'error': 'Invalid attraction IDs'})
             else:
-                days_needed = max(1, int(attraction['duration_days']))
-            
-            if current_day > days:
-                break
-            
-            day_entry = {
-                'day': current_day,
-                'attraction': {
-                    'id': int(attraction['attraction_id']),
-                    'name': attraction['name'],
-                    'region': attraction['region'],
-                    'category': attraction['category']
-                },
-                'activities': [attraction['name']],
-                'duration': days_needed,
-                'difficulty': attraction['difficulty'],
-                'cost': float(attraction['avg_cost_usd']),
-                'best_season': attraction['best_season'],
-                'notes': []
-            }
-            
-            # Add notes based on difficulty
-            if attraction['difficulty'] in ['Hard', 'Extreme']:
-                day_entry['notes'].append(f"Acclimatization recommended for high altitude")
-            
-            if attraction['category'] == 'Trekking' and days_needed > 3:
-                day_entry['notes'].append("Multi-day trek - consider rest day after completion")
-            
-            itinerary.append(day_entry)
-            total_cost += attraction['avg_cost_usd']
-            current_day += days_needed
-        
-        # If itinerary is shorter than requested days, add buffer days
-        while current_day <= days and len(itinerary) < days:
-            itinerary.append({
-                'day': current_day,
-                'attraction': None,
-                'activities': ['Flexible day - explore local area or rest'],
-                'duration': 1,
-                'difficulty': 'Easy',
-                'cost': 50.0,
-                'best_season': 'Year-round',
-                'notes': ['Buffer day for rest or spontaneous activities']
-            })
-            current_day += 1
+                results.append({'success': True, **result})
         
         return jsonify({
             'success': True,
-            'itinerary': itinerary,
-            'summary': {
-                'total_days': min(current_day - 1, days),
-                'total_cost': round(total_cost, 2),
-                'average_daily_cost': round(total_cost / min(current_day - 1, days), 2),
-                'attractions_count': len(selected),
-                'regions_covered': selected['region'].unique().tolist()
-            }
+            'count': len(results),
+            'results': results
         })
     
     except Exception as e:
-        print(f"Error in generate_itinerary: {e}")
+        print(f"Error in generate_itineraries: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -481,18 +1128,19 @@ def handle_conversion_request():
             }), 400
         
         # Create lead in database
-        lead = Lead(
-            name=name,
-            email=email,
-            phone=phone,
-            lead_type=request_type,
-            attraction_ids=json.dumps(attraction_ids) if attraction_ids else None,
-            metadata=json.dumps(user_data),
-            status='new'
-        )
-        
-        db.session.add(lead)
-        db.session.commit()
+        with tracing.span('lead.insert', lead_type=request_type):
+            lead = Lead(
+                name=name,
+                email=email,
+                phone=phone,
+                lead_type=request_type,
+                attraction_ids=attraction_ids or None,
+                lead_metadata=user_data,
+                status='new'
+            )
+            
+            db.session.add(lead)
+            db.session.commit()
         
         # Handle different request types
         email_sent = False
@@ -502,17 +1150,19 @@ def handle_conversion_request():
             if request_type == 'email':
                 # Get attraction details for email
                 if attraction_ids:
-                    selected_attractions = attractions_df[attractions_df['attraction_id'].isin(attraction_ids)]
-                    attractions_data = selected_attractions.to_dict('records')
-                    
-                    # Calculate summary
-                    itinerary_summary = {
-                        'total_days': int(selected_attractions['duration_days'].sum()),
-                        'total_cost': float(selected_attractions['avg_cost_usd'].sum()),
-                        'average_daily_cost': float(selected_attractions['avg_cost_usd'].mean()),
-                        'attractions_count': len(selected_attractions),
-                        'regions_covered': selected_attractions['region'].unique().tolist()
-                    }
+                    with tracing.span('attractions.lookup', requested=len(attraction_ids)):
+                        attractions_df = current_catalog().attractions_df
+                        selected_attractions = attractions_df[attractions_df['attraction_id'].isin(attraction_ids)]
+                        attractions_data = to_records(selected_attractions)
+                        
+                        # Calculate summary
+                        itinerary_summary = {
+                            'total_days': int(selected_attractions['duration_days'].sum()),
+                            'total_cost': float(selected_attractions['avg_cost_usd'].sum()),
+                            'average_daily_cost': float(selected_attractions['avg_cost_usd'].mean()),
+                            'attractions_count': len(selected_attractions),
+                            'regions_covered': selected_attractions['region'].unique().tolist()
+                        }
                     
                     # Send itinerary email
                     email_sent = send_itinerary_email(
@@ -544,27 +1194,29 @@ def handle_conversion_request():
             
             # Update lead with email status
             if email_sent:
-                lead.email_sent = True
-                lead.email_sent_at = datetime.utcnow()
-                db.session.commit()
+                with tracing.span('lead.mark_email_sent'):
+                    lead.email_sent = True
+                    lead.email_sent_at = datetime.utcnow()
+                    db.session.commit()
             
         except Exception as e:
             error_message = str(e)
             app.logger.error(f"Email sending failed: {error_message}")
         
         # Create conversion request record
-        conversion = ConversionRequest(
-            lead_id=lead.id,
-            request_type=request_type,
-            email_to=email,
-            status='sent' if email_sent else 'failed',
-            error_message=error_message
-        )
-        if email_sent:
-            conversion.sent_at = datetime.utcnow()
-        
-        db.session.add(conversion)
-        db.session.commit()
+        with tracing.span('conversion.insert', email_sent=email_sent):
+            conversion = ConversionRequest(
+                lead_id=lead.id,
+                request_type=request_type,
+                email_to=email,
+                status='sent' if email_sent else 'failed',
+                error_message=error_message
+            )
+            if email_sent:
+                conversion.sent_at = datetime.utcnow()
+            
+            db.session.add(conversion)
+            db.session.commit()
         
         response_messages = {
             'email': 'Your itinerary has been sent to your email!' if email_sent else 'Your itinerary is being prepared and will be sent shortly!',
@@ -608,7 +1260,7 @@ def save_preferences():
             pref.preferred_category = data.get('category')
             pref.max_cost = data.get('max_cost')
             pref.difficulty = data.get('difficulty')
-            pref.preferred_regions = json.dumps(data.get('regions', []))
+            pref.preferred_regions = data.get('regions', [])
             pref.visit_count += 1
             pref.updated_at = datetime.utcnow()
             if email:
@@ -621,7 +1273,7 @@ def save_preferences():
                 preferred_category=data.get('category'),
                 max_cost=data.get('max_cost'),
                 difficulty=data.get('difficulty'),
-                preferred_regions=json.dumps(data.get('regions', []))
+                preferred_regions=data.get('regions', [])
             )
             db.session.add(pref)
         
@@ -698,6 +1350,102 @@ def get_leads():
         }), 500
 
 
+def _parse_since(value):
+    """Parse an optional ISO timestamp query parameter."""
+    return datetime.fromisoformat(value) if value else None
+
+
+def _export_response(query, columns, export_format, filename):
+    """Build a chunked streaming response for an export query."""
+    batch_size = request.args.get('batch_size', 1000, type=int)
+    body = stream_export(query, columns, export_format, batch_size=max(1, batch_size))
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}.{export_format}'
+        }
+    )
+
+
+@app.route('/api/leads/export', methods=['GET'])
+@require_admin
+def export_leads():
+    """Stream all leads as CSV or NDJSON (admin endpoint)."""
+    try:
+        export_format = request.args.get('format', 'csv')
+        status = request.args.get('status', 'all')
+        since = _parse_since(request.args.get('since'))
+        
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f"Unsupported format: {export_format}"
+            }), 400
+        
+        query = Lead.query
+        
+        if status != 'all':
+            query = query.filter_by(status=status)
+        if since:
+            query = query.filter(Lead.created_at >= since)
+        
+        query = query.order_by(Lead.id)
+        
+        return _export_response(query, LEAD_EXPORT_COLUMNS, export_format, 'leads')
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        app.logger.error(f"Error exporting leads: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/analytics/export', methods=['GET'])
+@require_admin
+def export_analytics():
+    """Stream analytics events as CSV or NDJSON (admin endpoint)."""
+    try:
+        export_format = request.args.get('format', 'csv')
+        recommendation_type = request.args.get('recommendation_type')
+        since = _parse_since(request.args.get('since'))
+        
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f"Unsupported format: {export_format}"
+            }), 400
+        
+        query = Analytics.query
+        
+        if recommendation_type:
+            query = query.filter_by(recommendation_type=recommendation_type)
+        if since:
+            query = query.filter(Analytics.created_at >= since)
+        
+        query = query.order_by(Analytics.id)
+        
+        return _export_response(query, ANALYTICS_EXPORT_COLUMNS, export_format, 'analytics')
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        app.logger.error(f"Error exporting analytics: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/analytics/track', methods=['POST'])
 def track_analytics():
     """Track recommendation clicks and conversions."""
@@ -710,7 +1458,7 @@ def track_analytics():
             attraction_id=data.get('attraction_id'),
             clicked=data.get('clicked', False),
             converted=data.get('converted', False),
-            user_preferences=json.dumps(data.get('preferences', {}))
+            user_preferences=data.get('preferences', {})
         )
         
         db.session.add(analytics)
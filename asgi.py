@@ -0,0 +1,365 @@
+"""
+ASGI entry point: async I/O-bound routes in front of the Flask app.
+
+Conversion requests, saved preferences and analytics tracking spend most of
+their time waiting on the database and SMTP, so here they are coroutines on
+an async database driver and aiosmtplib, and one worker serves many of them
+at once. Every other route, including the CPU-bound recommender and
+itinerary calls, is served by the Flask app on a bounded thread pool
+(ASYNC_WSGI_THREADS, default 10), so it never blocks the event loop.
+
+Run with:
+    uvicorn asgi:app --workers 4
+"""
+import asyncio
+import contextlib
+import functools
+import time
+from datetime import datetime
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from app import (
+    app as flask_app, catalog, metrics, admission, HTTP_REQUESTS, HTTP_LATENCY, HTTP_IN_FLIGHT, SHED_REQUESTS,
+    RATE_LIMIT_PROXY_HEADER
+)
+from src.admission import MESSAGES as SHED_MESSAGES, RATE_LIMITED, client_address
+from src.compact import to_records
+from src.database import create_async_engines, install_query_spans
+from src.email_service import (
+    send_email_async, render_itinerary_email, render_expert_consultation_notification,
+    render_quote_request_notification, render_confirmation_email
+)
+from src.models import db, UserPreference, Lead, ConversionRequest, Analytics
+from src.observability import tracing
+
+
+with flask_app.app_context():
+    engines = create_async_engines(flask_app.config, db.engines)
+if tracing.enabled():
+    for engine in engines.values():
+        install_query_spans(engine.sync_engine)
+
+# Every model goes to the engine of its bind (e.g. analytics, see DEDICATED_BINDS).
+# Objects stay readable after commit, as lazy refreshes are not possible here.
+Session = async_sessionmaker(
+    binds={
+        mapper.class_: engines[mapper.local_table.metadata.info.get('bind_key')]
+        for mapper in db.Model.registry.mappers
+    },
+    expire_on_commit=False
+)
+
+
+def instrumented(endpoint):
+    """
+    Run an async route inside a Flask app context (for config and email
+    rendering) with the same admission control, metrics and root trace span
+    as the Flask request hooks, under the same endpoint name.
+    """
+    def decorate(handler):
+        @functools.wraps(handler)
+        async def wrapped(request):
+            metrics.start()
+            started = time.perf_counter()
+            HTTP_IN_FLIGHT.inc(endpoint=endpoint)
+            trace_span = tracing.start_span(
+                'http.request', kind=tracing.KIND_SERVER,
+                **{'http.method': request.method, 'http.route': request.url.path, 'endpoint': endpoint}
+            )
+            status = 500
+            error = None
+            admitted = False
+            try:
+                if admission is not None:
+                    key = client_address(request.client.host, request.headers, RATE_LIMIT_PROXY_HEADER)
+                    shed, retry_after = admission.enter(key, endpoint)
+                    if shed is not None:
+                        SHED_REQUESTS.inc(endpoint=endpoint, reason='rate_limited' if shed == RATE_LIMITED else 'overloaded')
+                        status = shed
+                        return JSONResponse({
+                            'success': False,
+                            'error': SHED_MESSAGES[shed]
+                        }, status_code=shed, headers={'Retry-After': str(retry_after)})
+                    admitted = True
+                with flask_app.app_context():
+                    response = await handler(request)
+                status = response.status_code
+                if tracing.enabled():
+                    response.headers['X-Trace-Id'] = trace_span.trace_id
+                return response
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                if admitted:
+                    admission.leave(endpoint)
+                HTTP_IN_FLIGHT.dec(endpoint=endpoint)
+                HTTP_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+                HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=status)
+                trace_span.set(**{'http.status_code': status})
+                trace_span.end(error)
+        return wrapped
+    return decorate
+
+
+def error_response(message, status):
+    return JSONResponse({
+        'success': False,
+        'error': message
+    }, status_code=status)
+
+
+def summarize_attractions(snapshot, attraction_ids):
+    """Attraction records and trip summary for the itinerary email (CPU-bound; run off the event loop)."""
+    attractions_df = snapshot.attractions_df
+    selected_attractions = attractions_df[attractions_df['attraction_id'].isin(attraction_ids)]
+    return to_records(selected_attractions), {
+        'total_days': int(selected_attractions['duration_days'].sum()),
+        'total_cost': float(selected_attractions['avg_cost_usd'].sum()),
+        'average_daily_cost': float(selected_attractions['avg_cost_usd'].mean()),
+        'attractions_count': len(selected_attractions),
+        'regions_covered': selected_attractions['region'].unique().tolist()
+    }
+
+
+@instrumented('handle_conversion_request')
+async def handle_conversion_request(request):
+    """Handle conversion requests (email, expert consultation, quotes)."""
+    async with Session() as session:
+        try:
+            data = await request.json()
+            request_type = data.get('type')  # 'email', 'expert', 'quote'
+            user_data = data.get('user_data', {})
+            attraction_ids = data.get('attraction_ids', [])
+
+            if not request_type:
+                return error_response('Request type is required', 400)
+
+            name = user_data.get('name', user_data.get('email', 'User')).split('@')[0]
+            email = user_data.get('email') or user_data.get('contact')
+            phone = user_data.get('phone', '')
+
+            if not email:
+                return error_response('Email address is required', 400)
+
+            with tracing.span('lead.insert', lead_type=request_type):
+                lead = Lead(
+                    name=name,
+                    email=email,
+                    phone=phone,
+                    lead_type=request_type,
+                    attraction_ids=attraction_ids or None,
+                    lead_metadata=user_data,
+                    status='new'
+                )
+                session.add(lead)
+                await session.commit()
+
+            email_sent = False
+            error_message = None
+            snapshot = None
+            admin_email = flask_app.config.get('ADMIN_EMAIL')
+
+            try:
+                if request_type == 'email':
+                    if attraction_ids:
+                        snapshot = catalog.current()
+                        if snapshot is None:
+                            raise RuntimeError('Catalog is not loaded')
+                        with tracing.span('attractions.lookup', requested=len(attraction_ids)):
+                            attractions_data, itinerary_summary = await run_in_threadpool(
+                                summarize_attractions, snapshot, attraction_ids
+                            )
+                        with tracing.span('email.render', template='itinerary'):
+                            subject, html_body = render_itinerary_email(name, attractions_data, itinerary_summary)
+                    else:
+                        with tracing.span('email.render', template='confirmation_email'):
+                            subject, html_body = render_confirmation_email(name, 'email')
+                    email_sent = await send_email_async(subject, [email], html_body)
+
+                elif request_type in ('expert', 'quote'):
+                    lead_dict = lead.to_dict()
+                    with tracing.span('email.render', template=f"confirmation_{request_type}"):
+                        confirmation = render_confirmation_email(name, request_type)
+                    if request_type == 'expert':
+                        lead_dict['contact'] = user_data.get('contact', email)
+                        with tracing.span('email.render', template='expert_consultation'):
+                            notification = render_expert_consultation_notification(lead_dict)
+                    else:
+                        with tracing.span('email.render', template='quote_request'):
+                            notification = render_quote_request_notification(lead_dict)
+
+                    # Confirm to the user and notify the admin concurrently
+                    _, email_sent = await asyncio.gather(
+                        send_email_async(confirmation[0], [email], confirmation[1]),
+                        send_email_async(notification[0], [admin_email], notification[1])
+                    )
+
+                if email_sent:
+                    with tracing.span('lead.mark_email_sent'):
+                        lead.email_sent = True
+                        lead.email_sent_at = datetime.utcnow()
+                        await session.commit()
+
+            except Exception as e:
+                error_message = str(e)
+                flask_app.logger.error(f"Email sending failed: {error_message}")
+
+            with tracing.span('conversion.insert', email_sent=email_sent):
+                conversion = ConversionRequest(
+                    lead_id=lead.id,
+                    request_type=request_type,
+                    email_to=email,
+                    status='sent' if email_sent else 'failed',
+                    error_message=error_message
+                )
+                if email_sent:
+                    conversion.sent_at = datetime.utcnow()
+                session.add(conversion)
+                await session.commit()
+
+            response_messages = {
+                'email': 'Your itinerary has been sent to your email!' if email_sent else 'Your itinerary is being prepared and will be sent shortly!',
+                'expert': 'A local travel expert will contact you within 24 hours.',
+                'quote': 'A customized quote will be prepared and sent to you within 1-2 business days.'
+            }
+
+            response = JSONResponse({
+                'success': True,
+                'message': response_messages.get(request_type, 'Request received successfully'),
+                'lead_id': lead.id,
+                'email_sent': email_sent,
+                'data': {
+                    'type': request_type,
+                    'timestamp': datetime.utcnow().isoformat()
+                }
+            })
+            if snapshot is not None:
+                response.headers['X-Catalog-Version'] = snapshot.version
+            return response
+
+        except Exception as e:
+            flask_app.logger.error(f"Error in handle_conversion_request: {e}")
+            await session.rollback()
+            return error_response(str(e), 500)
+
+
+@instrumented('save_preferences')
+async def save_preferences(request):
+    """Save user preferences to database."""
+    async with Session() as session:
+        try:
+            data = await request.json()
+            session_id = data.get('session_id') or request.client.host
+            email = data.get('email')
+
+            result = await session.execute(select(UserPreference).filter_by(session_id=session_id).limit(1))
+            pref = result.scalars().first()
+
+            if pref:
+                pref.preferred_category = data.get('category')
+                pref.max_cost = data.get('max_cost')
+                pref.difficulty = data.get('difficulty')
+                pref.preferred_regions = data.get('regions', [])
+                pref.visit_count += 1
+                pref.updated_at = datetime.utcnow()
+                if email:
+                    pref.user_email = email
+            else:
+                pref = UserPreference(
+                    session_id=session_id,
+                    user_email=email,
+                    preferred_category=data.get('category'),
+                    max_cost=data.get('max_cost'),
+                    difficulty=data.get('difficulty'),
+                    preferred_regions=data.get('regions', [])
+                )
+                session.add(pref)
+
+            await session.commit()
+
+            return JSONResponse({
+                'success': True,
+                'preference_id': pref.id,
+                'message': 'Preferences saved successfully'
+            })
+
+        except Exception as e:
+            flask_app.logger.error(f"Error saving preferences: {e}")
+            await session.rollback()
+            return error_response(str(e), 500)
+
+
+@instrumented('load_preferences')
+async def load_preferences(request):
+    """Load user preferences from database."""
+    async with Session() as session:
+        try:
+            session_id = request.query_params.get('session_id') or request.client.host
+
+            result = await session.execute(select(UserPreference).filter_by(session_id=session_id).limit(1))
+            pref = result.scalars().first()
+
+            return JSONResponse({
+                'success': True,
+                'preferences': pref.to_dict() if pref else None
+            })
+
+        except Exception as e:
+            flask_app.logger.error(f"Error loading preferences: {e}")
+            return error_response(str(e), 500)
+
+
+@instrumented('track_analytics')
+async def track_analytics(request):
+    """Track recommendation clicks and conversions."""
+    async with Session() as session:
+        try:
+            data = await request.json()
+
+            session.add(Analytics(
+                session_id=data.get('session_id') or request.client.host,
+                recommendation_type=data.get('recommendation_type'),
+                attraction_id=data.get('attraction_id'),
+                clicked=data.get('clicked', False),
+                converted=data.get('converted', False),
+                user_preferences=data.get('preferences', {})
+            ))
+            await session.commit()
+
+            return JSONResponse({
+                'success': True,
+                'message': 'Analytics tracked'
+            })
+
+        except Exception as e:
+            flask_app.logger.error(f"Error tracking analytics: {e}")
+            await session.rollback()
+            return error_response(str(e), 500)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(asgi_app):
+    yield
+    for engine in engines.values():
+        await engine.dispose()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/conversion/request', handle_conversion_request, methods=['POST']),
+        Route('/api/preferences/save', save_preferences, methods=['POST']),
+        Route('/api/preferences/load', load_preferences, methods=['GET']),
+        Route('/api/analytics/track', track_analytics, methods=['POST']),
+        # Everything else, on a bounded thread pool
+        Mount('/', app=WSGIMiddleware(flask_app, workers=int(flask_app.config.get('ASYNC_WSGI_THREADS', 10))))
+    ],
+    lifespan=lifespan
+)
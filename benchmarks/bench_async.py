@@ -0,0 +1,168 @@
+"""
+Sync versus async worker models on the I/O-bound endpoints.
+
+Starts each server model in turn against a scratch database and a local SMTP
+stub that takes --smtp-delay to accept every message (as a real relay
+would), then drives it with benchmarks/loadgen.py. The 'io' mix exercises
+conversion, preferences and analytics only; the 'mixed' mix is the default
+load generator traffic, where recommender calls compete for the same
+workers.
+
+Usage:
+    python benchmarks/bench_async.py
+    python benchmarks/bench_async.py --models sync async --workers 4 --stages 16 64 --output async.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadgen import (  # noqa: E402
+    DEFAULT_MIX, load_sessions, run_stage, start_server, summarize, wait_until_ready, DATA_DIR
+)
+
+# Server command per worker model
+MODELS = {
+    'sync': 'gunicorn -w {workers} -b 127.0.0.1:{port} app:app',
+    'gthread': 'gunicorn -w {workers} -k gthread --threads 8 -b 127.0.0.1:{port} app:app',
+    'async': 'uvicorn asgi:app --workers {workers} --host 127.0.0.1 --port {port}',
+}
+
+MIXES = {
+    'io': {'conversion': 20, 'save_preferences': 20, 'load_preferences': 20, 'analytics': 40},
+    'mixed': DEFAULT_MIX,
+}
+
+
+class SmtpStub:
+    """Minimal SMTP server on a background thread that accepts and discards mail after a delay."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.messages = 0
+        self.port = None
+        self._ready = threading.Event()
+        self._loop = None
+
+    async def _handle(self, reader, writer):
+        writer.write(b'220 localhost SMTP stub\r\n')
+        in_data = False
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if in_data:
+                    if line in (b'.\r\n', b'.\n'):
+                        in_data = False
+                        await asyncio.sleep(self.delay)
+                        self.messages += 1
+                        writer.write(b'250 OK queued\r\n')
+                    continue
+                command = line[:4].upper()
+                if command == b'DATA':
+                    in_data = True
+                    writer.write(b'354 End data with <CR><LF>.<CR><LF>\r\n')
+                elif command == b'QUIT':
+                    writer.write(b'221 Bye\r\n')
+                    await writer.drain()
+                    break
+                elif command in (b'EHLO', b'HELO'):
+                    writer.write(b'250 localhost\r\n')
+                else:
+                    writer.write(b'250 OK\r\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def start(self):
+        def run():
+            self._loop = asyncio.new_event_loop()
+            server = self._loop.run_until_complete(asyncio.start_server(self._handle, '127.0.0.1', 0))
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, name='smtp-stub', daemon=True).start()
+        self._ready.wait()
+        return self
+
+
+def run_model(model, args, sessions, smtp):
+    command = MODELS[model].format(workers=args.workers, port=args.port)
+    url = f"http://127.0.0.1:{args.port}"
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        process = start_server(command, scratch, env={
+            'FLASK_MAIL_BACKEND': 'smtp',
+            'FLASK_MAIL_SERVER': '127.0.0.1',
+            'FLASK_MAIL_PORT': str(smtp.port),
+            'FLASK_MAIL_USE_TLS': 'false',
+            'FLASK_MAIL_DEFAULT_SENDER': 'bench@example.com',
+        })
+        try:
+            wait_until_ready(url, process, timeout=120)
+            for mix_name in args.mixes:
+                for concurrency in args.stages:
+                    samples, elapsed = run_stage(url, sessions, MIXES[mix_name], concurrency,
+                                                 args.stage_seconds, args.timeout, args.seed)
+                    endpoints = summarize(samples, elapsed) if samples else {}
+                    results.append({'mix': mix_name, 'concurrency': concurrency, 'endpoints': endpoints})
+                    overall = endpoints.get('all', {})
+                    print(f"  {model} {mix_name} {concurrency} users: {overall.get('requests_per_second', 0)} req/s",
+                          file=sys.stderr)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return {'model': model, 'command': command, 'stages': results}
+
+
+def print_summary(runs):
+    print(f"{'model':<9} {'mix':<6} {'users':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for run in runs:
+        for stage in run['stages']:
+            stats = stage['endpoints'].get('all')
+            if not stats:
+                continue
+            print(f"{run['model']:<9} {stage['mix']:<6} {stage['concurrency']:>6} {stats['requests_per_second']:>9} "
+                  f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['error_rate']:>8.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--models', nargs='+', choices=MODELS, default=list(MODELS))
+    parser.add_argument('--mixes', nargs='+', choices=MIXES, default=list(MIXES))
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes per server')
+    parser.add_argument('--stages', type=int, nargs='+', default=[8, 32, 64], help='Concurrent users per stage')
+    parser.add_argument('--stage-seconds', type=float, default=15)
+    parser.add_argument('--smtp-delay', type=float, default=0.1, help='Seconds the SMTP stub takes per message')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    sessions = load_sessions(os.path.join(DATA_DIR, 'users.csv'), os.path.join(DATA_DIR, 'user_ratings.csv'))
+    smtp = SmtpStub(args.smtp_delay).start()
+
+    runs = [run_model(model, args, sessions, smtp) for model in args.models]
+    print_summary(runs)
+    print(f"SMTP stub accepted {smtp.messages} messages")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'workers': args.workers,
+                'smtp_delay': args.smtp_delay,
+                'stage_seconds': args.stage_seconds,
+                'runs': runs,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Write-throughput benchmark for the conversion and analytics endpoints.
+
+Each engine profile runs in a fresh process against a scratch database, so
+pool and pragma settings are applied exactly as they would be at boot.
+
+Usage:
+    python benchmarks/bench_db_writes.py --requests 500 --threads 4
+    python benchmarks/bench_db_writes.py --database-url postgresql://localhost/bench
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Engine settings compared by default on SQLite
+SQLITE_PROFILES = {
+    'rollback-journal': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL'},
+    'wal-full': {'SQLITE_JOURNAL_MODE': 'WAL', 'SQLITE_SYNCHRONOUS': 'FULL'},
+    'wal-normal': {'SQLITE_JOURNAL_MODE': 'WAL', 'SQLITE_SYNCHRONOUS': 'NORMAL'},
+    # Analytics on its own SQLite file, engine and pool (see DEDICATED_BINDS)
+    'wal-split-analytics': {
+        'SQLITE_JOURNAL_MODE': 'WAL',
+        'SQLITE_SYNCHRONOUS': 'NORMAL',
+        'ANALYTICS_DATABASE_URI': 'sqlite:///{tmp}/analytics.db',
+        'ANALYTICS_SQLITE_SYNCHRONOUS': 'OFF',
+    },
+}
+
+ENDPOINTS = {
+    'conversion': (
+        '/api/conversion/request',
+        lambda i: {
+            'type': 'expert',
+            'user_data': {'email': f'bench{i}@example.com', 'phone': '+977-1-000000'},
+            'attraction_ids': [i % 60, (i + 7) % 60]
+        }
+    ),
+    'analytics': (
+        '/api/analytics/track',
+        lambda i: {
+            'session_id': f'bench-{i % 50}',
+            'recommendation_type': 'similar',
+            'attraction_id': i % 60,
+            'clicked': True,
+            'preferences': {'category': 'Trekking', 'max_cost': 1000}
+        }
+    ),
+}
+
+
+def run_child(num_requests, threads):
+    """Import the app with the inherited environment and time each endpoint."""
+    sys.path.insert(0, BASE_DIR)
+
+    # The app logs to stdout at import and the console mail backend prints
+    # every message; keep the child's stdout for the JSON result only
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+
+    client_app = app_module.app
+    results = {}
+
+    for name, (path, make_payload) in ENDPOINTS.items():
+        def call(i):
+            client = client_app.test_client()
+            start = time.perf_counter()
+            response = client.post(path, json=make_payload(i))
+            return time.perf_counter() - start, response.status_code
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                samples = list(pool.map(call, range(num_requests)))
+            elapsed = time.perf_counter() - start
+
+        latencies = np.array([s[0] for s in samples]) * 1000
+        errors = sum(1 for s in samples if s[1] >= 400)
+        results[name] = {
+            'requests': num_requests,
+            'errors': errors,
+            'wall_seconds': round(elapsed, 4),
+            'requests_per_second': round(num_requests / elapsed, 1),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        }
+
+    print(json.dumps(results))
+
+
+def run_profile(name, settings, database_url, num_requests, threads, tmp=''):
+    """Run one engine profile in a subprocess and return its parsed results."""
+    env = dict(os.environ)
+    env['FLASK_SQLALCHEMY_DATABASE_URI'] = database_url
+    env['FLASK_MAIL_BACKEND'] = 'console'
+    for key, value in settings.items():
+        env[f'FLASK_{key}'] = str(value).format(tmp=tmp)
+
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child',
+         '--requests', str(num_requests), '--threads', str(threads)],
+        env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    return {'profile': name, 'settings': settings, 'results': json.loads(output.stdout)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300, help='Requests per endpoint')
+    parser.add_argument('--threads', type=int, default=4, help='Concurrent client threads')
+    parser.add_argument('--database-url', help='Benchmark a server database instead of scratch SQLite files')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.requests, args.threads)
+        return
+
+    runs = []
+    if args.database_url:
+        runs.append(run_profile('server', {}, args.database_url, args.requests, args.threads))
+    else:
+        for name, settings in SQLITE_PROFILES.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+                runs.append(run_profile(name, settings, url, args.requests, args.threads, tmp))
+
+    print(f"{'profile':<20} {'endpoint':<12} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for run in runs:
+        for endpoint, stats in run['results'].items():
+            print(f"{run['profile']:<20} {endpoint:<12} {stats['requests_per_second']:>9} "
+                  f"{stats['p50_ms']:>9} {stats['p99_ms']:>9} {stats['errors']:>7}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'threads': args.threads, 'runs': runs}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Memory and time of the recommender's feature and similarity pipeline.
+
+Compares the float32 CSR pipeline used by ContentBasedRecommender.fit
+(pre-normalized rows, similarity as a sparse-dense dot product) with the
+previous float64 one (dense MinMaxScaler block, COO hstack, sklearn
+cosine_similarity). Each (size, pipeline) pair runs in a fresh process;
+peak traced allocations cover numpy and scipy buffers, so temporaries
+count even when they are freed before fit returns.
+
+Usage:
+    python benchmarks/bench_features.py
+    python benchmarks/bench_features.py --sizes 1000 10000 --repeat 5 --output features.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_suite import BASE_DIR, available_memory_bytes, load_catalog, peak_rss_mb, synthetic_catalog  # noqa: E402
+
+PIPELINES = ('float64', 'float32')
+
+# Free memory the float64 pipeline needs relative to its n x n float64 result
+FLOAT64_MEMORY_FACTOR = 2
+
+
+def fit_float64(attractions_df):
+    """The pipeline fit() used before it moved to float32 CSR."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+    from sklearn.preprocessing import MinMaxScaler
+    from scipy.sparse import hstack, csr_matrix
+    from src.compact import widen
+
+    text_features = (
+        attractions_df['category'].astype(str) + ' ' +
+        attractions_df['region'].astype(str) + ' ' +
+        attractions_df['difficulty'].astype(str) + ' ' +
+        attractions_df['best_season'].astype(str)
+    )
+    tfidf_matrix = TfidfVectorizer(stop_words='english').fit_transform(text_features)
+    numerical_normalized = MinMaxScaler().fit_transform(np.column_stack([
+        widen(attractions_df[column]) for column in ('rating', 'avg_cost_usd', 'duration_days')
+    ]))
+    feature_matrix = hstack([tfidf_matrix, csr_matrix(numerical_normalized)])
+    return feature_matrix, cosine_similarity(feature_matrix)
+
+
+def fit_float32(attractions_df):
+    from src.recommender.content_based import ContentBasedRecommender
+
+    recommender = ContentBasedRecommender().fit(attractions_df)
+    return recommender.feature_matrix, recommender.similarity_matrix
+
+
+FITS = {'float64': fit_float64, 'float32': fit_float32}
+
+
+def run_child(pipeline, catalog_path, repeat):
+    attractions_df = load_catalog(catalog_path)
+    fit = FITS[pipeline]
+    fit(attractions_df)  # Warm up imports and caches
+
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        feature_matrix, similarity = fit(attractions_df)
+        timings.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del feature_matrix, similarity
+
+    feature_matrix, similarity = fit(attractions_df)
+    print(json.dumps({
+        'fit_ms': round(float(np.median(timings)) * 1000, 2),
+        'peak_traced_mb': round(peak / 1024 ** 2, 1),
+        'peak_rss_mb': peak_rss_mb(),
+        'similarity_mb': round(similarity.nbytes / 1024 ** 2, 1),
+        'similarity_dtype': str(similarity.dtype),
+        'features_format': feature_matrix.format,
+        'features_dtype': str(feature_matrix.dtype),
+    }))
+
+
+def run_case(pipeline, catalog_path, repeat):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', pipeline,
+         '--catalog', catalog_path, '--repeat', str(repeat)],
+        cwd=BASE_DIR, capture_output=True, text=True
+    )
+    if output.returncode != 0:
+        return {'error': (output.stderr.strip().splitlines() or ['exit code %d' % output.returncode])[-1]}
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def agreement(catalog_path, top_n=5, rows=500):
+    """Largest similarity difference between the pipelines, and the share of top-n neighbours they agree on."""
+    attractions_df = load_catalog(catalog_path)
+    _, before = fit_float64(attractions_df)
+    _, after = fit_float32(attractions_df)
+    rows = min(rows, len(attractions_df))
+    # Drop self-matches before taking the top n, as recommend() does
+    np.fill_diagonal(before, -np.inf)
+    np.fill_diagonal(after, -np.inf)
+    shared = sum(
+        len(set(np.argsort(-before[i], kind='stable')[:top_n]) & set(np.argsort(-after[i], kind='stable')[:top_n]))
+        for i in range(rows)
+    )
+    np.fill_diagonal(before, 0)
+    np.fill_diagonal(after, 0)
+    return {
+        'max_abs_difference': float(np.abs(before - after).max()),
+        f'top{top_n}_agreement': round(shared / (rows * top_n), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 10000], help='Catalog sizes')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed fits per case (median reported)')
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic catalog seed')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--child', choices=PIPELINES, help=argparse.SUPPRESS)
+    parser.add_argument('--catalog', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.catalog, args.repeat)
+        return
+
+    import tempfile
+
+    runs = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for size in args.sizes:
+            catalog_path = os.path.join(scratch, f'attractions-{size}.csv')
+            synthetic_catalog(size, seed=args.seed).to_csv(catalog_path, index=False)
+            run = {'size': size}
+            for pipeline in PIPELINES:
+                if pipeline == 'float64' and size * size * 8 * FLOAT64_MEMORY_FACTOR > available_memory_bytes():
+                    run[pipeline] = {'skipped': 'not enough free memory'}
+                else:
+                    run[pipeline] = run_case(pipeline, catalog_path, args.repeat)
+                print(f"  {size} {pipeline}: {run[pipeline]}", file=sys.stderr)
+            if size == min(args.sizes):
+                run['agreement'] = agreement(catalog_path)
+            runs.append(run)
+
+    print(f"{'size':>7} {'pipeline':<9} {'fit ms':>9} {'peak MB':>9} {'rss MB':>8} {'result MB':>10}")
+    for run in runs:
+        for pipeline in PIPELINES:
+            result = run[pipeline]
+            if 'fit_ms' not in result:
+                print(f"{run['size']:>7} {pipeline:<9} {result.get('skipped') or 'ERROR: ' + result['error']}")
+                continue
+            print(f"{run['size']:>7} {pipeline:<9} {result['fit_ms']:>9} {result['peak_traced_mb']:>9} "
+                  f"{result['peak_rss_mb']:>8} {result['similarity_mb']:>10}")
+        if 'agreement' in run:
+            print(f"        agreement at {run['size']}: {run['agreement']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'repeat': args.repeat, 'seed': args.seed, 'runs': runs}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
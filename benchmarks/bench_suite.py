@@ -0,0 +1,299 @@
+"""
+Scaling benchmarks for the recommender and the API hot paths.
+
+Synthetic catalogs of each size are written once; every (size, case) pair
+then runs in a fresh process so its wall time and peak RSS are not mixed
+with other cases. Cases that would need a dense similarity matrix larger
+than the recommender allows, or than the machine has free, are reported as
+skipped rather than run.
+
+Usage:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --sizes 1000 10000 --cases fit api --output results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.recommender.content_based import MAX_SIMILARITY_BYTES, similarity_bytes  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+CASES = ('fit', 'recommend', 'recommend_by_preferences', 'api')
+
+# Cases that build the dense similarity matrix
+DENSE_CASES = ('fit', 'recommend')
+
+# fit() holds the similarity matrix plus small temporaries; the rest is headroom
+DENSE_MEMORY_FACTOR = 2
+
+API_REQUESTS = (
+    ('GET', '/api/attraction/{id}', None),
+    ('GET', '/api/attractions?category=Trekking&min_rating=4.8&max_cost=300', None),
+    ('GET', '/api/search?q=lake trek', None),
+    ('GET', '/api/autocomplete?q=ann', None),
+    ('GET', '/api/attractions/nearby?near=Pokhara&k=10', None),
+    ('GET', '/api/recommend/similar/{id}', None),
+    ('POST', '/api/recommend/preferences', {'category': 'Trekking', 'max_cost': 1000}),
+    ('GET', '/api/stats', None),
+    ('POST', '/api/itinerary/generate', {'attraction_ids': '{ids}', 'days': 14, 'optimize_route': True}),
+    ('POST', '/api/itinerary/optimize', {'days': 10, 'max_budget': 3000, 'attraction_ids': '{ids}'}),
+)
+
+
+def synthetic_catalog(num_attractions, seed=0):
+    """Catalog of any size that imitates the processed catalog (see src.utils.synthetic)."""
+    import pandas as pd
+    from src.utils.synthetic import synthesize_attractions
+
+    template = pd.read_csv(os.path.join(BASE_DIR, 'data', 'processed', 'attractions.csv'))
+    return synthesize_attractions(template, num_attractions, seed=seed)
+
+
+def latency_stats(samples):
+    """p50/p99/mean in milliseconds for a list of durations in seconds."""
+    latencies = np.asarray(samples) * 1000
+    return {
+        'calls': len(latencies),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        'mean_ms': round(float(latencies.mean()), 3),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def available_memory_bytes():
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+
+def skip_reason(case, size):
+    """Why a case cannot run at this size, or None."""
+    if case not in DENSE_CASES:
+        return None
+    needed = similarity_bytes(size)
+    if needed > MAX_SIMILARITY_BYTES:
+        return f"dense similarity needs {needed / 1024 ** 3:.1f} GiB (recommender limit {MAX_SIMILARITY_BYTES / 1024 ** 3:.1f} GiB)"
+    if needed * DENSE_MEMORY_FACTOR > available_memory_bytes():
+        return f"dense similarity needs ~{needed * DENSE_MEMORY_FACTOR / 1024 ** 3:.1f} GiB, {available_memory_bytes() / 1024 ** 3:.1f} GiB free"
+    return None
+
+
+def load_catalog(path):
+    import pandas as pd
+    from src.compact import compact_frame
+
+    # The same compact representation the app serves from
+    return compact_frame(pd.read_csv(path))
+
+
+def run_fit(catalog_path, iterations):
+    from src.recommender.content_based import ContentBasedRecommender
+
+    catalog = load_catalog(catalog_path)
+    start = time.perf_counter()
+    ContentBasedRecommender().fit(catalog)
+    return {'fit_seconds': round(time.perf_counter() - start, 4)}
+
+
+def run_recommend(catalog_path, iterations):
+    from src.recommender.content_based import ContentBasedRecommender
+
+    catalog = load_catalog(catalog_path)
+    recommender = ContentBasedRecommender().fit(catalog)
+    rng = np.random.default_rng(1)
+
+    samples = []
+    for attraction_id in rng.integers(0, len(catalog), size=iterations):
+        start = time.perf_counter()
+        recommender.recommend(int(attraction_id), top_n=5)
+        samples.append(time.perf_counter() - start)
+    return {'latency': latency_stats(samples)}
+
+
+def run_recommend_by_preferences(catalog_path, iterations):
+    from src.recommender.content_based import ContentBasedRecommender
+
+    catalog = load_catalog(catalog_path)
+    recommender = ContentBasedRecommender()
+    # Preference filtering only reads the catalog; no similarity matrix needed
+    recommender.attractions_df = catalog
+
+    preferences = [
+        {'preferred_category': 'Trekking', 'max_cost': 1000},
+        {'preferred_category': 'Religious Site'},
+        {'max_cost': 200, 'difficulty': 'Easy'},
+        {},
+    ]
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        recommender.recommend_by_preferences(**preferences[i % len(preferences)])
+        samples.append(time.perf_counter() - start)
+    return {'latency': latency_stats(samples)}
+
+
+def run_api(catalog_path, iterations):
+    """Import the app against the synthetic catalog and time each endpoint."""
+    start = time.perf_counter()
+    # The app logs to stdout at import; keep the child's stdout for the JSON result only
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+    startup_seconds = time.perf_counter() - start
+
+    client = app_module.app.test_client()
+    num_attractions = len(app_module.catalog.current().attractions_df)
+    rng = np.random.default_rng(2)
+
+    endpoints = {}
+    for method, path, body in API_REQUESTS:
+        samples, errors = [], 0
+        for _ in range(iterations):
+            attraction_id = int(rng.integers(0, num_attractions))
+            ids = rng.integers(0, num_attractions, size=6).tolist()
+            url = path.format(id=attraction_id)
+            payload = None
+            if body is not None:
+                payload = {k: (ids if v == '{ids}' else v) for k, v in body.items()}
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                if method == 'GET':
+                    response = client.get(url)
+                else:
+                    response = client.post(url, json=payload)
+                samples.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+
+        endpoints[f"{method} {path.split('?')[0]}"] = dict(latency_stats(samples), errors=errors)
+
+    return {
+        'startup_seconds': round(startup_seconds, 4),
+        'startup_phases_ms': app_module.startup_timer.report()['phases_ms'],
+        'endpoints': endpoints,
+    }
+
+
+CASE_RUNNERS = {
+    'fit': run_fit,
+    'recommend': run_recommend,
+    'recommend_by_preferences': run_recommend_by_preferences,
+    'api': run_api,
+}
+
+
+def run_child(case, catalog_path, iterations):
+    start = time.perf_counter()
+    result = CASE_RUNNERS[case](catalog_path, iterations)
+    result['wall_seconds'] = round(time.perf_counter() - start, 4)
+    result['peak_rss_mb'] = peak_rss_mb()
+    print(json.dumps(result))
+
+
+def run_case(case, size, catalog_path, iterations, scratch, timeout):
+    """Run one case in a subprocess and return its parsed result."""
+    env = dict(os.environ)
+    env['FLASK_CATALOG_PATH'] = catalog_path
+    env['FLASK_SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(scratch, f'bench-{size}.db')}"
+    env['FLASK_MAIL_BACKEND'] = 'console'
+    # Keep the columnar table and artifact for the real catalog out of the run
+    env['FLASK_CATALOG_COLUMNAR_DIR'] = os.path.join(scratch, 'no-columnar')
+    env['FLASK_RECOMMENDER_ARTIFACT_DIR'] = os.path.join(scratch, 'no-artifact')
+
+    try:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', case,
+             '--catalog', catalog_path, '--iterations', str(iterations)],
+            env=env, cwd=BASE_DIR, capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return {'error': f"timed out after {timeout}s"}
+    if output.returncode != 0:
+        return {'error': (output.stderr.strip().splitlines() or ['exit code %d' % output.returncode])[-1]}
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def print_summary(runs):
+    print(f"{'size':>9} {'case':<26} {'target':<32} {'wall s':>8} {'rss MB':>8} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for run in runs:
+        result = run['result']
+        prefix = f"{run['size']:>9} {run['case']:<26}"
+        if 'skipped' in result or 'error' in result:
+            print(f"{prefix} {result.get('skipped') or 'ERROR: ' + result['error']}")
+            continue
+        rows = result.get('endpoints') or {'': result.get('latency', {})}
+        for target, stats in rows.items():
+            print(f"{prefix} {target:<32} {result['wall_seconds']:>8} {result['peak_rss_mb']:>8} "
+                  f"{stats.get('p50_ms', '-'):>9} {stats.get('p99_ms', '-'):>9} {stats.get('errors', '-'):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help='Catalog sizes')
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    parser.add_argument('--iterations', type=int, default=100, help='Timed calls per latency measurement')
+    parser.add_argument('--timeout', type=int, default=1800, help='Seconds before a case is abandoned')
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic catalog seed')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--child', choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument('--catalog', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.catalog, args.iterations)
+        return
+
+    runs = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for size in args.sizes:
+            catalog_path = os.path.join(scratch, f'attractions-{size}.csv')
+            start = time.perf_counter()
+            synthetic_catalog(size, seed=args.seed).to_csv(catalog_path, index=False)
+            print(f"Generated {size:,} attractions in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+            for case in args.cases:
+                reason = skip_reason(case, size)
+                if reason:
+                    result = {'skipped': reason}
+                else:
+                    result = run_case(case, size, catalog_path, args.iterations, scratch, args.timeout)
+                runs.append({'size': size, 'case': case, 'result': result})
+                print(f"  {case}: {'done' if 'wall_seconds' in result else result}", file=sys.stderr)
+
+    print_summary(runs)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'iterations': args.iterations,
+                'seed': args.seed,
+                'python': sys.version.split()[0],
+                'runs': runs,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
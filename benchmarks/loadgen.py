@@ -0,0 +1,388 @@
+"""
+Load generator replaying a realistic traffic mix against a running server.
+
+Virtual users are drawn from users.csv; each one browses, asks for similar
+attractions and preference matches, requests explanations and itineraries
+for attractions it rated in user_ratings.csv, reports analytics clicks and
+occasionally sends a conversion request. Concurrency is ramped through
+stages, and every stage reports throughput, p50/p95/p99 and error rate per
+endpoint, so the saturation point of a worker model is the stage where
+throughput stops growing while latency keeps climbing.
+
+Run the server with the console mail backend (FLASK_MAIL_BACKEND=console)
+so conversion requests do not send real email, or let --server start it
+with that backend and a scratch database.
+
+Usage:
+    python benchmarks/loadgen.py --url http://127.0.0.1:8000
+    python benchmarks/loadgen.py --server "gunicorn -w 4 -b 127.0.0.1:8000 app:app" --stages 1 4 16 64
+    python benchmarks/loadgen.py --server "gunicorn -w 2 -k gthread --threads 8 -b 127.0.0.1:8000 app:app" --output gthread.json
+"""
+import argparse
+import csv
+import http.client
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data', 'processed')
+
+# Relative frequency of each endpoint in the default mix
+DEFAULT_MIX = {
+    'browse': 30,
+    'similar': 20,
+    'preferences': 15,
+    'explain': 10,
+    'itinerary': 8,
+    'analytics': 15,
+    'conversion': 2,
+}
+
+# Cost ceilings matching the budget levels in users.csv
+BUDGET_MAX_COST = {'Budget': 300, 'Mid-range': 1000, 'Luxury': 5000}
+
+DIFFICULTY_BY_FITNESS = {'Low': 'Easy', 'Medium': 'Moderate', 'High': 'Hard'}
+
+SEARCH_TERMS = ('lake', 'trek', 'temple', 'everest', 'wildlife', 'pokhara', 'stupa', 'rafting')
+
+
+def load_sessions(users_path, ratings_path):
+    """
+    One virtual user per users.csv row, with the attractions they rated.
+
+    Returns:
+        List of dicts with the user's profile fields plus 'session_id' and
+        'attraction_ids' (rated attractions, best rated first)
+    """
+    rated = defaultdict(list)
+    with open(ratings_path, newline='') as f:
+        for row in csv.DictReader(f):
+            rated[row['user_id']].append((-int(row['rating']), int(row['attraction_id'])))
+
+    sessions = []
+    with open(users_path, newline='') as f:
+        for row in csv.DictReader(f):
+            attraction_ids = [attraction_id for _, attraction_id in sorted(rated.get(row['user_id'], []))]
+            if not attraction_ids:
+                continue
+            sessions.append(dict(row, session_id=f"load-{row['user_id']}", attraction_ids=attraction_ids))
+    return sessions
+
+
+def build_browse(session, rng):
+    choice = rng.random()
+    if choice < 0.4:
+        return 'GET', f"/api/attraction/{rng.choice(session['attraction_ids'])}", None
+    if choice < 0.7:
+        return 'GET', f"/api/attractions?category={quote(session['preferred_category'])}", None
+    return 'GET', f"/api/search?q={rng.choice(SEARCH_TERMS)}", None
+
+
+def build_similar(session, rng):
+    return 'GET', f"/api/recommend/similar/{rng.choice(session['attraction_ids'][:5])}", None
+
+
+def build_preferences(session, rng):
+    return 'POST', '/api/recommend/preferences', {
+        'category': session['preferred_category'],
+        'max_cost': BUDGET_MAX_COST.get(session['budget_level']),
+        'difficulty': DIFFICULTY_BY_FITNESS.get(session['fitness_level']) if rng.random() < 0.5 else None,
+        'top_n': 10
+    }
+
+
+def build_explain(session, rng):
+    return 'POST', '/api/recommend/explain', {
+        'attraction_id': rng.choice(session['attraction_ids']),
+        'preferences': {
+            'category': session['preferred_category'],
+            'max_cost': BUDGET_MAX_COST.get(session['budget_level'])
+        }
+    }
+
+
+def build_itinerary(session, rng):
+    ids = session['attraction_ids']
+    return 'POST', '/api/itinerary/generate', {
+        'attraction_ids': rng.sample(ids, min(len(ids), rng.randint(2, 5))),
+        'days': rng.randint(3, 14),
+        'optimize_route': rng.random() < 0.5
+    }
+
+
+def build_analytics(session, rng):
+    return 'POST', '/api/analytics/track', {
+        'session_id': session['session_id'],
+        'recommendation_type': rng.choice(('similar', 'preferences')),
+        'attraction_id': rng.choice(session['attraction_ids']),
+        'clicked': True,
+        'preferences': {'category': session['preferred_category']}
+    }
+
+
+def build_conversion(session, rng):
+    return 'POST', '/api/conversion/request', {
+        'type': rng.choice(('email', 'expert', 'quote')),
+        'user_data': {'email': f"{session['session_id']}@example.com", 'phone': '+977-1-000000'},
+        'attraction_ids': session['attraction_ids'][:3]
+    }
+
+
+def build_save_preferences(session, rng):
+    return 'POST', '/api/preferences/save', {
+        'session_id': session['session_id'],
+        'category': session['preferred_category'],
+        'max_cost': BUDGET_MAX_COST.get(session['budget_level']),
+        'difficulty': DIFFICULTY_BY_FITNESS.get(session['fitness_level'])
+    }
+
+
+def build_load_preferences(session, rng):
+    return 'GET', f"/api/preferences/load?session_id={session['session_id']}", None
+
+
+BUILDERS = {
+    'browse': build_browse,
+    'similar': build_similar,
+    'preferences': build_preferences,
+    'explain': build_explain,
+    'itinerary': build_itinerary,
+    'analytics': build_analytics,
+    'conversion': build_conversion,
+    'save_preferences': build_save_preferences,
+    'load_preferences': build_load_preferences,
+}
+
+
+def parse_mix(values):
+    """Turn ['browse=30', 'similar=20'] into a weights dict."""
+    mix = {}
+    for value in values:
+        name, _, weight = value.partition('=')
+        if name not in BUILDERS:
+            raise ValueError(f"Unknown endpoint {name!r}; choose from {', '.join(BUILDERS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Client:
+    """One keep-alive HTTP connection, reopened after errors."""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, method, path, body=None):
+        """
+        Returns:
+            HTTP status, or an error description for failed connections
+        """
+        if self.connection is None:
+            self.connection = self.connection_class(self.netloc, timeout=self.timeout)
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            self.connection.request(method, self.prefix + path, json.dumps(body) if body is not None else None, headers)
+            response = self.connection.getresponse()
+            response.read()
+            if response.will_close:
+                self.close()
+            return response.status
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            return type(e).__name__
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def run_stage(url, sessions, mix, concurrency, duration, timeout, seed):
+    """
+    Run `concurrency` virtual users for `duration` seconds.
+
+    Returns:
+        (samples, elapsed) where samples is a list of
+        (endpoint, latency seconds, status) tuples
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def user(index):
+        rng = random.Random(seed * 1_000_003 + index)
+        client = Client(url, timeout)
+        session = rng.choice(sessions)
+        local = []
+        while time.perf_counter() < deadline:
+            # Stay on one user for a few calls, as a browsing visitor would
+            if rng.random() < 0.1:
+                session = rng.choice(sessions)
+            name = rng.choices(names, weights)[0]
+            method, path, body = BUILDERS[name](session, rng)
+            start = time.perf_counter()
+            status = client.request(method, path, body)
+            local.append((name, time.perf_counter() - start, status))
+        client.close()
+        with lock:
+            samples.extend(local)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples, elapsed):
+    """Throughput, latency percentiles and error rate per endpoint and overall."""
+    grouped = defaultdict(list)
+    for name, latency, status in samples:
+        grouped[name].append((latency, status))
+        grouped['all'].append((latency, status))
+
+    report = {}
+    for name, rows in grouped.items():
+        latencies = np.array([latency for latency, _ in rows]) * 1000
+        errors = sum(1 for _, status in rows if not isinstance(status, int) or status >= 400)
+        report[name] = {
+            'requests': len(rows),
+            'requests_per_second': round(len(rows) / elapsed, 1),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+            'p95_ms': round(float(np.percentile(latencies, 95)), 3),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+            'error_rate': round(errors / len(rows), 4),
+        }
+    return report
+
+
+def saturation_stage(stages):
+    """
+    Concurrency of the last stage that still raised throughput by at least
+    10% over the previous one; beyond it extra load only adds latency.
+    """
+    best = None
+    previous = 0.0
+    for stage in stages:
+        throughput = stage['endpoints'].get('all', {}).get('requests_per_second', 0.0)
+        if best is not None and throughput < previous * 1.1:
+            break
+        best, previous = stage['concurrency'], throughput
+    return best
+
+
+def wait_until_ready(url, process, timeout):
+    client = Client(url, timeout=5)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} before becoming ready")
+        if client.request('GET', '/api/stats') == 200:
+            client.close()
+            return
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {url} not ready after {timeout}s")
+
+
+def start_server(command, scratch, env=None):
+    """
+    Start the server command with the console mail backend and a scratch
+    database, unless `env` (extra environment variables) overrides them.
+    """
+    server_env = dict(os.environ)
+    server_env['FLASK_MAIL_BACKEND'] = 'console'
+    server_env.setdefault('FLASK_SQLALCHEMY_DATABASE_URI', f"sqlite:///{os.path.join(scratch, 'loadgen.db')}")
+    server_env.update(env or {})
+    return subprocess.Popen(shlex.split(command), cwd=BASE_DIR, env=server_env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def print_summary(stages):
+    print(f"{'users':>6} {'endpoint':<12} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for stage in stages:
+        for name, stats in sorted(stage['endpoints'].items(), key=lambda item: (item[0] == 'all', item[0])):
+            print(f"{stage['concurrency']:>6} {name:<12} {stats['requests_per_second']:>9} {stats['p50_ms']:>9} "
+                  f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['error_rate']:>8.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server under test')
+    parser.add_argument('--server', help='Command that starts the server (e.g. a gunicorn invocation); stopped at the end')
+    parser.add_argument('--stages', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32], help='Concurrent users per stage')
+    parser.add_argument('--stage-seconds', type=float, default=20, help='Duration of each stage')
+    parser.add_argument('--mix', nargs='+', help='Endpoint weights, e.g. browse=30 similar=20 (default: built-in mix)')
+    parser.add_argument('--users', default=os.path.join(DATA_DIR, 'users.csv'))
+    parser.add_argument('--ratings', default=os.path.join(DATA_DIR, 'user_ratings.csv'))
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    sessions = load_sessions(args.users, args.ratings)
+    if not sessions:
+        parser.error('No users with ratings to replay')
+
+    stages = []
+    with tempfile.TemporaryDirectory() as scratch:
+        process = start_server(args.server, scratch) if args.server else None
+        try:
+            wait_until_ready(args.url, process, timeout=120)
+            for concurrency in args.stages:
+                samples, elapsed = run_stage(args.url, sessions, mix, concurrency,
+                                             args.stage_seconds, args.timeout, args.seed)
+                stages.append({
+                    'concurrency': concurrency,
+                    'wall_seconds': round(elapsed, 3),
+                    'endpoints': summarize(samples, elapsed) if samples else {}
+                })
+                overall = stages[-1]['endpoints'].get('all', {})
+                print(f"  {concurrency} users: {overall.get('requests_per_second', 0)} req/s, "
+                      f"p99 {overall.get('p99_ms', '-')} ms", file=sys.stderr)
+        finally:
+            if process is not None:
+                process.terminate()
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    print_summary(stages)
+    saturation = saturation_stage(stages)
+    if saturation is not None:
+        print(f"Throughput stops scaling beyond {saturation} concurrent users")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'url': args.url,
+                'server': args.server,
+                'mix': mix,
+                'stage_seconds': args.stage_seconds,
+                'saturation_concurrency': saturation,
+                'stages': stages,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
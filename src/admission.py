@@ -0,0 +1,347 @@
+"""
+Admission Control
+Per-client token-bucket rate limiting and a concurrency limit that sheds excess load early.
+"""
+
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+
+# Tokens per request by endpoint; heavy endpoints cost more. Anything not
+# listed costs DEFAULT_COST, and cost-0 endpoints are never limited.
+DEFAULT_ROUTE_COSTS = {
+    'get_all_attractions': 10,
+    'search_attractions': 2,
+    'get_nearby_attractions': 2,
+    'recommend_by_preferences': 3,
+    'generate_itinerary': 5,
+    'optimize_itinerary': 5,
+    'generate_itineraries': 20,
+    'export_leads': 20,
+    'export_analytics': 20,
+    'get_metrics': 0,
+    'static': 0,
+}
+DEFAULT_COST = 1
+
+RATE_LIMITED = 429
+OVERLOADED = 503
+MESSAGES = {
+    RATE_LIMITED: 'Rate limit exceeded, please slow down',
+    OVERLOADED: 'Server is busy, please retry shortly',
+}
+
+
+def parse_costs(value):
+    """Turn 'get_all_attractions=10,search_attractions=2' into a dict (or pass a dict through)."""
+    if isinstance(value, dict):
+        return {name: float(cost) for name, cost in value.items()}
+    costs = {}
+    for item in str(value or '').split(','):
+        name, _, cost = item.strip().partition('=')
+        if name:
+            costs[name] = float(cost)
+    return costs
+
+
+def client_address(remote_addr, headers, proxy_header=None):
+    """
+    IP address that rate limits apply to.
+
+    Parameters:
+        remote_addr: Address of the peer that connected
+        headers: Request headers (case-insensitive mapping)
+        proxy_header: Header a trusted reverse proxy sets to the client's
+            address (e.g. X-Forwarded-For), or None to use remote_addr
+
+    Returns:
+        The client's IP address. Client-chosen values such as session ids are
+        never used, as a client could get a fresh bucket by changing them.
+    """
+    if proxy_header:
+        forwarded = headers.get(proxy_header)
+        if forwarded:
+            # The proxy appends the address it saw; earlier entries come from the client
+            return forwarded.split(',')[-1].strip() or remote_addr
+    return remote_addr
+
+
+class MemoryStore:
+    """Buckets and the in-flight count of this process only."""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def take(self, key, cost, rate, burst, now):
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + max(now - updated, 0) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            # Most recently used last, so the first entry is the stalest
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def acquire(self, limit):
+        with self._lock:
+            if self._in_flight >= limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+
+class FileStore:
+    """
+    Buckets and in-flight counts in a memory-mapped file shared by every
+    worker process on the host, so limits hold for the whole server.
+
+    Buckets live in a fixed-size open-addressing table. When a key's probe
+    window is full, the bucket idle the longest is replaced; a bucket idle
+    for burst/rate seconds is full again anyway, so with enough slots this
+    loses nothing. In-flight counts are kept per process, and counts of
+    processes that died mid-request are dropped when the limit is reached.
+    """
+
+    MAGIC = b'NTAC'
+    VERSION = 1
+    HEADER = struct.Struct('<4sIII')
+    # Requests in flight on the whole server, kept beside the per-process counts
+    TOTAL = struct.Struct('<q')
+    TOTAL_OFFSET = 16
+    PROCESS = struct.Struct('<ii')
+    BUCKET = struct.Struct('<Qdd')
+    HEADER_SIZE = 64
+    PROBES = 8
+
+    def __init__(self, path, slots=65536, max_processes=64):
+        self.path = path
+        self.slots = slots
+        self.max_processes = max_processes
+        self._buckets_offset = self.HEADER_SIZE + max_processes * self.PROCESS.size
+        self._size = self._buckets_offset + slots * self.BUCKET.size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._process_slot = None
+        self._fd = None
+        self._map = None
+
+    def _open(self):
+        """Map the file in this process (again after a fork: flock does not exclude a shared descriptor)."""
+        if self._pid == os.getpid():
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(fd, self.HEADER.size, 0)
+            expected = self.HEADER.pack(self.MAGIC, self.VERSION, self.max_processes, self.slots)
+            if header != expected or os.fstat(fd).st_size != self._size:
+                # New file, or one laid out for other settings: start empty
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self._size)
+                os.pwrite(fd, expected, 0)
+            self._map = mmap.mmap(fd, self._size)
+            self._process_slot = self._claim_process_slot()
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._pid = os.getpid()
+
+    def _claim_process_slot(self):
+        pid = os.getpid()
+        free = None
+        for slot in range(self.max_processes):
+            offset = self.HEADER_SIZE + slot * self.PROCESS.size
+            owner, _ = self.PROCESS.unpack_from(self._map, offset)
+            if owner == pid:
+                free = slot
+                break
+            if free is None and (owner == 0 or not _process_alive(owner)):
+                free = slot
+        if free is None:
+            raise RuntimeError(f"More than {self.max_processes} processes share {self.path}")
+        # A reused pid must not inherit a dead process's count
+        offset = self.HEADER_SIZE + free * self.PROCESS.size
+        _, stale = self.PROCESS.unpack_from(self._map, offset)
+        self.PROCESS.pack_into(self._map, offset, pid, 0)
+        self._add_total(-stale)
+        return free
+
+    def _locked(self):
+        self._open()
+        return _FileLock(self._lock, self._fd)
+
+    def take(self, key, cost, rate, burst, now):
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+        with self._locked():
+            target = None
+            stalest = None
+            for probe in range(self.PROBES):
+                offset = self._buckets_offset + ((key_hash + probe) % self.slots) * self.BUCKET.size
+                slot_hash, tokens, updated = self.BUCKET.unpack_from(self._map, offset)
+                if slot_hash == key_hash:
+                    target = offset
+                    break
+                if slot_hash == 0:
+                    target, tokens, updated = offset, burst, now
+                    break
+                if stalest is None or updated < stalest[2]:
+                    stalest = (offset, tokens, updated)
+            if target is None:
+                target, tokens, updated = stalest[0], burst, now
+
+            tokens = min(burst, tokens + max(now - updated, 0) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self.BUCKET.pack_into(self._map, target, key_hash, tokens, now)
+        return allowed, tokens
+
+    def _add_total(self, delta):
+        total, = self.TOTAL.unpack_from(self._map, self.TOTAL_OFFSET)
+        total += delta
+        self.TOTAL.pack_into(self._map, self.TOTAL_OFFSET, total)
+        return total
+
+    def _reap(self):
+        """Drop the counts of dead processes and recount the total."""
+        total = 0
+        for slot in range(self.max_processes):
+            offset = self.HEADER_SIZE + slot * self.PROCESS.size
+            owner, count = self.PROCESS.unpack_from(self._map, offset)
+            if owner and not _process_alive(owner):
+                self.PROCESS.pack_into(self._map, offset, 0, 0)
+                continue
+            total += count
+        self.TOTAL.pack_into(self._map, self.TOTAL_OFFSET, total)
+        return total
+
+    def _add_in_flight(self, delta):
+        offset = self.HEADER_SIZE + self._process_slot * self.PROCESS.size
+        owner, count = self.PROCESS.unpack_from(self._map, offset)
+        self.PROCESS.pack_into(self._map, offset, owner, count + delta)
+        self._add_total(delta)
+
+    def acquire(self, limit):
+        with self._locked():
+            total, = self.TOTAL.unpack_from(self._map, self.TOTAL_OFFSET)
+            # Only at the limit is it worth checking for leaks from dead workers
+            if total >= limit and self._reap() >= limit:
+                return False
+            self._add_in_flight(1)
+            return True
+
+    def release(self):
+        with self._locked():
+            self._add_in_flight(-1)
+
+
+class _FileLock:
+    """Excludes other threads (threading lock) and other processes (flock)."""
+
+    __slots__ = ('lock', 'fd')
+
+    def __init__(self, lock, fd):
+        self.lock = lock
+        self.fd = fd
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        except BaseException:
+            self.lock.release()
+            raise
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            self.lock.release()
+        return False
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AdmissionController:
+    """
+    Decides, before any work is done, whether a request may run.
+
+    A request is shed with 503 when max_concurrent requests are already in
+    flight, and with 429 when its client's token bucket (refilled at `rate`
+    tokens per second up to `burst`, by default ten seconds' worth) holds
+    less than the endpoint's cost. A rate or max_concurrent of 0 turns that
+    check off.
+    """
+
+    def __init__(self, store, rate=0.0, burst=0.0, costs=None, max_concurrent=0):
+        self.store = store
+        self.rate = rate
+        self.burst = burst or rate * 10
+        self.costs = dict(DEFAULT_ROUTE_COSTS, **(costs or {}))
+        self.max_concurrent = max_concurrent
+
+    def cost(self, endpoint):
+        return self.costs.get(endpoint, DEFAULT_COST)
+
+    def enter(self, key, endpoint):
+        """
+        Admit or shed a request.
+
+        Parameters:
+            key: Client identity (its IP address, see client_address())
+            endpoint: Endpoint name, for the cost model
+
+        Returns:
+            (status, retry_after): status is None when admitted (call leave()
+            when the request finishes), else 429 or 503 with the seconds to
+            wait before retrying
+        """
+        cost = self.cost(endpoint)
+        if cost <= 0:
+            return None, 0
+
+        if self.max_concurrent and not self.store.acquire(self.max_concurrent):
+            return OVERLOADED, 1
+
+        if self.rate > 0:
+            # A cost above the burst could never be paid; it needs a full bucket instead
+            cost = min(cost, self.burst)
+            allowed, tokens = self.store.take(key, cost, self.rate, self.burst, time.time())
+            if not allowed:
+                if self.max_concurrent:
+                    self.store.release()
+                return RATE_LIMITED, max(1, math.ceil((cost - tokens) / self.rate))
+        return None, 0
+
+    def leave(self, endpoint):
+        """Release the concurrency slot taken by an admitted request."""
+        if self.max_concurrent and self.cost(endpoint) > 0:
+            self.store.release()
@@ -0,0 +1,353 @@
+"""
+Catalog Snapshots
+Immutable catalog + model bundles and a background reloader that swaps them atomically.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from src.columnar import ColumnarError, read_table
+from src.compact import compact_frame
+from src.recommender.content_based import ContentBasedRecommender
+from src.recommender.artifact import load_artifact
+from src.itinerary.builder import ItineraryBuilder
+from src.itinerary.routing import RoutePlanner
+from src.itinerary.optimizer import ItineraryOptimizer
+from src.search.spatial import SpatialIndex
+from src.search.inverted_index import InvertedIndex
+from src.search.fuzzy import FuzzyMatcher
+from src.search.autocomplete import AutocompleteIndex
+from src.utils.timing import PhaseTimer
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def catalog_version(digest):
+    """Short version label for a catalog digest."""
+    return digest[:12]
+
+
+def read_catalog(data_path, columnar_dir=None, digest=None, verify=True):
+    """
+    Load the attractions catalog, preferring its columnar table.
+
+    The CSV stays the source of truth: the columnar table is only used when
+    its manifest records the CSV's current checksum (and, with verify, its
+    own files pass their checksums), otherwise the CSV is parsed.
+
+    Parameters:
+        data_path: Path to the attractions CSV
+        columnar_dir: Columnar table to load instead of parsing the CSV
+        digest: SHA-256 of the CSV, if the caller has already hashed it
+        verify: Check every columnar file against its recorded checksum
+
+    Returns:
+        (attractions_df, version, source_format)
+    """
+    if digest is None:
+        digest = file_digest(data_path)
+
+    if columnar_dir and os.path.isdir(columnar_dir):
+        try:
+            attractions_df, _ = read_table(columnar_dir, verify=verify, source_sha256=digest)
+            return attractions_df, catalog_version(digest), 'columnar'
+        except ColumnarError as e:
+            print(f"Columnar catalog not used, parsing CSV instead: {e}")
+
+    # If the file is replaced after it was hashed, its new digest differs
+    # from this version, so the next reload check picks the change up
+    return pd.read_csv(data_path), catalog_version(digest), 'csv'
+
+
+# Indexes only some endpoints need; with defer=True they are built on first
+# use (or by warm()) instead of before the snapshot starts serving
+DEFERRED_INDEXES = {
+    'spatial_index': lambda snapshot: SpatialIndex.from_frame(snapshot.attractions_df),
+    'search_index': lambda snapshot: InvertedIndex(snapshot.attractions_df),
+    'fuzzy_matcher': lambda snapshot: FuzzyMatcher(snapshot.search_index.terms()),
+    'autocomplete_index': lambda snapshot: AutocompleteIndex(snapshot.attractions_df)
+}
+
+
+class CatalogSnapshot:
+    """
+    Everything derived from one version of the catalog file.
+
+    A snapshot is never modified after it is built: a reload builds a new
+    one and replaces the reference, so a request that grabbed a snapshot
+    keeps a consistent catalog, model and index set until it finishes.
+    Deferred indexes are the one exception to eager construction: each is
+    built once, under a lock, the first time it is read.
+    """
+
+    __slots__ = (
+        'version', 'generation', 'source_path', 'source_mtime', 'source_format', 'loaded_at',
+        'attractions_df', 'recommender', 'recommender_source', 'itinerary_builder',
+        'route_planner', 'itinerary_optimizer', '_lock'
+    ) + tuple(DEFERRED_INDEXES)
+
+    def __init__(self, **fields):
+        object.__setattr__(self, '_lock', threading.RLock())
+        for name in self.__slots__:
+            if name in fields:
+                object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError('CatalogSnapshot is immutable')
+
+    def __getattr__(self, name):
+        # Only reached for slots that have not been set yet
+        if name not in DEFERRED_INDEXES:
+            raise AttributeError(name)
+        with self._lock:
+            try:
+                return object.__getattribute__(self, name)
+            except AttributeError:
+                value = DEFERRED_INDEXES[name](self)
+                object.__setattr__(self, name, value)
+                return value
+
+    def pending(self):
+        """Deferred indexes that have not been built yet."""
+        return [name for name in DEFERRED_INDEXES if not self._is_built(name)]
+
+    def _is_built(self, name):
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return False
+        return True
+
+    def warm(self):
+        """Build every deferred index now."""
+        for name in DEFERRED_INDEXES:
+            getattr(self, name)
+
+    def info(self):
+        """JSON-serializable description of this snapshot."""
+        return {
+            'version': self.version,
+            'generation': self.generation,
+            'source_mtime': datetime.fromtimestamp(self.source_mtime).isoformat(),
+            'source_format': self.source_format,
+            'loaded_at': self.loaded_at.isoformat(),
+            'total_attractions': int(len(self.attractions_df)),
+            'recommender_ready': self.recommender is not None,
+            'recommender_source': self.recommender_source,
+            'pending_indexes': self.pending()
+        }
+
+
+def build_snapshot(data_path, generation=1, artifact_dir=None, columnar_dir=None, defer=False, timer=None,
+                   digest=None, verify=True):
+    """
+    Load the catalog and build the model and every index over it.
+
+    Parameters:
+        data_path: Path to the attractions CSV
+        generation: Sequence number of this snapshot within the process
+        artifact_dir: Recommender artifact to use when it matches the catalog
+        columnar_dir: Columnar table to load instead of parsing the CSV
+        defer: Build the DEFERRED_INDEXES lazily instead of now
+        timer: Optional PhaseTimer that receives per-phase timings
+        digest: SHA-256 of the CSV, if the caller has already hashed it
+        verify: Check the columnar table's file checksums (see read_catalog)
+
+    Returns:
+        CatalogSnapshot
+
+    Raises:
+        OSError / pandas errors if the catalog cannot be read. A recommender
+        that fails to fit is left as None, as at startup.
+    """
+    timer = timer or PhaseTimer()
+
+    with timer.phase('catalog'):
+        source_mtime = os.path.getmtime(data_path)
+        attractions_df, version, source_format = read_catalog(data_path, columnar_dir, digest=digest, verify=verify)
+        attractions_df = compact_frame(attractions_df)
+
+    with timer.phase('recommender'):
+        recommender, recommender_source = None, None
+        if artifact_dir:
+            recommender = load_artifact(artifact_dir, attractions_df, version)
+            recommender_source = 'artifact' if recommender is not None else None
+
+        if recommender is None:
+            try:
+                recommender = ContentBasedRecommender()
+                recommender.fit(attractions_df)
+                recommender_source = 'fit'
+            except Exception as e:
+                print(f"Error initializing recommender: {e}")
+                recommender = None
+
+    with timer.phase('itinerary'):
+        itinerary_builder = ItineraryBuilder(attractions_df)
+        snapshot = CatalogSnapshot(
+            version=version,
+            generation=generation,
+            source_path=data_path,
+            source_mtime=source_mtime,
+            source_format=source_format,
+            loaded_at=datetime.utcnow(),
+            attractions_df=attractions_df,
+            recommender=recommender,
+            recommender_source=recommender_source,
+            itinerary_builder=itinerary_builder,
+            route_planner=RoutePlanner(itinerary_builder),
+            itinerary_optimizer=ItineraryOptimizer(itinerary_builder, attractions_df)
+        )
+
+    if not defer:
+        with timer.phase('indexes'):
+            snapshot.warm()
+    return snapshot
+
+
+class CatalogReloader:
+    """
+    Holds the active CatalogSnapshot and rebuilds it in the background.
+
+    Readers call current() and get whatever snapshot is active; they never
+    wait on a rebuild. At most one rebuild runs at a time, and a failed
+    rebuild keeps the previous snapshot serving and records the error.
+    """
+
+    def __init__(self, data_path, artifact_dir=None, columnar_dir=None):
+        self.data_path = data_path
+        self.artifact_dir = artifact_dir
+        self.columnar_dir = columnar_dir
+        self.last_error = None
+        self._snapshot = None
+        self._generation = 0
+        self._build_lock = threading.Lock()
+        self._poller = None
+
+    def current(self):
+        """The active snapshot, or None if no catalog has loaded yet."""
+        return self._snapshot
+
+    @property
+    def reloading(self):
+        return self._build_lock.locked()
+
+    def load(self, force=False, defer=False, timer=None, verify=False):
+        """
+        Rebuild in the calling thread and swap in the result.
+
+        Parameters:
+            force: Rebuild even if the file contents are unchanged
+            defer: Leave the DEFERRED_INDEXES to be built on first use
+            timer: Optional PhaseTimer for the build phases
+            verify: Checksum every columnar file. Off by default, as this is
+                the boot path: the table was checked when it was written, and
+                reload() checks it again when the catalog changes.
+
+        Returns:
+            True if a new snapshot was installed
+        """
+        if not self._build_lock.acquire(blocking=False):
+            return False
+        try:
+            return self._rebuild(force, defer, timer, verify)
+        finally:
+            self._build_lock.release()
+
+    def reload(self, force=False):
+        """
+        Start a background rebuild. The new snapshot is fully built (no
+        deferred indexes) before it replaces the active one.
+
+        Returns:
+            The rebuild thread, or None if one is already running
+        """
+        if not self._build_lock.acquire(blocking=False):
+            return None
+
+        def run():
+            try:
+                self._rebuild(force)
+            finally:
+                self._build_lock.release()
+
+        thread = threading.Thread(target=run, name='catalog-reload', daemon=True)
+        thread.start()
+        return thread
+
+    def _rebuild(self, force, defer=False, timer=None, verify=True):
+        try:
+            if not os.path.exists(self.data_path):
+                raise FileNotFoundError(f"Catalog not found at {self.data_path}")
+
+            # Hashed once here and passed on, for both the check and the build
+            digest = file_digest(self.data_path)
+            active = self._snapshot
+            if not force and active is not None and catalog_version(digest) == active.version:
+                return False
+
+            started = time.perf_counter()
+            snapshot = build_snapshot(
+                self.data_path, generation=self._generation + 1,
+                artifact_dir=self.artifact_dir, columnar_dir=self.columnar_dir,
+                defer=defer, timer=timer, digest=digest, verify=verify
+            )
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"Error reloading catalog (keeping previous snapshot): {e}")
+            return False
+
+        # A single reference assignment is the atomic swap
+        self._generation = snapshot.generation
+        self._snapshot = snapshot
+        self.last_error = None
+        print(f"Loaded {len(snapshot.attractions_df)} attractions "
+              f"(catalog {snapshot.version}, built in {time.perf_counter() - started:.2f}s)")
+        return True
+
+    def watch(self, interval):
+        """
+        Poll the catalog file's mtime and size, reloading when they change.
+
+        Parameters:
+            interval: Seconds between checks
+        """
+        if self._poller is not None:
+            return self._poller
+
+        last = self._stat()
+
+        def poll():
+            nonlocal last
+            while True:
+                time.sleep(interval)
+                stat = self._stat()
+                if stat != last and stat is not None:
+                    thread = self.reload()
+                    if thread is None:
+                        continue  # Retry on the next tick once the running rebuild finishes
+                    thread.join()
+                last = stat
+
+        self._poller = threading.Thread(target=poll, name='catalog-watch', daemon=True)
+        self._poller.start()
+        return self._poller
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.data_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
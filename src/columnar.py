@@ -0,0 +1,330 @@
+"""
+Columnar Catalog Storage
+Binary column files for the processed CSVs, memory-mapped at load instead of parsed.
+"""
+
+import argparse
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.compact import compact_frame
+
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+STRING_TABLE_FILE = 'strings.bin'
+STRING_SEPARATOR = '\x00'
+ARROW_FILE = 'table.arrow'
+FORMATS = ('npy', 'arrow')
+
+# Tables stored in the compact dtypes the app uses, so loading them needs no conversion
+COMPACT_TABLES = ('attractions',)
+
+
+class ColumnarError(Exception):
+    """A columnar table is missing, stale, damaged or of an unknown version."""
+
+
+def sha256_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def arrow_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _write_npy(path, array):
+    with open(path + '.tmp', 'wb') as f:
+        np.save(f, array, allow_pickle=False)
+    os.replace(path + '.tmp', path)
+
+
+def _encode_strings(df, columns):
+    """
+    Dictionary-encode string columns against one shared string table.
+
+    Returns:
+        (codes, table) where codes maps column -> int32 codes (-1 for missing)
+        and table is the list of distinct strings in first-seen order
+    """
+    table, index, codes = [], {}, {}
+    for column in columns:
+        values = df[column].tolist()
+        column_codes = np.empty(len(values), dtype=np.int32)
+        for row, value in enumerate(values):
+            if not isinstance(value, str):
+                column_codes[row] = -1
+                continue
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(table)
+                table.append(value)
+            column_codes[row] = code
+        codes[column] = column_codes
+    return codes, table
+
+
+def _read_string_table(path, num_strings):
+    """
+    Shared string table as an object array with a trailing None, so that
+    indexing with code -1 yields a missing value.
+    """
+    with open(path, 'rb') as f:
+        blob = f.read()
+    strings = blob.decode('utf-8').split(STRING_SEPARATOR) if num_strings else []
+    if len(strings) != num_strings:
+        raise ValueError(f"String table has {len(strings)} entries, expected {num_strings}")
+    return np.array(strings + [None], dtype=object)
+
+
+def write_table(df, directory, export_format=None, source_path=None):
+    """
+    Write a DataFrame as a columnar table.
+
+    Numeric columns become one .npy file each, in their own dtype; string
+    and categorical columns become int32 code arrays into a shared UTF-8
+    string table. With the 'arrow' format
+    the whole frame is a single uncompressed Arrow IPC file instead. The
+    manifest is written last, so a partially written table is never valid.
+
+    Parameters:
+        df: Frame to store
+        directory: Output directory (created if missing)
+        export_format: 'npy' or 'arrow' (default: arrow when pyarrow is installed)
+        source_path: CSV the frame was read from; its checksum is recorded so
+            stale tables can be detected
+
+    Returns:
+        The manifest dict
+    """
+    export_format = export_format or ('arrow' if arrow_available() else 'npy')
+    if export_format not in FORMATS:
+        raise ValueError(f"Unknown columnar format: {export_format}")
+    os.makedirs(directory, exist_ok=True)
+
+    columns, num_strings = [], None
+    if export_format == 'arrow':
+        import pyarrow as pa
+
+        path = os.path.join(directory, ARROW_FILE)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(path + '.tmp', 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(path + '.tmp', path)
+        files = [ARROW_FILE]
+        columns = [{'name': name, 'dtype': str(df[name].dtype)} for name in df.columns]
+    else:
+        string_columns = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+        for column in string_columns:
+            dtype = df[column].dtype
+            if not (pd.api.types.is_string_dtype(dtype) or dtype == object or isinstance(dtype, pd.CategoricalDtype)):
+                raise ValueError(f"Column {column} has unsupported dtype {df[column].dtype}")
+        codes, table = _encode_strings(df, string_columns)
+        if any(STRING_SEPARATOR in value for value in table):
+            raise ValueError('String values may not contain NUL characters')
+        num_strings = len(table)
+
+        # One UTF-8 blob, NUL-separated, so the loader decodes it in a single pass
+        path = os.path.join(directory, STRING_TABLE_FILE)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(STRING_SEPARATOR.join(table).encode('utf-8'))
+        os.replace(path + '.tmp', path)
+
+        files = [STRING_TABLE_FILE]
+        for i, name in enumerate(df.columns):
+            is_string = name in codes
+            filename = f"{i:03d}.codes.npy" if is_string else f"{i:03d}.npy"
+            _write_npy(os.path.join(directory, filename), codes[name] if is_string else df[name].to_numpy())
+            files.append(filename)
+            columns.append({
+                'name': name,
+                'kind': 'string' if is_string else 'numeric',
+                'dtype': str(df[name].dtype),
+                'file': filename
+            })
+
+    return _write_manifest(directory, export_format, len(df), num_strings, columns, files, source_path)
+
+
+def write_chunked_table(chunks, directory, num_rows, dtypes):
+    """
+    Write a numeric table from a stream of DataFrame chunks.
+
+    Each column is preallocated as a memory-mapped .npy file and filled
+    chunk by chunk, so tables far larger than memory can be written. The
+    result is an ordinary 'npy' table that read_table loads.
+
+    Parameters:
+        chunks: Iterable of DataFrames with (at least) the columns in dtypes
+        directory: Output directory (created if missing)
+        num_rows: Total rows across all chunks
+        dtypes: Ordered mapping of column name -> numpy dtype (numeric or datetime64)
+
+    Returns:
+        The manifest dict
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    # No string columns, but read_table expects a string table
+    path = os.path.join(directory, STRING_TABLE_FILE)
+    with open(path + '.tmp', 'wb'):
+        pass
+    os.replace(path + '.tmp', path)
+
+    files, columns, arrays = [STRING_TABLE_FILE], [], {}
+    for i, (name, dtype) in enumerate(dtypes.items()):
+        filename = f"{i:03d}.npy"
+        arrays[name] = np.lib.format.open_memmap(
+            os.path.join(directory, filename) + '.tmp', mode='w+', dtype=dtype, shape=(num_rows,)
+        )
+        files.append(filename)
+        columns.append({'name': name, 'kind': 'numeric', 'dtype': str(np.dtype(dtype)), 'file': filename})
+
+    offset = 0
+    for chunk in chunks:
+        end = offset + len(chunk)
+        if end > num_rows:
+            raise ValueError(f"Chunks hold more than the expected {num_rows} rows")
+        for name, array in arrays.items():
+            array[offset:end] = chunk[name].to_numpy()
+        offset = end
+    if offset != num_rows:
+        raise ValueError(f"Chunks hold {offset} rows, expected {num_rows}")
+
+    for column in columns:
+        arrays.pop(column['name']).flush()
+        path = os.path.join(directory, column['file'])
+        os.replace(path + '.tmp', path)
+
+    return _write_manifest(directory, 'npy', num_rows, 0, columns, files)
+
+
+def _write_manifest(directory, export_format, num_rows, num_strings, columns, files, source_path=None):
+    """Checksum the table files and write the manifest, which marks the table complete."""
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'format': export_format,
+        'num_rows': int(num_rows),
+        'num_strings': num_strings,
+        'columns': columns,
+        'checksums': {name: sha256_file(os.path.join(directory, name)) for name in files},
+        'source': {
+            'file': os.path.basename(source_path),
+            'sha256': sha256_file(source_path)
+        } if source_path else None,
+        'created_at': datetime.utcnow().isoformat()
+    }
+    with open(os.path.join(directory, MANIFEST_FILE) + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(os.path.join(directory, MANIFEST_FILE) + '.tmp', os.path.join(directory, MANIFEST_FILE))
+    return manifest
+
+
+def read_manifest(directory):
+    path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ColumnarError(f"Cannot read {path}: {e}")
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ColumnarError(f"Unsupported columnar format version {manifest.get('format_version')}")
+    return manifest
+
+
+def read_table(directory, verify=True, source_sha256=None):
+    """
+    Load a columnar table written by write_table.
+
+    Column files are memory-mapped. Numeric columns of an 'npy' table stay
+    mapped (read-only, copied on write); string columns are decoded.
+
+    Parameters:
+        directory: Table directory
+        verify: Check every file against its recorded SHA-256. This reads the
+            whole table, so callers skip it for tables already checked
+        source_sha256: If given, the table must have been built from a source
+            file with this checksum
+
+    Returns:
+        (DataFrame, manifest)
+
+    Raises:
+        ColumnarError if the table is missing, stale or fails validation
+    """
+    manifest = read_manifest(directory)
+    if source_sha256 is not None and (manifest.get('source') or {}).get('sha256') != source_sha256:
+        raise ColumnarError('Columnar table is stale (built from a different source file)')
+
+    if verify:
+        for name, expected in manifest['checksums'].items():
+            path = os.path.join(directory, name)
+            if not os.path.exists(path) or sha256_file(path) != expected:
+                raise ColumnarError(f"Checksum mismatch for {path}")
+
+    try:
+        if manifest['format'] == 'arrow':
+            df = _read_arrow(os.path.join(directory, ARROW_FILE))
+        else:
+            df = _read_npy(directory, manifest)
+    except (OSError, ValueError, ImportError) as e:
+        raise ColumnarError(f"Cannot load columnar table in {directory}: {e}")
+
+    if len(df) != manifest['num_rows'] or list(df.columns) != [c['name'] for c in manifest['columns']]:
+        raise ColumnarError(f"Columnar table in {directory} does not match its manifest")
+    return df, manifest
+
+
+def _read_arrow(path):
+    import pyarrow as pa
+
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def _read_npy(directory, manifest):
+    strings = _read_string_table(os.path.join(directory, STRING_TABLE_FILE), manifest['num_strings'])
+
+    data = {}
+    for column in manifest['columns']:
+        values = np.load(os.path.join(directory, column['file']), mmap_mode='r', allow_pickle=False)
+        if column['kind'] == 'string':
+            data[column['name']] = pd.array(strings[values], dtype=column['dtype'])
+        else:
+            data[column['name']] = values
+    # copy=False keeps the numeric columns backed by their memory maps
+    return pd.DataFrame(data, copy=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert the processed CSVs into columnar tables.')
+    parser.add_argument('--input', default='data/processed')
+    parser.add_argument('--output', default='data/columnar')
+    parser.add_argument('--format', choices=FORMATS, default=None,
+                        help='arrow when pyarrow is installed, otherwise npy')
+    args = parser.parse_args()
+
+    for csv_path in sorted(glob.glob(os.path.join(args.input, '*.csv'))):
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        df = pd.read_csv(csv_path)
+        if name in COMPACT_TABLES:
+            df = compact_frame(df)
+        manifest = write_table(df, os.path.join(args.output, name), args.format, source_path=csv_path)
+        print(f"{name}: {manifest['num_rows']} rows, {len(manifest['columns'])} columns ({manifest['format']})")
+
+
+if __name__ == '__main__':
+    main()
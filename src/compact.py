@@ -0,0 +1,138 @@
+"""
+Compact Catalog
+Dictionary-encoded categoricals and downcast numerics for the in-memory catalog.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+# Low-cardinality text columns, stored as categoricals. Categories are kept
+# in lexical order so sorting by code matches sorting by the strings.
+CATEGORICAL_COLUMNS = ('category', 'region', 'difficulty', 'best_season')
+
+# Bounded, low-precision values (a 0-5 rating, whole or half days) that fit
+# float32 exactly enough; coordinates stay float64
+FLOAT32_COLUMNS = ('rating', 'duration_days')
+
+INTEGER_DTYPES = (np.int16, np.int32, np.int64)
+
+
+def smallest_integer_dtype(values):
+    """Narrowest of int16/int32/int64 that holds every value."""
+    if len(values) == 0:
+        return INTEGER_DTYPES[0]
+    low, high = values.min(), values.max()
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.int64
+
+
+def compact_frame(attractions_df):
+    """
+    Re-encode a catalog frame with compact dtypes.
+
+    Parameters:
+        attractions_df: Catalog as parsed (object/str text, int64/float64 numbers)
+
+    Returns:
+        New DataFrame with the same rows and columns: CATEGORICAL_COLUMNS as
+        categoricals, FLOAT32_COLUMNS as float32 and integer columns in the
+        narrowest integer type (int16 at least)
+    """
+    columns = {}
+    for name in attractions_df.columns:
+        column = attractions_df[name]
+        if name in CATEGORICAL_COLUMNS and not isinstance(column.dtype, pd.CategoricalDtype):
+            categories = sorted(column.dropna().unique())
+            column = column.astype(pd.CategoricalDtype(categories))
+        elif name in FLOAT32_COLUMNS and pd.api.types.is_float_dtype(column):
+            column = column.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            column = column.astype(smallest_integer_dtype(column.to_numpy()))
+        columns[name] = column
+    # Columns already in their compact dtype (e.g. memory-mapped) are used as they are
+    return pd.DataFrame(columns, index=attractions_df.index, copy=False)
+
+
+def widen(series):
+    """
+    float64 copy of a numeric column.
+
+    float32 values go through their shortest decimal form, so float32(4.1)
+    becomes 4.1 rather than 4.099999904632568 and results computed from a
+    compact catalog match those computed from the original.
+    """
+    if series.dtype != np.float32:
+        return series.astype(np.float64)
+    # Bounded low-precision columns have few distinct values; convert those once
+    distinct, inverse = np.unique(series.to_numpy(), return_inverse=True)
+    widened = np.array([float(str(value)) for value in distinct], dtype=np.float64)
+    return pd.Series(widened[inverse], index=series.index, name=series.name)
+
+
+def to_records(df):
+    """JSON-ready records for a (possibly compact) frame, with float32 columns widened."""
+    float32 = [name for name in df.columns if df[name].dtype == np.float32]
+    if float32:
+        df = df.assign(**{name: widen(df[name]) for name in float32})
+    return df.to_dict('records')
+
+
+def memory_report(before, after):
+    """
+    Deep memory use of two versions of a catalog frame.
+
+    Returns:
+        Dict with total bytes and bytes per attraction for each version, and
+        a per-column breakdown
+    """
+    rows = max(len(before), 1)
+    before_columns = before.memory_usage(index=False, deep=True)
+    after_columns = after.memory_usage(index=False, deep=True)
+    return {
+        'attractions': len(before),
+        'before_bytes': int(before_columns.sum()),
+        'after_bytes': int(after_columns.sum()),
+        'before_bytes_per_attraction': round(before_columns.sum() / rows, 1),
+        'after_bytes_per_attraction': round(after_columns.sum() / rows, 1),
+        'columns': {
+            name: {
+                'before_dtype': str(before[name].dtype),
+                'after_dtype': str(after[name].dtype),
+                'before_bytes': int(before_columns[name]),
+                'after_bytes': int(after_columns[name])
+            }
+            for name in before.columns
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report catalog memory use before and after compaction.')
+    parser.add_argument('--catalog', default='data/processed/attractions.csv')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Tile the catalog this many times to see the per-row cost at scale')
+    args = parser.parse_args()
+
+    before = pd.read_csv(args.catalog)
+    if args.repeat > 1:
+        before = pd.concat([before] * args.repeat, ignore_index=True)
+    report = memory_report(before, compact_frame(before))
+
+    print(f"{'column':<18} {'before':>22} {'after':>22}")
+    for name, column in report['columns'].items():
+        print(f"{name:<18} {column['before_dtype']:>10} {column['before_bytes']:>11,} "
+              f"{column['after_dtype']:>10} {column['after_bytes']:>11,}")
+    print()
+    print(f"{report['attractions']:,} attractions: "
+          f"{report['before_bytes_per_attraction']:,} -> {report['after_bytes_per_attraction']:,} bytes per attraction "
+          f"({report['before_bytes']:,} -> {report['after_bytes']:,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Database engine configuration: connection pooling, SQLite pragmas and JSON columns
+"""
+import json
+
+from sqlalchemy import event, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import JSON, TypeDecorator
+
+
+# Defaults for the engine tuning surface; any of these can be overridden in
+# config.py or through FLASK_-prefixed environment variables
+DATABASE_DEFAULTS = {
+    'DB_POOL_SIZE': 5,
+    'DB_MAX_OVERFLOW': 10,
+    'DB_POOL_TIMEOUT': 30,
+    'DB_POOL_RECYCLE': 1800,
+    'DB_POOL_PRE_PING': True,
+    'SQLITE_JOURNAL_MODE': 'WAL',
+    'SQLITE_SYNCHRONOUS': 'NORMAL',
+    'SQLITE_BUSY_TIMEOUT_MS': 5000,
+}
+
+SQLITE_JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SQLITE_SYNCHRONOUS_LEVELS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+# Dialects with a native JSON type; everything else stores serialized text
+NATIVE_JSON_DIALECTS = {'postgresql', 'sqlite', 'mysql', 'mariadb'}
+
+# Models that always get their own engine (and pool). Each bind reads
+# <BIND>_DATABASE_URI and falls back to the main database, and any tuning key
+# above can be overridden per bind, e.g. ANALYTICS_SQLITE_SYNCHRONOUS=OFF
+DEDICATED_BINDS = ('analytics',)
+
+
+class JSONColumn(TypeDecorator):
+    """
+    JSON column that uses the dialect's native type where one exists
+    (JSONB on PostgreSQL, JSON on SQLite/MySQL) and falls back to TEXT
+    with explicit serialization elsewhere.
+    """
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(JSONB(none_as_null=True))
+        if dialect.name in NATIVE_JSON_DIALECTS:
+            return dialect.type_descriptor(JSON(none_as_null=True))
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name in NATIVE_JSON_DIALECTS:
+            return value
+        return json.dumps(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name in NATIVE_JSON_DIALECTS:
+            return value
+        return json.loads(value)
+
+
+def _option(config, key, bind_key=None):
+    if bind_key:
+        scoped = f"{bind_key.upper()}_{key}"
+        if scoped in config:
+            return config[scoped]
+    return config.get(key, DATABASE_DEFAULTS[key])
+
+
+def engine_options(config, uri, bind_key=None):
+    """
+    Build SQLAlchemy create_engine() options for a database URI
+
+    Args:
+        config: Flask config mapping
+        uri: Database URI the options are for
+        bind_key: Optional bind whose scoped overrides take precedence
+
+    Returns:
+        dict: Keyword arguments for create_engine()
+    """
+    options = {'pool_pre_ping': bool(_option(config, 'DB_POOL_PRE_PING', bind_key))}
+
+    # SQLite uses its own single-file pools; sizing only applies to server databases
+    if not str(uri).startswith('sqlite'):
+        options.update({
+            'pool_size': int(_option(config, 'DB_POOL_SIZE', bind_key)),
+            'max_overflow': int(_option(config, 'DB_MAX_OVERFLOW', bind_key)),
+            'pool_timeout': int(_option(config, 'DB_POOL_TIMEOUT', bind_key)),
+            'pool_recycle': int(_option(config, 'DB_POOL_RECYCLE', bind_key)),
+        })
+
+    return options
+
+
+def sqlite_pragmas(config, bind_key=None):
+    """
+    Validated SQLite pragmas applied to every new connection
+
+    Returns:
+        list: (pragma, value) pairs
+    """
+    journal_mode = str(_option(config, 'SQLITE_JOURNAL_MODE', bind_key)).upper()
+    synchronous = str(_option(config, 'SQLITE_SYNCHRONOUS', bind_key)).upper()
+
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {journal_mode}")
+    if synchronous not in SQLITE_SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {synchronous}")
+
+    return [
+        ('journal_mode', journal_mode),
+        ('synchronous', synchronous),
+        ('busy_timeout', int(_option(config, 'SQLITE_BUSY_TIMEOUT_MS', bind_key))),
+    ]
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Run the given pragmas on each new DBAPI connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in pragmas:
+                cursor.execute(f"PRAGMA {pragma}={value}")
+        finally:
+            cursor.close()
+
+
+def install_query_spans(engine):
+    """Time every statement on the engine as a 'db.query' span (see src.observability.tracing)"""
+    from src.observability.tracing import KIND_CLIENT, start_span
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _start_span(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_spans', []).append(start_span(
+            'db.query', kind=KIND_CLIENT,
+            **{'db.system': engine.dialect.name, 'db.statement': statement[:500]}
+        ))
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _end_span(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get('query_spans')
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, 'handle_error')
+    def _fail_span(exception_context):
+        spans = exception_context.connection.info.get('query_spans') if exception_context.connection else None
+        if spans:
+            spans.pop().end(exception_context.original_exception)
+
+
+def configure_binds(config, uri):
+    """
+    Build SQLALCHEMY_BINDS with engine options for every dedicated bind
+
+    Binds already present in SQLALCHEMY_BINDS keep their URL and any explicit
+    engine options; missing ones fall back to <BIND>_DATABASE_URI or the main URI.
+    """
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+
+    for bind_key in set(binds) | set(DEDICATED_BINDS):
+        bind = binds.get(bind_key)
+        if bind is None:
+            bind = {'url': config.get(f"{bind_key.upper()}_DATABASE_URI") or uri}
+        elif not isinstance(bind, dict):
+            bind = {'url': bind}
+
+        options = engine_options(config, bind['url'], bind_key)
+        options.update(bind)
+        binds[bind_key] = options
+
+    return binds
+
+
+def configure_database(app, db):
+    """
+    Apply pooling options and SQLite pragmas, then bind the extension to the app
+
+    Args:
+        app: Flask application
+        db: Flask-SQLAlchemy extension instance
+    """
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI', 'sqlite:///:memory:')
+
+    options = engine_options(app.config, uri)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    app.config['SQLALCHEMY_BINDS'] = configure_binds(app.config, uri)
+
+    db.init_app(app)
+
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            install_sqlite_pragmas(engine, sqlite_pragmas(app.config, bind_key))
+
+
+# Async drivers used by the ASGI routes (asgi.py), by sync dialect
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def async_database_uri(uri):
+    """
+    Rewrite a database URI to use the dialect's async driver
+
+    Args:
+        uri: Sync database URI, e.g. sqlite:///app.db or postgresql://host/db
+
+    Returns:
+        str: URI for create_async_engine(), e.g. sqlite+aiosqlite:///app.db
+    """
+    scheme, separator, rest = str(uri).partition('://')
+    dialect = scheme.split('+')[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {dialect} databases")
+    return ASYNC_DRIVERS[dialect] + separator + rest
+
+
+def create_async_engines(config, sync_engines):
+    """
+    Async engines mirroring configure_database(): the main database plus
+    every dedicated bind, with the same pool options and SQLite pragmas
+
+    The URLs come from the resolved sync engines, not from config, so both
+    open the same database (Flask-SQLAlchemy puts relative SQLite paths
+    under the instance folder).
+
+    Args:
+        config: Flask config mapping (after configure_database)
+        sync_engines: Flask-SQLAlchemy engines by bind key (db.engines)
+
+    Returns:
+        dict: bind key (None for the main database) -> AsyncEngine
+
+    Raises:
+        ValueError: for in-memory SQLite, which a second engine cannot share
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engines = {}
+    for bind_key, sync_engine in sync_engines.items():
+        url = sync_engine.url
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            raise ValueError('The async engines need a file-based SQLite database, not :memory:')
+        target = url.render_as_string(hide_password=False)
+        engine = create_async_engine(async_database_uri(target), **engine_options(config, target, bind_key))
+        install_sqlite_pragmas(engine.sync_engine, sqlite_pragmas(config, bind_key))
+        engines[bind_key] = engine
+    return engines
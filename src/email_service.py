@@ -3,9 +3,14 @@ Email service for sending conversion emails
 """
 from flask_mail import Mail, Message
 from flask import current_app
+from email.message import EmailMessage
+from email.utils import formataddr
 import json
 
+from src.observability.tracing import span, traced, current_span
 
+
+@traced('email.send')
 def send_email(subject, recipients, body_html, body_text=None):
     """
     Send an email using Flask-Mail
@@ -24,14 +29,7 @@ def send_email(subject, recipients, body_html, body_text=None):
         mail_backend = current_app.config.get('MAIL_BACKEND', 'smtp')
         
         if mail_backend == 'console':
-            print("\n" + "="*70)
-            print("📧 EMAIL (Console Backend)")
-            print("="*70)
-            print(f"To: {', '.join(recipients)}")
-            print(f"Subject: {subject}")
-            print("-"*70)
-            print(body_text or "HTML Email - Check email client for formatted version")
-            print("="*70 + "\n")
+            _print_email(subject, recipients, body_text)
             return True
         
         # Otherwise use Flask-Mail
@@ -46,6 +44,9 @@ def send_email(subject, recipients, body_html, body_text=None):
         return True
     except Exception as e:
         current_app.logger.error(f"Failed to send email: {str(e)}")
+        failed = current_span()
+        if failed is not None:
+            failed.error = str(e)
         # In development, print to console as fallback
         if current_app.config.get('DEBUG'):
             print(f"\n⚠️ Email send failed: {str(e)}")
@@ -53,15 +54,80 @@ def send_email(subject, recipients, body_html, body_text=None):
         return False
 
 
-def send_itinerary_email(user_email, user_name, attractions_data, itinerary_summary):
+def _print_email(subject, recipients, body_text=None):
+    print("\n" + "="*70)
+    print("📧 EMAIL (Console Backend)")
+    print("="*70)
+    print(f"To: {', '.join(recipients)}")
+    print(f"Subject: {subject}")
+    print("-"*70)
+    print(body_text or "HTML Email - Check email client for formatted version")
+    print("="*70 + "\n")
+
+
+async def send_email_async(subject, recipients, body_html, body_text=None):
     """
-    Send itinerary email to user
+    Send an email without blocking the event loop (ASGI routes, see asgi.py)
+    
+    Uses aiosmtplib with the same MAIL_* settings as Flask-Mail. Must be
+    called inside a Flask app context for the configuration.
+    
+    Args:
+        subject: Email subject
+        recipients: List of recipient email addresses
+        body_html: HTML email body
+        body_text: Plain text email body (optional)
+    
+    Returns:
+        bool: True if sent successfully, False otherwise
+    """
+    config = current_app.config
+    with span('email.send'):
+        try:
+            if config.get('MAIL_BACKEND', 'smtp') == 'console':
+                _print_email(subject, recipients, body_text)
+                return True
+            
+            import aiosmtplib
+            
+            sender = config.get('MAIL_DEFAULT_SENDER')
+            message = EmailMessage()
+            message['Subject'] = subject
+            message['From'] = formataddr(sender) if isinstance(sender, (tuple, list)) else sender
+            message['To'] = ', '.join(recipients)
+            message.set_content(body_text or body_html.replace('<br>', '\n').replace('</p>', '\n\n'))
+            message.add_alternative(body_html, subtype='html')
+            
+            await aiosmtplib.send(
+                message,
+                hostname=config.get('MAIL_SERVER', 'localhost'),
+                port=int(config.get('MAIL_PORT', 25)),
+                username=config.get('MAIL_USERNAME'),
+                password=config.get('MAIL_PASSWORD'),
+                use_tls=bool(config.get('MAIL_USE_SSL', False)),
+                start_tls=bool(config.get('MAIL_USE_TLS', False)),
+                timeout=float(config.get('MAIL_TIMEOUT', 30))
+            )
+            return True
+        except Exception as e:
+            current_app.logger.error(f"Failed to send email: {str(e)}")
+            failed = current_span()
+            if failed is not None:
+                failed.error = str(e)
+            return False
+
+
+def render_itinerary_email(user_name, attractions_data, itinerary_summary):
+    """
+    Build the itinerary email
     
     Args:
-        user_email: Recipient email
         user_name: User's name
         attractions_data: List of attraction dictionaries
         itinerary_summary: Summary dict with total_days, total_cost, etc.
+    
+    Returns:
+        (subject, html_body)
     """
     subject = f"Your {itinerary_summary.get('total_days', 5)}-Day Nepal Itinerary"
     
@@ -138,16 +204,33 @@ def send_itinerary_email(user_email, user_name, attractions_data, itinerary_summ
     </html>
     """
     
+    return subject, html_body
+
+
+def send_itinerary_email(user_email, user_name, attractions_data, itinerary_summary):
+    """
+    Send itinerary email to user
+    
+    Args:
+        user_email: Recipient email
+        user_name: User's name
+        attractions_data: List of attraction dictionaries
+        itinerary_summary: Summary dict with total_days, total_cost, etc.
+    """
+    with span('email.render', template='itinerary'):
+        subject, html_body = render_itinerary_email(user_name, attractions_data, itinerary_summary)
     return send_email(subject, [user_email], html_body)
 
 
-def send_expert_consultation_notification(lead_data, admin_email):
+def render_expert_consultation_notification(lead_data):
     """
-    Send notification to admin about new expert consultation request
+    Build the admin notification for an expert consultation request
     
     Args:
         lead_data: Lead dictionary with user info
-        admin_email: Admin email to notify
+    
+    Returns:
+        (subject, html_body)
     """
     subject = f"New Expert Consultation Request - {lead_data.get('name', 'Unknown')}"
     
@@ -200,16 +283,31 @@ def send_expert_consultation_notification(lead_data, admin_email):
     </html>
     """
     
+    return subject, html_body
+
+
+def send_expert_consultation_notification(lead_data, admin_email):
+    """
+    Send notification to admin about new expert consultation request
+    
+    Args:
+        lead_data: Lead dictionary with user info
+        admin_email: Admin email to notify
+    """
+    with span('email.render', template='expert_consultation'):
+        subject, html_body = render_expert_consultation_notification(lead_data)
     return send_email(subject, [admin_email], html_body)
 
 
-def send_quote_request_notification(lead_data, admin_email):
+def render_quote_request_notification(lead_data):
     """
-    Send notification to admin about new quote request
+    Build the admin notification for a quote request
     
     Args:
         lead_data: Lead dictionary with user info and attraction IDs
-        admin_email: Admin email to notify
+    
+    Returns:
+        (subject, html_body)
     """
     subject = f"New Quote Request - {lead_data.get('name', 'Unknown')}"
     
@@ -264,17 +362,32 @@ def send_quote_request_notification(lead_data, admin_email):
     </html>
     """
     
+    return subject, html_body
+
+
+def send_quote_request_notification(lead_data, admin_email):
+    """
+    Send notification to admin about new quote request
+    
+    Args:
+        lead_data: Lead dictionary with user info and attraction IDs
+        admin_email: Admin email to notify
+    """
+    with span('email.render', template='quote_request'):
+        subject, html_body = render_quote_request_notification(lead_data)
     return send_email(subject, [admin_email], html_body)
 
 
-def send_confirmation_email(user_email, user_name, request_type):
+def render_confirmation_email(user_name, request_type):
     """
-    Send confirmation email to user after their request
+    Build the confirmation email sent to a user after their request
     
     Args:
-        user_email: User's email
         user_name: User's name
         request_type: Type of request ('email', 'expert', 'quote')
+    
+    Returns:
+        (subject, html_body)
     """
     messages = {
         'email': {
@@ -326,4 +439,18 @@ def send_confirmation_email(user_email, user_name, request_type):
     </html>
     """
     
-    return send_email(msg_info['subject'], [user_email], html_body)
+    return msg_info['subject'], html_body
+
+
+def send_confirmation_email(user_email, user_name, request_type):
+    """
+    Send confirmation email to user after their request
+    
+    Args:
+        user_email: User's email
+        user_name: User's name
+        request_type: Type of request ('email', 'expert', 'quote')
+    """
+    with span('email.render', template=f"confirmation_{request_type}"):
+        subject, html_body = render_confirmation_email(user_name, request_type)
+    return send_email(subject, [user_email], html_body)
@@ -0,0 +1,127 @@
+"""
+Streaming exports for leads and analytics (CSV / NDJSON)
+"""
+import csv
+import io
+import json
+
+
+# Rows fetched per round trip; on PostgreSQL this also sizes the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+# Flush the response buffer once it grows past this many characters
+EXPORT_CHUNK_CHARS = 64 * 1024
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+# Column order for CSV exports (matches the model to_dict() keys)
+LEAD_EXPORT_COLUMNS = [
+    'id', 'name', 'email', 'phone', 'lead_type', 'attraction_ids',
+    'lead_metadata', 'status', 'notes', 'created_at', 'email_sent'
+]
+
+ANALYTICS_EXPORT_COLUMNS = [
+    'id', 'session_id', 'recommendation_type', 'attraction_id',
+    'clicked', 'converted', 'created_at'
+]
+
+
+def iter_records(query, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Iterate over a query as dictionaries without loading it into memory
+
+    Args:
+        query: SQLAlchemy ORM query whose entities implement to_dict()
+        batch_size: Number of rows fetched per round trip
+
+    Yields:
+        dict: One serialized row at a time
+    """
+    # yield_per turns on stream_results, so the driver uses a server-side
+    # cursor where it has one and objects are released batch by batch
+    for obj in query.yield_per(batch_size):
+        yield obj.to_dict()
+
+
+# Leading characters that make spreadsheets and CRMs evaluate a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_value(value):
+    """Flatten nested JSON values so they fit in a single CSV cell, and defuse formulas"""
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # A leading quote makes the cell plain text when the file is opened
+        return "'" + value
+    return value
+
+
+def stream_csv(records, columns, chunk_chars=EXPORT_CHUNK_CHARS):
+    """
+    Encode records as CSV, yielding chunks of roughly chunk_chars characters
+
+    Args:
+        records: Iterable of dictionaries
+        columns: Ordered list of column names (also the header row)
+        chunk_chars: Approximate size of each yielded chunk
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+
+    for record in records:
+        writer.writerow({k: _csv_value(record.get(k)) for k in columns})
+        if buffer.tell() >= chunk_chars:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(records, chunk_chars=EXPORT_CHUNK_CHARS):
+    """
+    Encode records as newline-delimited JSON, yielding chunks of roughly chunk_chars characters
+
+    Args:
+        records: Iterable of dictionaries
+        chunk_chars: Approximate size of each yielded chunk
+    """
+    lines = []
+    size = 0
+
+    for record in records:
+        line = json.dumps(record, default=str) + '\n'
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_chars:
+            yield ''.join(lines)
+            lines = []
+            size = 0
+
+    if lines:
+        yield ''.join(lines)
+
+
+def stream_export(query, columns, export_format, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Stream a query in the requested export format
+
+    Args:
+        query: SQLAlchemy ORM query
+        columns: Column order for CSV exports
+        export_format: 'csv' or 'ndjson'
+        batch_size: Number of rows fetched per round trip
+
+    Returns:
+        Generator of text chunks
+    """
+    records = iter_records(query, batch_size)
+    if export_format == 'csv':
+        return stream_csv(records, columns)
+    return stream_ndjson(records)
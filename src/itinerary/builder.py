@@ -0,0 +1,198 @@
+"""
+Itinerary Builder
+Allocates itinerary days to selected attractions with array operations.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Rough west-to-east routing order used to group stops by region
+REGION_ORDER = {
+    'Kathmandu Valley': 1,
+    'Pokhara Region': 2,
+    'Everest Region': 3,
+    'Annapurna Region': 2,
+    'Mustang Region': 4,
+    'Langtang Region': 3,
+    'Manaslu Region': 3,
+    'Chitwan': 5,
+    'Lumbini': 5,
+    'Far West Nepal': 6
+}
+UNKNOWN_REGION_ORDER = 10
+
+# Treks at these difficulties get an extra acclimatization day
+ACCLIMATIZATION_DIFFICULTIES = ['Hard', 'Extreme']
+
+BUFFER_DAY = {
+    'attraction': None,
+    'activities': ['Flexible day - explore local area or rest'],
+    'duration': 1,
+    'difficulty': 'Easy',
+    'cost': 50.0,
+    'best_season': 'Year-round',
+    'notes': ['Buffer day for rest or spontaneous activities']
+}
+
+
+def days_needed(difficulty, category, duration_days):
+    """
+    Days each attraction occupies in an itinerary.
+
+    Hard/Extreme treks need one extra acclimatization day; everything else
+    takes its (truncated) duration with a minimum of one day.
+
+    Parameters:
+        difficulty, category, duration_days: Array-likes of equal length
+
+    Returns:
+        Integer array of days needed per attraction
+    """
+    difficulty = np.asarray(difficulty, dtype=object)
+    category = np.asarray(category, dtype=object)
+    base = np.asarray(duration_days).astype(np.int64)
+
+    acclimatize = np.isin(difficulty, ACCLIMATIZATION_DIFFICULTIES) & (category == 'Trekking')
+    return np.where(acclimatize, base + 1, np.maximum(1, base))
+
+
+class ItineraryBuilder:
+    """
+    Builds day-by-day itineraries over a fixed attraction catalog.
+
+    Per-attraction routing keys and day counts are computed once at
+    construction, so each request only gathers, sorts and slices arrays.
+    """
+
+    def __init__(self, attractions_df):
+        self.attractions_df = attractions_df
+
+        self._ids = attractions_df['attraction_id'].to_numpy()
+        self._names = attractions_df['name'].to_numpy(dtype=object)
+        self._regions = attractions_df['region'].to_numpy(dtype=object)
+        self._categories = attractions_df['category'].to_numpy(dtype=object)
+        self._difficulties = attractions_df['difficulty'].to_numpy(dtype=object)
+        self._seasons = attractions_df['best_season'].to_numpy(dtype=object)
+        self._costs = attractions_df['avg_cost_usd'].to_numpy()
+        self._durations = attractions_df['duration_days'].to_numpy()
+
+        self._region_order = (
+            pd.Series(self._regions).map(REGION_ORDER).fillna(UNKNOWN_REGION_ORDER).to_numpy()
+        )
+        # Lexicographic rank reproduces sorting on the difficulty strings
+        self._difficulty_rank = np.unique(self._difficulties, return_inverse=True)[1]
+        self._days_needed = days_needed(self._difficulties, self._categories, self._durations)
+        self._high_altitude = np.isin(self._difficulties, ACCLIMATIZATION_DIFFICULTIES)
+        self._trekking = self._categories == 'Trekking'
+
+    def select(self, attraction_ids):
+        """Catalog positions of the requested attractions, in catalog order."""
+        return np.flatnonzero(np.isin(self._ids, list(attraction_ids)))
+
+    def regions(self, positions):
+        """Region of each catalog position."""
+        return self._regions[positions]
+
+    def stop_days(self, positions):
+        """Days each catalog position occupies, acclimatization included."""
+        return self._days_needed[positions]
+
+    def stop_costs(self, positions):
+        """Average cost in USD of each catalog position."""
+        return self._costs[positions]
+
+    def order(self, positions):
+        """Sort positions by region order, difficulty and duration (stable)."""
+        keys = (
+            self._durations[positions],
+            self._difficulty_rank[positions],
+            self._region_order[positions]
+        )
+        return positions[np.lexsort(keys)]
+
+    def build(self, attraction_ids, days, positions=None):
+        """
+        Build an itinerary for a cart of attractions.
+
+        Parameters:
+            attraction_ids: Selected attraction IDs
+            days: Number of days available
+            positions: Optional pre-ordered catalog positions (skips selection and sorting)
+
+        Returns:
+            Dict with 'itinerary' and 'summary', or None if no ID is valid
+        """
+        if positions is None:
+            positions = self.order(self.select(attraction_ids))
+        if len(positions) == 0:
+            return None
+
+        needed = self._days_needed[positions]
+        ends = np.cumsum(needed)
+        starts = ends - needed + 1
+
+        # A stop is scheduled while it starts on or before the last day
+        scheduled = int(np.searchsorted(starts, days, side='right'))
+        current_day = 1 + (int(ends[scheduled - 1]) if scheduled else 0)
+        total_cost = np.cumsum(self._costs[positions])[scheduled - 1].item() if scheduled else 0
+
+        itinerary = self._day_entries(positions[:scheduled], starts[:scheduled], needed[:scheduled])
+
+        # Pad short itineraries with buffer days
+        buffer_days = max(0, min(math.floor(days - current_day) + 1, math.ceil(days - len(itinerary))))
+        for offset in range(buffer_days):
+            itinerary.append({'day': current_day + offset, **BUFFER_DAY,
+                              'activities': list(BUFFER_DAY['activities']),
+                              'notes': list(BUFFER_DAY['notes'])})
+        current_day += buffer_days
+
+        total_days = min(current_day - 1, days)
+
+        return {
+            'itinerary': itinerary,
+            'summary': {
+                'total_days': total_days,
+                'total_cost': round(total_cost, 2),
+                'average_daily_cost': round(total_cost / total_days, 2),
+                'attractions_count': len(positions),
+                'regions_covered': list(dict.fromkeys(self._regions[positions]))
+            }
+        }
+
+    def _day_entries(self, positions, starts, needed):
+        """Materialize JSON-ready day entries for the scheduled stops."""
+        entries = []
+        rows = zip(
+            starts.tolist(), needed.tolist(), self._ids[positions].tolist(),
+            self._names[positions], self._regions[positions], self._categories[positions],
+            self._difficulties[positions], self._costs[positions].tolist(),
+            self._seasons[positions], self._high_altitude[positions], self._trekking[positions]
+        )
+
+        for day, duration, attraction_id, name, region, category, difficulty, cost, season, high, trek in rows:
+            notes = []
+            if high:
+                notes.append("Acclimatization recommended for high altitude")
+            if trek and duration > 3:
+                notes.append("Multi-day trek - consider rest day after completion")
+
+            entries.append({
+                'day': day,
+                'attraction': {
+                    'id': int(attraction_id),
+                    'name': name,
+                    'region': region,
+                    'category': category
+                },
+                'activities': [name],
+                'duration': duration,
+                'difficulty': difficulty,
+                'cost': float(cost),
+                'best_season': season,
+                'notes': notes
+            })
+
+        return entries
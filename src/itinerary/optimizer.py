@@ -0,0 +1,161 @@
+"""
+Itinerary Optimizer
+Chooses which attractions to visit under a days and budget limit.
+"""
+
+import math
+
+import numpy as np
+
+from src.recommender.content_based import popularity_score
+from src.utils.lru import LRUCache
+
+
+OBJECTIVES = ('rating', 'popularity')
+
+# Longest trip the optimizer plans for
+MAX_DAYS = 120
+
+# Upper bound on DP table cells (items x days x budget buckets); the budget
+# is bucketed more coarsely when a request would exceed it
+MAX_DP_CELLS = 20_000_000
+MAX_BUDGET_BUCKETS = 2000
+
+
+def validate_limits(days, max_budget):
+    """
+    Convert a request's days and budget, rejecting values the optimizer cannot use.
+
+    Parameters:
+        days: Trip length in days (number or numeric string)
+        max_budget: Maximum total cost in USD (number or numeric string)
+
+    Returns:
+        (days, max_budget) as int and float
+
+    Raises:
+        ValueError for non-numeric, infinite or NaN values, days outside
+        1..MAX_DAYS and negative budgets
+    """
+    try:
+        days = float(days)
+    except (TypeError, ValueError):
+        days = math.nan
+    if not (math.isfinite(days) and 1 <= days <= MAX_DAYS):
+        raise ValueError(f"days must be between 1 and {MAX_DAYS}")
+
+    try:
+        max_budget = float(max_budget)
+    except (TypeError, ValueError):
+        max_budget = math.nan
+    if not (math.isfinite(max_budget) and max_budget >= 0):
+        raise ValueError("max_budget must be a non-negative number")
+    return int(days), max_budget
+
+
+class ItineraryOptimizer:
+    """
+    Picks the subset of attractions that maximizes total rating or popularity
+    while fitting in a number of days and a budget.
+
+    This is a 0/1 knapsack with two capacities (days, budget), solved by
+    dynamic programming over a (days x budget-bucket) table. Each stop's days
+    include the acclimatization day for Hard/Extreme treks. Costs are rounded
+    up to the budget bucket, so a solution never exceeds max_budget.
+    """
+
+    def __init__(self, builder, attractions_df, cache_size=256):
+        self.builder = builder
+        self.cache = LRUCache(cache_size)
+        self._ratings = attractions_df['rating'].to_numpy(dtype=np.float64)
+        self._num_reviews = attractions_df['num_reviews'].to_numpy(dtype=np.float64)
+
+    def objective_values(self, positions, objective):
+        """Per-stop value being maximized."""
+        if objective == 'rating':
+            return self._ratings[positions]
+        frame = {'rating': self._ratings[positions], 'num_reviews': self._num_reviews[positions]}
+        return np.asarray(popularity_score(frame), dtype=np.float64)
+
+    def optimize(self, days, max_budget, attraction_ids=None, objective='rating'):
+        """
+        Select attractions for a trip.
+
+        Parameters:
+            days: Trip length in days
+            max_budget: Maximum total cost in USD
+            attraction_ids: Candidate IDs (defaults to the whole catalog)
+            objective: 'rating' or 'popularity'
+
+        Returns:
+            (positions, details): chosen catalog positions (unordered) and a
+            dict describing the solution
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {', '.join(OBJECTIVES)}")
+        days, max_budget = validate_limits(days, max_budget)
+
+        if attraction_ids is None:
+            candidates = np.arange(len(self._ratings))
+            candidate_key = None
+        else:
+            candidates = self.builder.select(attraction_ids)
+            candidate_key = tuple(candidates.tolist())
+
+        key = (candidate_key, days, max_budget, objective)
+        solution = self.cache.get(key)
+        if solution is None:
+            solution = self._solve(candidates, days, max_budget, objective)
+            self.cache.put(key, solution)
+        return solution
+
+    def _solve(self, candidates, days, max_budget, objective):
+        stop_days = self.builder.stop_days(candidates)
+        stop_costs = self.builder.stop_costs(candidates).astype(np.float64)
+        values = self.objective_values(candidates, objective)
+
+        # Stops that can never fit are dropped before building the table
+        fits = (stop_days <= days) & (stop_costs <= max_budget)
+        candidates, stop_days, stop_costs, values = (
+            candidates[fits], stop_days[fits], stop_costs[fits], values[fits]
+        )
+
+        n = len(candidates)
+        budget_step = max(1.0, max_budget / MAX_BUDGET_BUCKETS)
+        if n:
+            budget_step = max(budget_step, max_budget * n * (days + 1) / MAX_DP_CELLS)
+        buckets = int(max_budget // budget_step)
+        weights = np.ceil(stop_costs / budget_step - 1e-9).astype(np.int64)
+
+        # best[d, b]: highest value using at most d days and b budget buckets
+        best = np.zeros((days + 1, buckets + 1))
+        take = np.zeros((n, days + 1, buckets + 1), dtype=bool)
+
+        for i in range(n):
+            w, c = int(stop_days[i]), int(weights[i])
+            if c > buckets:
+                continue
+            candidate = best[:days + 1 - w, :buckets + 1 - c] + values[i]
+            improved = candidate > best[w:, c:]
+            take[i, w:, c:] = improved
+            best[w:, c:] = np.where(improved, candidate, best[w:, c:])
+
+        chosen = []
+        d, b = days, buckets
+        for i in range(n - 1, -1, -1):
+            if take[i, d, b]:
+                chosen.append(i)
+                d -= int(stop_days[i])
+                b -= int(weights[i])
+
+        chosen = np.array(chosen[::-1], dtype=np.int64)
+        positions = candidates[chosen]
+
+        return positions, {
+            'objective': objective,
+            'objective_value': round(float(values[chosen].sum()), 4) if len(chosen) else 0.0,
+            'days_used': int(stop_days[chosen].sum()),
+            'cost': round(float(stop_costs[chosen].sum()), 2),
+            'candidates': n,
+            'budget_step': round(budget_step, 2)
+        }
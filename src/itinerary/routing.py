@@ -0,0 +1,277 @@
+"""
+Itinerary Routing
+Orders itinerary stops by travel time using a region-to-region cost matrix.
+"""
+
+import numpy as np
+
+from src.utils.lru import LRUCache
+
+
+# Approximate door-to-door travel hours between region hubs (road, or
+# domestic flight plus transfers where that is how people actually go)
+TRAVEL_HOURS = {
+    ('Kathmandu Valley', 'Pokhara Region'): 7,
+    ('Kathmandu Valley', 'Annapurna Region'): 9,
+    ('Kathmandu Valley', 'Everest Region'): 5,
+    ('Kathmandu Valley', 'Mustang Region'): 12,
+    ('Kathmandu Valley', 'Langtang Region'): 8,
+    ('Kathmandu Valley', 'Manaslu Region'): 8,
+    ('Kathmandu Valley', 'Chitwan'): 6,
+    ('Kathmandu Valley', 'Lumbini'): 9,
+    ('Kathmandu Valley', 'Far West Nepal'): 14,
+    ('Pokhara Region', 'Annapurna Region'): 2,
+    ('Pokhara Region', 'Everest Region'): 11,
+    ('Pokhara Region', 'Mustang Region'): 6,
+    ('Pokhara Region', 'Langtang Region'): 12,
+    ('Pokhara Region', 'Manaslu Region'): 8,
+    ('Pokhara Region', 'Chitwan'): 5,
+    ('Pokhara Region', 'Lumbini'): 7,
+    ('Pokhara Region', 'Far West Nepal'): 13,
+    ('Annapurna Region', 'Everest Region'): 13,
+    ('Annapurna Region', 'Mustang Region'): 5,
+    ('Annapurna Region', 'Langtang Region'): 14,
+    ('Annapurna Region', 'Manaslu Region'): 9,
+    ('Annapurna Region', 'Chitwan'): 7,
+    ('Annapurna Region', 'Lumbini'): 9,
+    ('Annapurna Region', 'Far West Nepal'): 15,
+    ('Everest Region', 'Mustang Region'): 17,
+    ('Everest Region', 'Langtang Region'): 13,
+    ('Everest Region', 'Manaslu Region'): 13,
+    ('Everest Region', 'Chitwan'): 11,
+    ('Everest Region', 'Lumbini'): 14,
+    ('Everest Region', 'Far West Nepal'): 19,
+    ('Mustang Region', 'Langtang Region'): 18,
+    ('Mustang Region', 'Manaslu Region'): 11,
+    ('Mustang Region', 'Chitwan'): 11,
+    ('Mustang Region', 'Lumbini'): 13,
+    ('Mustang Region', 'Far West Nepal'): 18,
+    ('Langtang Region', 'Manaslu Region'): 10,
+    ('Langtang Region', 'Chitwan'): 11,
+    ('Langtang Region', 'Lumbini'): 14,
+    ('Langtang Region', 'Far West Nepal'): 20,
+    ('Manaslu Region', 'Chitwan'): 9,
+    ('Manaslu Region', 'Lumbini'): 12,
+    ('Manaslu Region', 'Far West Nepal'): 19,
+    ('Chitwan', 'Lumbini'): 4,
+    ('Chitwan', 'Far West Nepal'): 11,
+    ('Lumbini', 'Far West Nepal'): 8,
+}
+
+# Regions missing from the table are assumed to be a long day away from everything
+UNKNOWN_TRAVEL_HOURS = 16.0
+
+# Common start points mapped to their region hub
+START_LOCATIONS = {
+    'Kathmandu': 'Kathmandu Valley',
+    'Pokhara': 'Pokhara Region',
+    'Chitwan': 'Chitwan',
+    'Lumbini': 'Lumbini',
+    'Bhairahawa': 'Lumbini',
+    'Nepalgunj': 'Far West Nepal',
+}
+DEFAULT_START_REGION = 'Kathmandu Valley'
+
+# Carts visiting up to this many regions are solved exactly (Held-Karp)
+EXACT_MAX_STOPS = 9
+
+TWO_OPT_MAX_PASSES = 20
+
+
+class TravelCostMatrix:
+    """Dense, symmetric region-to-region travel cost matrix."""
+
+    def __init__(self, travel_hours=None):
+        travel_hours = TRAVEL_HOURS if travel_hours is None else travel_hours
+        regions = sorted({r for pair in travel_hours for r in pair})
+
+        self.regions = regions
+        self.index = {region: i for i, region in enumerate(regions)}
+        self.matrix = np.zeros((len(regions), len(regions)))
+        for (a, b), hours in travel_hours.items():
+            self.matrix[self.index[a], self.index[b]] = hours
+            self.matrix[self.index[b], self.index[a]] = hours
+
+    def cost(self, a, b):
+        """Travel hours between two regions."""
+        if a == b:
+            return 0.0
+        if a in self.index and b in self.index:
+            return float(self.matrix[self.index[a], self.index[b]])
+        return UNKNOWN_TRAVEL_HOURS
+
+    def submatrix(self, regions):
+        """Cost matrix restricted to the given regions, as nested lists."""
+        return [[self.cost(a, b) for b in regions] for a in regions]
+
+
+def path_cost(cost, route):
+    """Total cost of visiting nodes in route order (open path)."""
+    return sum(cost[a][b] for a, b in zip(route, route[1:]))
+
+
+def solve_exact(cost):
+    """
+    Shortest open path starting at node 0 that visits every node (Held-Karp).
+
+    Parameters:
+        cost: Square nested list of travel costs
+
+    Returns:
+        List of node indices beginning with 0
+    """
+    n = len(cost)
+    if n <= 2:
+        return list(range(n))
+
+    # dp[mask][j]: cheapest path from 0 over nodes in mask (bit k = node k + 1) ending at j + 1
+    m = n - 1
+    full = 1 << m
+    inf = float('inf')
+    dp = [[inf] * m for _ in range(full)]
+    parent = [[-1] * m for _ in range(full)]
+    for j in range(m):
+        dp[1 << j][j] = cost[0][j + 1]
+
+    for mask in range(1, full):
+        row = dp[mask]
+        for j in range(m):
+            if row[j] == inf:
+                continue
+            base = row[j]
+            for k in range(m):
+                if mask & (1 << k):
+                    continue
+                nxt = mask | (1 << k)
+                value = base + cost[j + 1][k + 1]
+                if value < dp[nxt][k]:
+                    dp[nxt][k] = value
+                    parent[nxt][k] = j
+
+    last = min(range(m), key=lambda j: dp[full - 1][j])
+    route = []
+    mask = full - 1
+    while last != -1:
+        route.append(last + 1)
+        mask, last = mask ^ (1 << last), parent[mask][last]
+    return [0] + route[::-1]
+
+
+def solve_heuristic(cost, max_passes=TWO_OPT_MAX_PASSES):
+    """
+    Open path from node 0 by nearest neighbour, refined with 2-opt.
+
+    Parameters:
+        cost: Square nested list of travel costs
+        max_passes: Upper bound on 2-opt improvement passes
+
+    Returns:
+        List of node indices beginning with 0
+    """
+    n = len(cost)
+    route = [0]
+    remaining = set(range(1, n))
+    while remaining:
+        here = route[-1]
+        nearest = min(remaining, key=lambda k: (cost[here][k], k))
+        route.append(nearest)
+        remaining.remove(nearest)
+
+    # Reverse route[i:j + 1] whenever it shortens the path; the start stays fixed
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                a, b, c = route[i - 1], route[i], route[j]
+                before = cost[a][b]
+                after = cost[a][c]
+                if j + 1 < n:
+                    d = route[j + 1]
+                    before += cost[c][d]
+                    after += cost[b][d]
+                if after < before - 1e-9:
+                    route[i:j + 1] = route[i:j + 1][::-1]
+                    improved = True
+        if not improved:
+            break
+
+    return route
+
+
+class RoutePlanner:
+    """
+    Chooses the visiting order of an itinerary by minimizing travel time.
+
+    Stops are grouped by region and the regions are routed from the start
+    location; within a region the builder's difficulty/duration order is kept.
+    Solutions are memoized by the canonical cart (sorted catalog positions
+    plus start region).
+    """
+
+    def __init__(self, builder, travel_costs=None, exact_max_stops=EXACT_MAX_STOPS, cache_size=1024):
+        self.builder = builder
+        self.travel_costs = travel_costs or TravelCostMatrix()
+        self.exact_max_stops = exact_max_stops
+        self.cache = LRUCache(cache_size)
+
+    @staticmethod
+    def start_region(start_location):
+        """Map a start location (town or region name) to a region hub."""
+        if not start_location:
+            return DEFAULT_START_REGION
+        return START_LOCATIONS.get(start_location, start_location)
+
+    def plan(self, attraction_ids, start_location=None):
+        """
+        Route a cart of attractions.
+
+        Parameters:
+            attraction_ids: Selected attraction IDs
+            start_location: Town or region the trip starts from
+
+        Returns:
+            (positions, route) where positions are ordered catalog positions and
+            route describes the region sequence, or None if no ID is valid
+        """
+        positions = self.builder.select(attraction_ids)
+        if len(positions) == 0:
+            return None
+
+        return self.route(positions, start_location)
+
+    def route(self, positions, start_location=None):
+        """Route catalog positions directly (see plan())."""
+        key = (tuple(sorted(positions.tolist())), self.start_region(start_location))
+        solution = self.cache.get(key)
+        if solution is None:
+            solution = self._solve(positions, key[1])
+            self.cache.put(key, solution)
+        return solution
+
+    def _solve(self, positions, start):
+        ordered = self.builder.order(positions)
+        regions = self.builder.regions(ordered)
+        stops = list(dict.fromkeys(r for r in regions if r != start))
+
+        nodes = [start] + stops
+        cost = self.travel_costs.submatrix(nodes)
+        if len(stops) <= self.exact_max_stops:
+            route, method = solve_exact(cost), 'exact'
+        else:
+            route, method = solve_heuristic(cost), 'heuristic'
+
+        # Stops in the start region go first, then each region in route order
+        rank = {nodes[node]: i for i, node in enumerate(route)}
+        region_rank = np.array([rank[r] for r in regions])
+        routed = ordered[np.argsort(region_rank, kind='stable')]
+
+        visited = [nodes[node] for node in route]
+        if start not in regions:
+            visited = visited[1:]
+
+        return routed, {
+            'start_region': start,
+            'regions': visited,
+            'travel_hours': path_cost(cost, route),
+            'method': method
+        }
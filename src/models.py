@@ -3,7 +3,8 @@ Database models for Nepal Tourism Recommender
 """
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-import json
+
+from src.database import JSONColumn
 
 db = SQLAlchemy()
 
@@ -20,7 +21,7 @@ class UserPreference(db.Model):
     preferred_category = db.Column(db.String(100))
     max_cost = db.Column(db.Float)
     difficulty = db.Column(db.String(50))
-    preferred_regions = db.Column(db.Text)  # JSON array of regions
+    preferred_regions = db.Column(JSONColumn)  # JSON array of regions
     
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -34,7 +35,7 @@ class UserPreference(db.Model):
             'preferred_category': self.preferred_category,
             'max_cost': self.max_cost,
             'difficulty': self.difficulty,
-            'preferred_regions': json.loads(self.preferred_regions) if self.preferred_regions else [],
+            'preferred_regions': self.preferred_regions or [],
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'visit_count': self.visit_count
         }
@@ -55,10 +56,10 @@ class Lead(db.Model):
     lead_type = db.Column(db.String(50), nullable=False)  # 'email', 'expert', 'quote'
     
     # Related attractions (JSON array of attraction IDs)
-    attraction_ids = db.Column(db.Text, nullable=True)
+    attraction_ids = db.Column(JSONColumn, nullable=True)
     
     # Additional data (JSON)
-    lead_metadata = db.Column(db.Text, nullable=True)  # For storing extra info like itinerary days, etc.
+    lead_metadata = db.Column(JSONColumn, nullable=True)  # For storing extra info like itinerary days, etc.
     
     # Status tracking
     status = db.Column(db.String(50), default='new')  # 'new', 'contacted', 'converted', 'lost'
@@ -79,8 +80,8 @@ class Lead(db.Model):
             'email': self.email,
             'phone': self.phone,
             'lead_type': self.lead_type,
-            'attraction_ids': json.loads(self.attraction_ids) if self.attraction_ids else [],
-            'lead_metadata': json.loads(self.lead_metadata) if self.lead_metadata else {},
+            'attraction_ids': self.attraction_ids or [],
+            'lead_metadata': self.lead_metadata or {},
             'status': self.status,
             'notes': self.notes,
             'created_at': self.created_at.isoformat() if self.created_at else None,
@@ -125,6 +126,7 @@ class ConversionRequest(db.Model):
 class Analytics(db.Model):
     """Store analytics data for recommendations"""
     __tablename__ = 'analytics'
+    __bind_key__ = 'analytics'  # Own engine and pool, see DEDICATED_BINDS
     
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.String(100), index=True)
@@ -136,7 +138,7 @@ class Analytics(db.Model):
     converted = db.Column(db.Boolean, default=False)
     
     # User preferences at time of recommendation
-    user_preferences = db.Column(db.Text)  # JSON
+    user_preferences = db.Column(JSONColumn)  # JSON
     
     # Timestamp
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
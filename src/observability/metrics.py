@@ -0,0 +1,340 @@
+"""
+Metrics
+Counters, gauges and histograms exposed in the Prometheus text format, merged across worker processes.
+"""
+
+import atexit
+import bisect
+import glob
+import json
+import math
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+
+# Request latencies from sub-millisecond lookups to slow itinerary solves
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+FILE_PATTERN = 'metrics-{pid}.json'
+
+
+class _Metric:
+    """One metric family: a value (or histogram state) per label combination."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        try:
+            key = tuple([labels[name] for name in self.labelnames])
+        except KeyError:
+            key = None
+        if key is None or len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return key
+
+    def samples(self):
+        with self._lock:
+            return [[[str(label) for label in key], value] for key, value in self._values.items()]
+
+    def describe(self):
+        return {'type': self.kind, 'help': self.documentation, 'labelnames': list(self.labelnames)}
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    A value that goes up and down. Across workers, 'livesum' gauges add up
+    the values of running processes only (e.g. requests in flight).
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), aggregate='livesum'):
+        super().__init__(name, documentation, labelnames)
+        self.aggregate = aggregate
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def describe(self):
+        return dict(super().describe(), aggregate=self.aggregate)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (not cumulative) counts, the +Inf bucket last, then the sum
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[slot] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            return [[[str(label) for label in key], list(state)] for key, state in self._values.items()]
+
+    def describe(self):
+        return dict(super().describe(), buckets=list(self.buckets))
+
+
+class MetricsRegistry:
+    """
+    The metrics of one process.
+
+    Without a directory, /metrics shows this process only. With one, every
+    process periodically writes its metrics to its own file there, and
+    render() merges all the files: counters and histograms are summed over
+    every process that ever wrote (so they never go backwards when a worker
+    is recycled), and 'livesum' gauges over live processes only. The
+    directory should be emptied when the whole server restarts.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.flush_interval = 5.0
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def configure(self, directory=None, flush_interval=5.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), aggregate='livesum'):
+        return self._register(Gauge(name, documentation, labelnames, aggregate))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collect):
+        """Call collect() before every export, to update metrics read from elsewhere."""
+        self._collectors.append(collect)
+
+    def collect(self):
+        """This process's metrics as a JSON-serializable dict."""
+        for collect in self._collectors:
+            try:
+                collect()
+            except Exception as e:
+                print(f"Error in metrics collector: {e}")
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            'pid': os.getpid(),
+            'metrics': {metric.name: dict(metric.describe(), samples=metric.samples()) for metric in metrics}
+        }
+
+    def flush(self):
+        """Write this process's metrics file (no-op without a directory)."""
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, FILE_PATTERN.format(pid=os.getpid()))
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.collect(), f)
+        os.replace(path + '.tmp', path)
+
+    def start(self):
+        """
+        Start the background flusher for this process. Safe to call on every
+        request: it does nothing once running, and restarts after a fork.
+        """
+        if not self.directory or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        def run():
+            while True:
+                time.sleep(self.flush_interval)
+                try:
+                    self.flush()
+                except OSError as e:
+                    print(f"Error writing metrics: {e}")
+
+        threading.Thread(target=run, name='metrics-flush', daemon=True).start()
+        atexit.register(self.flush)
+
+    def render(self):
+        """All metrics (merged across processes) in the Prometheus text format."""
+        if not self.directory:
+            return format_text(merge([self.collect()]))
+        self.flush()
+        reports = []
+        for path in glob.glob(os.path.join(self.directory, FILE_PATTERN.format(pid='*'))):
+            try:
+                with open(path) as f:
+                    reports.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Being replaced, or from a process killed mid-write
+        return format_text(merge(reports))
+
+
+def _process_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge(reports):
+    """
+    Combine per-process reports (as from MetricsRegistry.collect) into one.
+
+    Returns:
+        Dict of metric name -> description with 'samples' as a dict of
+        label values tuple -> merged value
+    """
+    merged = {}
+    for report in reports:
+        alive = None
+        for name, metric in report['metrics'].items():
+            if metric['type'] == 'gauge' and metric.get('aggregate') == 'livesum':
+                if alive is None:
+                    alive = _process_alive(report['pid'])
+                if not alive:
+                    continue
+
+            target = merged.setdefault(name, dict(metric, samples={}))
+            for labels, value in metric['samples']:
+                key = tuple(labels)
+                current = target['samples'].get(key)
+                if current is None:
+                    target['samples'][key] = value
+                elif metric['type'] == 'histogram':
+                    target['samples'][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target['samples'][key] = current + value
+    return merged
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def format_text(merged):
+    """Render merged metrics in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for name, metric in merged.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric['labelnames']
+        for labels, value in sorted(metric['samples'].items()):
+            if metric['type'] != 'histogram':
+                lines.append(f"{name}{_labels(labelnames, labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(metric['buckets']) + [math.inf], value[:-1]):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f"{name}_bucket{_labels(labelnames, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labelnames, labels)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(labelnames, labels)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+# Hit and miss totals already counted, per cache object. collect() runs on
+# the flusher thread and in /metrics requests, so updates take the lock.
+_cache_totals = weakref.WeakKeyDictionary()
+_cache_totals_lock = threading.Lock()
+
+
+def observe_cache(counter, name, cache):
+    """
+    Add an LRUCache's hits and misses since the last call to counter, as
+    {cache=name, result=hit|miss}. Caches are replaced on catalog reload;
+    counting deltas per cache object keeps the counter monotonic.
+    """
+    with _cache_totals_lock:
+        seen_hits, seen_misses = _cache_totals.get(cache, (0, 0))
+        hits, misses = cache.hits, cache.misses
+        _cache_totals[cache] = (hits, misses)
+    if hits > seen_hits:
+        counter.inc(hits - seen_hits, cache=name, result='hit')
+    if misses > seen_misses:
+        counter.inc(misses - seen_misses, cache=name, result='miss')
+
+
+# Process-wide registry; modules define their metrics on it at import time
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,137 @@
+"""
+Request Profiling
+Opt-in cProfile capture of individual requests, saved for later inspection.
+"""
+
+import cProfile
+import glob
+import io
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+
+
+PROFILE_SUFFIX = '.prof'
+METADATA_SUFFIX = '.json'
+PROFILE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+$')
+SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+
+class RequestProfiler:
+    """
+    Profiles selected requests with cProfile and keeps the most recent ones.
+
+    At most one request is profiled at a time; a request that would be
+    profiled while another is being captured runs unprofiled instead, so
+    the capture overhead never stacks up under load.
+    """
+
+    def __init__(self, directory, sample_rate=0.0, keep=100):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self._active = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self, forced=False):
+        """
+        Start profiling the current thread if forced (admin header) or sampled.
+
+        Returns:
+            A handle for finish(), or None if this request is not profiled
+        """
+        if not forced and not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return None
+        if not self._active.acquire(blocking=False):
+            return None
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) already owns the hook
+            self._active.release()
+            return None
+        return profile, time.perf_counter(), 'header' if forced else 'sample'
+
+    def finish(self, handle, **metadata):
+        """
+        Stop profiling and save the profile with its metadata.
+
+        Returns:
+            The profile id
+        """
+        profile, started, trigger = handle
+        try:
+            profile.disable()
+        finally:
+            self._active.release()
+        duration = time.perf_counter() - started
+
+        created_at = datetime.utcnow()
+        profile_id = f"{created_at:%Y%m%dT%H%M%S}-{metadata.get('endpoint') or 'request'}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(self.directory, profile_id)
+        profile.dump_stats(path + PROFILE_SUFFIX)
+        with open(path + METADATA_SUFFIX, 'w') as f:
+            json.dump(dict(
+                metadata,
+                id=profile_id,
+                trigger=trigger,
+                duration_ms=round(duration * 1000, 2),
+                created_at=created_at.isoformat()
+            ), f)
+
+        self._prune()
+        return profile_id
+
+    def _prune(self):
+        saved = sorted(glob.glob(os.path.join(self.directory, '*' + METADATA_SUFFIX)), key=os.path.getmtime)
+        for metadata_path in saved[:max(0, len(saved) - self.keep)]:
+            base = metadata_path[:-len(METADATA_SUFFIX)]
+            for path in (metadata_path, base + PROFILE_SUFFIX):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def list(self, limit=50):
+        """Metadata of the most recent profiles, newest first."""
+        saved = sorted(glob.glob(os.path.join(self.directory, '*' + METADATA_SUFFIX)),
+                       key=os.path.getmtime, reverse=True)
+        profiles = []
+        for path in saved[:limit]:
+            try:
+                with open(path) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Pruned or still being written
+        return profiles
+
+    def path(self, profile_id):
+        """Path of a saved profile's .prof file, or None if there is no such profile."""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = os.path.join(self.directory, profile_id + PROFILE_SUFFIX)
+        return path if os.path.exists(path) else None
+
+    def summary(self, profile_id, sort='cumulative', limit=40):
+        """
+        Readable pstats report of a saved profile.
+
+        Returns:
+            (metadata, report text), or None if there is no such profile
+        """
+        path = self.path(profile_id)
+        if path is None:
+            return None
+        with open(os.path.join(self.directory, profile_id + METADATA_SUFFIX)) as f:
+            metadata = json.load(f)
+        report = io.StringIO()
+        pstats.Stats(path, stream=report).strip_dirs().sort_stats(sort).print_stats(limit)
+        return metadata, report.getvalue()
@@ -0,0 +1,279 @@
+"""
+Tracing
+Lightweight nested timing spans, exported as JSON log lines or OTLP/JSON files.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+
+EXPORTERS = ('json', 'otlp-file')
+
+# OTLP span status codes and kinds
+STATUS_OK = 1
+STATUS_ERROR = 2
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+_current = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """One timed operation; spans opened while it is current become its children."""
+
+    __slots__ = (
+        'name', 'trace_id', 'span_id', 'parent_id', 'kind', 'attributes',
+        'start_ns', 'end_ns', 'error', '_trace', '_token'
+    )
+
+    def __init__(self, name, parent, kind, attributes):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.kind = kind
+        self.attributes = attributes
+        self.error = None
+        self.end_ns = None
+        if parent is None:
+            self.trace_id = os.urandom(16).hex()
+            self.parent_id = None
+            # Finished spans of the trace, exported together when the root ends
+            self._trace = []
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self._trace = parent._trace
+        self.start_ns = time.time_ns()
+        self._token = _current.set(self)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self, error=None):
+        """Finish the span and make its parent current again."""
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Ended from a different context (e.g. another thread); nothing to restore
+            pass
+
+        self._trace.append(self)
+        if self.parent_id is None:
+            _tracer.export(self._trace)
+
+    @property
+    def duration_ms(self):
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start_ns / 1e9,
+            'duration_ms': round(self.duration_ms, 3),
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+
+class _NullSpan:
+    """Stands in for a span while tracing is off, so call sites never branch."""
+
+    def set(self, **attributes):
+        pass
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _SpanContext:
+    __slots__ = ('name', 'kind', 'attributes', 'span')
+
+    def __init__(self, name, kind, attributes):
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.span = Span(self.name, _current.get(), self.kind, self.attributes)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end(exc)
+        return False
+
+
+class JsonLinesExporter:
+    """One JSON object per span, to a file or stderr (e.g. for a log shipper)."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        lines = ''.join(json.dumps(dict(span.to_dict(), type='span'), default=str) + '\n' for span in spans)
+        with self._lock:
+            if self.path:
+                with open(self.path, 'a') as f:
+                    f.write(lines)
+            else:
+                sys.stderr.write(lines)
+
+
+class OtlpFileExporter:
+    """
+    One OTLP/JSON ExportTraceServiceRequest per trace, one per line, in the
+    layout of the OpenTelemetry Collector's file exporter, so the file can
+    be replayed into any OTLP backend.
+    """
+
+    def __init__(self, path, service_name='nepal-tourism-recommender'):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _value(value):
+        if isinstance(value, bool):
+            return {'boolValue': value}
+        if isinstance(value, int):
+            return {'intValue': str(value)}
+        if isinstance(value, float):
+            return {'doubleValue': value}
+        return {'stringValue': str(value)}
+
+    def _span(self, span):
+        encoded = {
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': span.kind,
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(span.end_ns),
+            'attributes': [{'key': key, 'value': self._value(value)} for key, value in span.attributes.items()],
+            'status': {'code': STATUS_ERROR, 'message': span.error} if span.error else {'code': STATUS_OK}
+        }
+        if span.parent_id:
+            encoded['parentSpanId'] = span.parent_id
+        return encoded
+
+    def export(self, spans):
+        request = {
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    {'key': 'service.name', 'value': {'stringValue': self.service_name}},
+                    {'key': 'process.pid', 'value': {'intValue': str(os.getpid())}}
+                ]},
+                'scopeSpans': [{
+                    'scope': {'name': __name__},
+                    'spans': [self._span(span) for span in spans]
+                }]
+            }]
+        }
+        line = json.dumps(request) + '\n'
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
+
+
+class _Tracer:
+    def __init__(self):
+        self.exporter = None
+
+    def export(self, spans):
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            print(f"Error exporting spans: {e}")
+
+
+_tracer = _Tracer()
+
+
+def configure(exporter=None, path=None):
+    """
+    Turn tracing on with the given exporter, or off with None.
+
+    Parameters:
+        exporter: 'json' (JSON lines; stderr unless path is set) or
+            'otlp-file' (OTLP/JSON lines; path required)
+        path: Output file
+    """
+    if exporter is None:
+        _tracer.exporter = None
+        return
+    if exporter not in EXPORTERS:
+        raise ValueError(f"Unknown trace exporter: {exporter}")
+    if exporter == 'otlp-file':
+        if not path:
+            raise ValueError('The otlp-file trace exporter needs a file path')
+        _tracer.exporter = OtlpFileExporter(path)
+    else:
+        _tracer.exporter = JsonLinesExporter(path)
+
+
+def enabled():
+    return _tracer.exporter is not None
+
+
+def current_span():
+    """The innermost open span in this context, or None."""
+    return _current.get()
+
+
+def span(name, kind=KIND_INTERNAL, **attributes):
+    """
+    Context manager timing a block as a span, nested under the current one.
+
+    With tracing off this returns a shared no-op, so instrumented code
+    costs one function call.
+    """
+    if _tracer.exporter is None:
+        return NULL_SPAN
+    return _SpanContext(name, kind, attributes)
+
+
+def start_span(name, kind=KIND_INTERNAL, **attributes):
+    """
+    Open a span that is ended explicitly with .end(), for operations that
+    begin and finish in different callbacks (e.g. request hooks).
+    """
+    if _tracer.exporter is None:
+        return NULL_SPAN
+    return Span(name, _current.get(), kind, attributes)
+
+
+def traced(name=None):
+    """Decorator running each call of the function inside a span (default name: its qualified name)."""
+    def decorate(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapped(*args, **kwargs):
+            if _tracer.exporter is None:
+                return function(*args, **kwargs)
+            with _SpanContext(span_name, KIND_INTERNAL, {}):
+                return function(*args, **kwargs)
+        return wrapped
+    return decorate
@@ -0,0 +1,112 @@
+"""
+Recommender Artifacts
+Precomputed similarity matrices that let workers serve recommendations without fitting.
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from src.recommender.content_based import ContentBasedRecommender, FEATURE_DTYPE
+
+
+# 2: float32 similarities from pre-normalized CSR features; version 1
+# artifacts hold the earlier float64 pipeline's scores and are refitted
+ARTIFACT_FORMAT_VERSION = 2
+SIMILARITY_FILE = 'similarity.npy'
+MANIFEST_FILE = 'manifest.json'
+
+
+def save_artifact(recommender, directory, catalog_version):
+    """
+    Write a fitted recommender's similarity matrix and manifest.
+
+    The matrix is written first and the manifest last (each via rename), so
+    a reader never sees a manifest describing a half-written matrix.
+
+    Parameters:
+        recommender: Fitted ContentBasedRecommender
+        directory: Output directory (created if missing)
+        catalog_version: Version of the catalog the model was fitted on
+
+    Returns:
+        The manifest dict
+    """
+    os.makedirs(directory, exist_ok=True)
+    similarity = np.ascontiguousarray(recommender.similarity_matrix)
+
+    similarity_path = os.path.join(directory, SIMILARITY_FILE)
+    with open(similarity_path + '.tmp', 'wb') as f:
+        np.save(f, similarity)
+    os.replace(similarity_path + '.tmp', similarity_path)
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'catalog_version': catalog_version,
+        'num_attractions': int(similarity.shape[0]),
+        'dtype': str(similarity.dtype),
+        'similarity_bytes': os.path.getsize(similarity_path),
+        'created_at': datetime.utcnow().isoformat()
+    }
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest
+
+
+def load_artifact(directory, attractions_df, catalog_version):
+    """
+    Load a recommender from an artifact if it matches the catalog.
+
+    Parameters:
+        directory: Artifact directory
+        attractions_df: The loaded catalog
+        catalog_version: Version of that catalog
+
+    Returns:
+        ContentBasedRecommender, or None if the artifact is missing, stale
+        or damaged (the caller then fits from scratch)
+    """
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    similarity_path = os.path.join(directory, SIMILARITY_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if (manifest.get('format_version') != ARTIFACT_FORMAT_VERSION
+                or manifest.get('catalog_version') != catalog_version
+                or manifest.get('num_attractions') != len(attractions_df)
+                or manifest.get('dtype') != np.dtype(FEATURE_DTYPE).name
+                or manifest.get('similarity_bytes') != os.path.getsize(similarity_path)):
+            return None
+
+        # Memory-mapped: rows are paged in as recommendations touch them
+        similarity = np.load(similarity_path, mmap_mode='r')
+        return ContentBasedRecommender.from_similarity(attractions_df, similarity)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring recommender artifact in {directory}: {e}")
+        return None
+
+
+def main():
+    from src.catalog import build_snapshot
+
+    parser = argparse.ArgumentParser(description='Precompute the recommender artifact for fast startup.')
+    parser.add_argument('--catalog', default='data/processed/attractions.csv')
+    parser.add_argument('--output', default='data/artifacts/recommender')
+    args = parser.parse_args()
+
+    snapshot = build_snapshot(args.catalog, defer=True)
+    manifest = save_artifact(snapshot.recommender, args.output, snapshot.version)
+    print(f"Wrote {args.output} for catalog {manifest['catalog_version']} "
+          f"({manifest['num_attractions']} attractions, {manifest['similarity_bytes']} bytes)")
+
+
+if __name__ == '__main__':
+    main()
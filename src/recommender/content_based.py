@@ -3,12 +3,51 @@ Content-Based Recommendation System
 Recommends attractions based on feature similarity.
 """
 
+import time
+
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import MinMaxScaler
-from scipy.sparse import hstack, csr_matrix
+
+from src.compact import widen
+from src.observability.metrics import REGISTRY
+from src.observability.tracing import traced
+
+
+# The similarity matrix is dense float32 (n * n * 4 bytes); refuse to build
+# one larger than this instead of exhausting memory
+MAX_SIMILARITY_BYTES = 4 * 1024 ** 3
+
+# Features and similarities are computed in float32 throughout
+FEATURE_DTYPE = np.float32
+
+
+RECOMMENDER_SECONDS = REGISTRY.histogram(
+    'recommender_operation_seconds',
+    'Time spent fitting the recommender and ranking recommendations',
+    ('operation',)
+)
+
+
+def similarity_bytes(num_attractions):
+    """Size of the dense similarity matrix for a catalog of this size."""
+    return num_attractions * num_attractions * np.dtype(FEATURE_DTYPE).itemsize
+
+
+def popularity_score(attractions_df):
+    """
+    Blend of rating and review volume used to rank attractions.
+    
+    Parameters:
+        attractions_df: DataFrame with 'rating' and 'num_reviews' columns
+        
+    Returns:
+        Series of scores on a 0-5 scale (reviews normalized within the frame)
+    """
+    ratings = widen(attractions_df['rating'])
+    return (
+        ratings * 0.7 + 
+        (attractions_df['num_reviews'] / attractions_df['num_reviews'].max()) * 5 * 0.3
+    )
 
 
 class ContentBasedRecommender:
@@ -22,6 +61,7 @@ class ContentBasedRecommender:
         self.similarity_matrix = None
         self.feature_matrix = None
         
+    @traced('recommender.fit')
     def fit(self, attractions_df):
         """
         Train the recommender on attraction features.
@@ -29,38 +69,77 @@ class ContentBasedRecommender:
         Parameters:
             attractions_df: DataFrame containing attraction information
         """
-        self.attractions_df = attractions_df.copy()
-        
-        # Combine text features
-        self.attractions_df['text_features'] = (
-            self.attractions_df['category'] + ' ' +
-            self.attractions_df['region'] + ' ' +
-            self.attractions_df['difficulty'] + ' ' +
-            self.attractions_df['best_season']
+        # Imported here so serving from a precomputed artifact never loads sklearn
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.preprocessing import MinMaxScaler, normalize
+        from scipy.sparse import hstack, csr_matrix
+        
+        if similarity_bytes(len(attractions_df)) > MAX_SIMILARITY_BYTES:
+            raise MemoryError(
+                f"Similarity matrix for {len(attractions_df)} attractions needs "
+                f"{similarity_bytes(len(attractions_df)) / 1024 ** 3:.1f} GiB "
+                f"(limit {MAX_SIMILARITY_BYTES / 1024 ** 3:.1f} GiB)"
+            )
+        
+        started = time.perf_counter()
+        
+        # The catalog is only read, never modified, so it is shared rather than copied
+        self.attractions_df = attractions_df
+        
+        # Combine text features (a temporary; categoricals are joined as strings)
+        text_features = (
+            attractions_df['category'].astype(str) + ' ' +
+            attractions_df['region'].astype(str) + ' ' +
+            attractions_df['difficulty'].astype(str) + ' ' +
+            attractions_df['best_season'].astype(str)
         )
         
-        # Create TF-IDF vectors
-        tfidf = TfidfVectorizer(stop_words='english')
-        tfidf_matrix = tfidf.fit_transform(self.attractions_df['text_features'])
+        # Create TF-IDF vectors (CSR)
+        tfidf = TfidfVectorizer(stop_words='english', dtype=FEATURE_DTYPE)
+        tfidf_matrix = tfidf.fit_transform(text_features)
         
-        # Normalize numerical features
+        # Normalize numerical features (an n x 3 block; float32 catalog columns are not copied)
         scaler = MinMaxScaler()
-        numerical_features = self.attractions_df[[
-            'rating', 'avg_cost_usd', 'duration_days'
-        ]].values
+        numerical_features = np.column_stack([
+            attractions_df[column].to_numpy(dtype=FEATURE_DTYPE)
+            for column in ('rating', 'avg_cost_usd', 'duration_days')
+        ])
         numerical_normalized = scaler.fit_transform(numerical_features)
         
-        # Combine text and numerical features
-        self.feature_matrix = hstack([
-            tfidf_matrix,
-            csr_matrix(numerical_normalized)
-        ])
+        # Combine text and numerical features into one CSR matrix with unit-length
+        # rows, so cosine similarity is a plain dot product
+        self.feature_matrix = normalize(
+            hstack([tfidf_matrix, csr_matrix(numerical_normalized)], format='csr', dtype=FEATURE_DTYPE),
+            copy=False
+        )
         
-        # Calculate similarity matrix
-        self.similarity_matrix = cosine_similarity(self.feature_matrix)
+        # Calculate similarity matrix: sparse rows times the (small) dense
+        # transposed features, written straight into one dense n x n array
+        self.similarity_matrix = self.feature_matrix @ self.feature_matrix.T.toarray()
         
+        RECOMMENDER_SECONDS.observe(time.perf_counter() - started, operation='fit')
         return self
     
+    @classmethod
+    def from_similarity(cls, attractions_df, similarity_matrix):
+        """
+        Build a recommender from a precomputed similarity matrix (no fitting).
+        
+        Parameters:
+            attractions_df: DataFrame the matrix was computed from
+            similarity_matrix: Square array aligned with attractions_df rows
+        """
+        if similarity_matrix.shape != (len(attractions_df), len(attractions_df)):
+            raise ValueError(
+                f"Similarity matrix shape {similarity_matrix.shape} does not match "
+                f"{len(attractions_df)} attractions"
+            )
+        recommender = cls()
+        recommender.attractions_df = attractions_df
+        recommender.similarity_matrix = similarity_matrix
+        return recommender
+    
+    @traced('recommender.recommend')
     def recommend(self, attraction_id, top_n=5, min_similarity=0.1):
         """
         Get similar attractions based on content features.
@@ -76,6 +155,8 @@ class ContentBasedRecommender:
         if attraction_id >= len(self.attractions_df):
             raise ValueError(f"Invalid attraction_id: {attraction_id}")
         
+        started = time.perf_counter()
+        
         # Get similarity scores
         sim_scores = list(enumerate(self.similarity_matrix[attraction_id]))
         
@@ -96,12 +177,14 @@ class ContentBasedRecommender:
         recommendations = self.attractions_df.iloc[attraction_indices].copy()
         recommendations['similarity_score'] = similarity_scores
         
+        RECOMMENDER_SECONDS.observe(time.perf_counter() - started, operation='similar_top_k')
         return recommendations[[
             'attraction_id', 'name', 'category', 'region', 
             'rating', 'num_reviews', 'avg_cost_usd', 'duration_days',
             'difficulty', 'best_season', 'altitude_meters', 'similarity_score'
         ]]
     
+    @traced('recommender.recommend_by_preferences')
     def recommend_by_preferences(self, preferred_category=None, 
                                  max_cost=None, difficulty=None, top_n=10):
         """
@@ -116,25 +199,25 @@ class ContentBasedRecommender:
         Returns:
             DataFrame with filtered attractions
         """
-        filtered = self.attractions_df.copy()
+        started = time.perf_counter()
+        mask = np.ones(len(self.attractions_df), dtype=bool)
         
         if preferred_category:
-            filtered = filtered[filtered['category'] == preferred_category]
+            mask &= (self.attractions_df['category'] == preferred_category).to_numpy()
         
         if max_cost:
-            filtered = filtered[filtered['avg_cost_usd'] <= max_cost]
+            mask &= (self.attractions_df['avg_cost_usd'] <= max_cost).to_numpy()
         
         if difficulty:
-            filtered = filtered[filtered['difficulty'] == difficulty]
+            mask &= (self.attractions_df['difficulty'] == difficulty).to_numpy()
         
-        # Calculate popularity score
-        filtered['popularity_score'] = (
-            filtered['rating'] * 0.7 + 
-            (filtered['num_reviews'] / filtered['num_reviews'].max()) * 5 * 0.3
-        )
+        # Only the matching rows are materialized
+        filtered = self.attractions_df[mask]
+        filtered = filtered.assign(popularity_score=popularity_score(filtered))
         
         recommendations = filtered.nlargest(top_n, 'popularity_score')
         
+        RECOMMENDER_SECONDS.observe(time.perf_counter() - started, operation='preferences_top_k')
         return recommendations[[
             'attraction_id', 'name', 'category', 'region', 
             'rating', 'num_reviews', 'avg_cost_usd', 'duration_days', 
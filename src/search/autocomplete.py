@@ -0,0 +1,118 @@
+"""
+Autocomplete
+Prefix suggestions for attraction and region names, ranked by popularity.
+"""
+
+import re
+
+from src.recommender.content_based import popularity_score
+
+
+WORD_START = re.compile(r"(?:^|(?<=[\s(/-]))\w")
+
+# Keys are stored up to this length. Longer prefixes are answered by filtering
+# every suggestion under the deepest node, not only its top k.
+MAX_PREFIX_LENGTH = 24
+
+
+class AutocompleteIndex:
+    """
+    Trie that stores the top-k completions at every node.
+
+    Each suggestion is reachable from the start of its label and from the
+    start of every later word ("camp" finds "Everest Base Camp Trek").
+    Suggestions are inserted in descending popularity, so the first k that
+    reach a node are its top k and a lookup is a walk down the prefix
+    followed by a slice. Nodes live in flat lists indexed by node id; nodes
+    at MAX_PREFIX_LENGTH also keep all their suggestions for longer prefixes.
+    """
+
+    def __init__(self, attractions_df, k=10):
+        self.k = k
+        self.suggestions = self._suggestions(attractions_df)
+        self._children = [{}]
+        self._top = [[]]
+        self._deep = {}
+
+        for entry_id in sorted(range(len(self.suggestions)), key=lambda i: -self.suggestions[i]['score']):
+            label = self.suggestions[entry_id]['label'].lower()
+            for match in WORD_START.finditer(label):
+                self._insert(label[match.start():match.start() + MAX_PREFIX_LENGTH], entry_id)
+
+        self._top = [tuple(top) for top in self._top]
+        self._deep = {node: tuple(entries) for node, entries in self._deep.items()}
+
+    @staticmethod
+    def _suggestions(attractions_df):
+        """Attraction and region suggestions with their popularity scores."""
+        scores = popularity_score(attractions_df).round(4)
+        suggestions = [
+            {
+                'label': name,
+                'type': 'attraction',
+                'attraction_id': int(attraction_id),
+                'region': region,
+                'score': float(score)
+            }
+            for name, attraction_id, region, score in zip(
+                attractions_df['name'], attractions_df['attraction_id'], attractions_df['region'], scores
+            )
+        ]
+
+        # A region ranks as high as its most popular attraction
+        region_scores = scores.groupby(attractions_df['region'].to_numpy()).max()
+        suggestions.extend(
+            {'label': region, 'type': 'region', 'attraction_id': None, 'region': region, 'score': float(score)}
+            for region, score in region_scores.items()
+        )
+        return suggestions
+
+    def _insert(self, key, entry_id):
+        node = 0
+        for char in key:
+            child = self._children[node].get(char)
+            if child is None:
+                child = len(self._children)
+                self._children[node][char] = child
+                self._children.append({})
+                self._top.append([])
+            node = child
+            top = self._top[node]
+            if len(top) < self.k and entry_id not in top:
+                top.append(entry_id)
+        if len(key) == MAX_PREFIX_LENGTH:
+            # Still in descending popularity, as entries are inserted in that order
+            deep = self._deep.setdefault(node, [])
+            if entry_id not in deep:
+                deep.append(entry_id)
+
+    def suggest(self, prefix, limit=None):
+        """
+        Completions for a prefix, most popular first.
+
+        Parameters:
+            prefix: Text typed so far (case-insensitive)
+            limit: Maximum number of suggestions (at most k)
+
+        Returns:
+            List of suggestion dicts
+        """
+        limit = self.k if limit is None else min(limit, self.k)
+        prefix = prefix.lower().lstrip()
+        if not prefix:
+            return []
+
+        node = 0
+        for char in prefix[:MAX_PREFIX_LENGTH]:
+            node = self._children[node].get(char)
+            if node is None:
+                return []
+
+        entries = self._top[node]
+        if len(prefix) > MAX_PREFIX_LENGTH:
+            entries = [
+                e for e in self._deep.get(node, ())
+                if any(self.suggestions[e]['label'].lower()[m.start():].startswith(prefix)
+                       for m in WORD_START.finditer(self.suggestions[e]['label'].lower()))
+            ]
+        return [self.suggestions[e] for e in entries[:limit]]
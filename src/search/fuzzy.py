@@ -0,0 +1,144 @@
+"""
+Fuzzy Matching
+Typo-tolerant term lookup with a character-trigram index and bounded edit distance.
+"""
+
+import numpy as np
+
+
+NGRAM = 3
+
+
+def ngrams(term, n=NGRAM):
+    """Distinct character n-grams of a term, padded so word boundaries count."""
+    padded = f"${term}$"
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+def max_typos(term):
+    """Edit distance tolerated for a query term of this length."""
+    if len(term) <= 4:
+        return 1 if len(term) >= 3 else 0
+    if len(term) <= 10:
+        return 2
+    return 3
+
+
+def bounded_edit_distance(a, b, max_distance):
+    """
+    Levenshtein distance between a and b, or None if it exceeds max_distance.
+
+    Rows stop being computed as soon as every cell is over the bound.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if len(a) > len(b):
+        a, b = b, a
+
+    previous = list(range(len(a) + 1))
+    for j, char_b in enumerate(b, 1):
+        current = [j] + [0] * len(a)
+        for i, char_a in enumerate(a, 1):
+            current[i] = min(
+                previous[i] + 1,
+                current[i - 1] + 1,
+                previous[i - 1] + (char_a != char_b)
+            )
+        if min(current) > max_distance:
+            return None
+        previous = current
+
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+class FuzzyMatcher:
+    """
+    Finds vocabulary terms within a small edit distance of a query term.
+
+    Candidates are pruned with a trigram index (q-gram lemma: a term within
+    k edits shares at least |grams(query)| - k * n trigrams with the query)
+    and only the survivors are re-ranked by bounded edit distance, so a
+    lookup never scans the whole vocabulary pairwise.
+    """
+
+    def __init__(self, terms, max_candidates=50):
+        self.terms = list(terms)
+        self.max_candidates = max_candidates
+        self._known = set(self.terms)
+
+        gram_ids = {}
+        gram_list, term_list = [], []
+        for term_id, term in enumerate(self.terms):
+            for gram in ngrams(term):
+                gram_list.append(gram_ids.setdefault(gram, len(gram_ids)))
+                term_list.append(term_id)
+
+        gram_list = np.asarray(gram_list, dtype=np.int32)
+        order = np.argsort(gram_list, kind='stable')
+        self.gram_ids = gram_ids
+        self.term_ids = np.asarray(term_list, dtype=np.int32)[order]
+        self.offsets = np.zeros(len(gram_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(gram_list, minlength=len(gram_ids)), out=self.offsets[1:])
+
+    def candidates(self, term, max_distance):
+        """Term ids sharing enough trigrams with term to be within max_distance."""
+        grams = [self.gram_ids[g] for g in ngrams(term) if g in self.gram_ids]
+        if not grams:
+            return np.array([], dtype=np.int64)
+
+        postings = np.concatenate([self.term_ids[self.offsets[g]:self.offsets[g + 1]] for g in grams])
+        term_ids, shared = np.unique(postings, return_counts=True)
+
+        required = len(ngrams(term)) - max_distance * NGRAM
+        if required > 0:
+            keep = shared >= required
+            term_ids, shared = term_ids[keep], shared[keep]
+
+        if len(term_ids) > self.max_candidates:
+            top = np.argpartition(-shared, self.max_candidates - 1)[:self.max_candidates]
+            term_ids = term_ids[top]
+        return term_ids
+
+    def match(self, term, max_distance=None, limit=3):
+        """
+        Closest vocabulary terms to a (possibly misspelled) term.
+
+        Parameters:
+            term: Normalized query term
+            max_distance: Edit distance bound (defaults by term length)
+            limit: Maximum number of matches
+
+        Returns:
+            List of (term, distance), closest first
+        """
+        max_distance = max_typos(term) if max_distance is None else max_distance
+        matches = []
+        for term_id in self.candidates(term, max_distance):
+            candidate = self.terms[term_id]
+            distance = bounded_edit_distance(term, candidate, max_distance)
+            if distance is not None:
+                matches.append((distance, candidate))
+
+        matches.sort()
+        return [(candidate, distance) for distance, candidate in matches[:limit]]
+
+    def correct(self, terms, limit=2):
+        """
+        Replace unknown terms with their closest vocabulary matches.
+
+        Returns:
+            (expanded_terms, corrections) where corrections maps each
+            replaced term to the terms substituted for it
+        """
+        expanded, corrections = [], {}
+        for term in terms:
+            if term in self._known:
+                expanded.append(term)
+                continue
+            matches = self.match(term)
+            if matches:
+                best = matches[0][1]
+                replacements = [t for t, d in matches if d == best][:limit]
+                corrections[term] = replacements
+                expanded.extend(replacements)
+        return expanded, corrections
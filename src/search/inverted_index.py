@@ -0,0 +1,142 @@
+"""
+Full-Text Search
+Tokenized inverted index over the attraction catalog with BM25 ranking.
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset({'a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'the', 'to', 'with'})
+
+# Matches in the name count more than matches in the description
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'category': 1.5,
+    'region': 1.5,
+    'description': 1.0
+}
+
+
+def normalize_token(token):
+    """Fold simple plurals so 'treks' matches 'trek' and 'lakes' matches 'lake'."""
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Lowercase, split on non-alphanumerics, drop stop words and fold plurals."""
+    if not isinstance(text, str):
+        return []
+    return [normalize_token(t) for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """
+    BM25 inverted index with array-backed posting lists.
+
+    Postings are stored CSR-style: term t owns doc_ids[offsets[t]:offsets[t + 1]]
+    (int32 catalog positions) and the matching field-weighted term
+    frequencies (float32). Queries gather those slices and aggregate scores
+    with numpy, so no per-document Python work happens at query time.
+    """
+
+    def __init__(self, attractions_df, fields=FIELD_WEIGHTS, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.num_docs = len(attractions_df)
+
+        columns = {field: attractions_df[field].tolist() for field in fields if field in attractions_df}
+        vocabulary = {}
+        term_ids, doc_ids, frequencies = [], [], []
+        doc_lengths = np.zeros(self.num_docs, dtype=np.float32)
+
+        for doc in range(self.num_docs):
+            counts = Counter()
+            for field, values in columns.items():
+                weight = fields[field]
+                for token in tokenize(values[doc]):
+                    counts[token] += weight
+            doc_lengths[doc] = sum(counts.values())
+
+            for token, tf in counts.items():
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                doc_ids.append(doc)
+                frequencies.append(tf)
+
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind='stable')
+
+        self.vocabulary = vocabulary
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        self.frequencies = np.asarray(frequencies, dtype=np.float32)[order]
+        self.offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)), out=self.offsets[1:])
+
+        document_frequency = np.diff(self.offsets).astype(np.float32)
+        self.idf = np.log1p((self.num_docs - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+
+        avg_length = doc_lengths.mean() if self.num_docs else 1.0
+        # Per-document BM25 length normalization, precomputed once
+        self.length_norm = (k1 * (1 - b + b * doc_lengths / max(avg_length, 1e-9))).astype(np.float32)
+
+    @property
+    def nbytes(self):
+        """Memory held by the posting arrays (excluding the vocabulary dict)."""
+        return sum(a.nbytes for a in (self.doc_ids, self.frequencies, self.offsets, self.idf, self.length_norm))
+
+    def terms(self):
+        """All indexed terms."""
+        return list(self.vocabulary)
+
+    def postings(self, term):
+        """(doc_ids, frequencies) for a normalized term, empty if unknown."""
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            return self.doc_ids[:0], self.frequencies[:0]
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.doc_ids[start:end], self.frequencies[start:end]
+
+    def search(self, query, limit=10, terms=None):
+        """
+        Rank documents for a query with BM25.
+
+        Parameters:
+            query: Free-text query
+            limit: Maximum number of results
+            terms: Optional pre-tokenized terms (overrides query)
+
+        Returns:
+            (positions, scores) arrays, best match first
+        """
+        terms = tokenize(query) if terms is None else terms
+        docs, contributions = [], []
+
+        for term in dict.fromkeys(terms):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            doc_ids = self.doc_ids[start:end]
+            tf = self.frequencies[start:end]
+            docs.append(doc_ids)
+            contributions.append(self.idf[term_id] * tf * (self.k1 + 1) / (tf + self.length_norm[doc_ids]))
+
+        if not docs:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        matched, inverse = np.unique(np.concatenate(docs), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions)).astype(np.float32)
+
+        if len(matched) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(matched))
+        # Highest score first; ties keep catalog order
+        top = top[np.lexsort((matched[top], -scores[top]))]
+        return matched[top].astype(np.int64), scores[top]
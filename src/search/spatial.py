@@ -0,0 +1,107 @@
+"""
+Spatial Index
+Radius and k-nearest queries over attraction coordinates.
+"""
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vectors(latitudes, longitudes):
+    """Convert latitude/longitude in degrees to points on the unit sphere."""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord):
+    """Great-circle distance for a straight-line distance on the unit sphere."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+def km_to_chord(distance_km):
+    """Straight-line distance on the unit sphere for a great-circle distance."""
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+class SpatialIndex:
+    """
+    KD-tree over attraction locations.
+
+    Points are stored as 3D unit vectors, so Euclidean (chord) distance in the
+    tree is monotonic in great-circle distance and queries are exact anywhere
+    on the globe. Results are catalog positions, nearest first.
+    """
+
+    def __init__(self, latitudes, longitudes):
+        from scipy.spatial import cKDTree
+
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self._tree = cKDTree(to_unit_vectors(self.latitudes, self.longitudes))
+
+    @classmethod
+    def from_frame(cls, attractions_df):
+        """Build an index from a catalog, or return None if it has no coordinates."""
+        if not {'latitude', 'longitude'} <= set(attractions_df.columns):
+            return None
+        return cls(attractions_df['latitude'].to_numpy(), attractions_df['longitude'].to_numpy())
+
+    def __len__(self):
+        return len(self.latitudes)
+
+    def location(self, position):
+        """(latitude, longitude) of a catalog position."""
+        return float(self.latitudes[position]), float(self.longitudes[position])
+
+    def nearest(self, latitude, longitude, k=10, radius_km=None, exclude=()):
+        """
+        k nearest attractions to a point, optionally within a radius.
+
+        Parameters:
+            latitude, longitude: Query point in degrees
+            k: Maximum number of results
+            radius_km: Optional maximum great-circle distance
+            exclude: Catalog positions to leave out (e.g. the query attraction)
+
+        Returns:
+            (positions, distances_km) arrays sorted by distance
+        """
+        exclude = set(exclude)
+        count = min(len(self), k + len(exclude))
+        if count == 0:
+            return np.array([], dtype=np.int64), np.array([])
+
+        upper = km_to_chord(radius_km) if radius_km is not None else np.inf
+        chords, positions = self._tree.query(
+            to_unit_vectors([latitude], [longitude])[0], k=count, distance_upper_bound=upper
+        )
+        chords, positions = np.atleast_1d(chords), np.atleast_1d(positions)
+
+        # Missing neighbours (beyond the radius) come back as index == len(self)
+        keep = positions < len(self)
+        if exclude:
+            keep &= ~np.isin(positions, list(exclude))
+        positions, chords = positions[keep][:k], chords[keep][:k]
+        return positions.astype(np.int64), chord_to_km(chords)
+
+    def within(self, latitude, longitude, radius_km, limit=None, exclude=()):
+        """
+        All attractions within radius_km of a point (minus excluded positions).
+
+        Returns:
+            (positions, distances_km) arrays sorted by distance
+        """
+        point = to_unit_vectors([latitude], [longitude])[0]
+        positions = np.asarray(self._tree.query_ball_point(point, km_to_chord(radius_km)), dtype=np.int64)
+        if len(exclude):
+            positions = positions[~np.isin(positions, list(exclude))]
+        if len(positions) == 0:
+            return positions, np.array([])
+
+        chords = np.linalg.norm(self._tree.data[positions] - point, axis=1)
+        order = np.argsort(chords, kind='stable')[:limit]
+        return positions[order], chord_to_km(chords[order])
@@ -4,6 +4,86 @@ from datetime import datetime, timedelta
 
 np.random.seed(42)
 
+# Approximate coordinates (latitude, longitude) of each attraction
+ATTRACTION_COORDINATES = {
+    'Mount Everest Base Camp Trek': (28.0026, 86.8528),
+    'Annapurna Circuit': (28.6667, 84.0167),
+    'Langtang Trek': (28.2115, 85.5636),
+    'Manaslu Circuit': (28.5917, 84.6361),
+    'Upper Mustang Trek': (29.1833, 83.9583),
+    'Gokyo Lakes Trek': (27.9553, 86.6947),
+    'Kathmandu Durbar Square': (27.7045, 85.3073),
+    'Patan Durbar Square': (27.6727, 85.3253),
+    'Bhaktapur Durbar Square': (27.6722, 85.4279),
+    'Swayambhunath (Monkey Temple)': (27.7149, 85.2904),
+    'Boudhanath Stupa': (27.7215, 85.3620),
+    'Pashupatinath Temple': (27.7105, 85.3487),
+    'Lumbini (Buddha Birthplace)': (27.4833, 83.2767),
+    'Pokhara Lakeside': (28.2096, 83.9586),
+    'Chitwan National Park': (27.5775, 84.4960),
+    'Rara Lake': (29.5275, 82.0883),
+    'Phewa Lake': (28.2153, 83.9456),
+    'Begnas Lake': (28.1700, 84.0981),
+    'Nagarkot Hill Station': (27.7172, 85.5200),
+    'Dhulikhel': (27.6200, 85.5560),
+    'Bandipur Village': (27.9389, 84.4083),
+    'Bungee Jumping (The Last Resort)': (27.9167, 85.9333),
+    'Paragliding in Pokhara': (28.2436, 83.9486),
+    'White Water Rafting Trishuli': (27.8600, 84.8400),
+    'Gosaikunda Lake': (28.0833, 85.4167),
+    'Tilicho Lake': (28.6833, 83.8500),
+    'Janakpur Temple': (26.7307, 85.9250),
+    'Bardiya National Park': (28.3833, 81.5000),
+    'Koshi Tappu Wildlife Reserve': (26.6500, 87.0000),
+    'Namche Bazaar Market': (27.8050, 86.7140),
+    'Tengboche Monastery': (27.8361, 86.7639),
+    'Khumjung Village': (27.8167, 86.7167),
+    'Lukla Airport Experience': (27.6869, 86.7297),
+    'Everest View Hotel': (27.8136, 86.7195),
+    'Annapurna Base Camp': (28.5300, 83.8780),
+    'Poon Hill Sunrise': (28.4000, 83.6900),
+    'Muktinath Temple': (28.8167, 83.8717),
+    'Kagbeni Village': (28.8386, 83.7847),
+    'Jomsom Town': (28.7804, 83.7230),
+    'Ghandruk Village': (28.3750, 83.8080),
+    'Australian Camp': (28.2797, 83.8181),
+    'Sarangkot Sunrise Point': (28.2439, 83.9486),
+    'World Peace Pagoda': (28.2011, 83.9447),
+    'Mahendra Cave': (28.2719, 83.9797),
+    'Seti River Gorge': (28.2380, 83.9950),
+    'Tal Barahi Temple': (28.2083, 83.9519),
+    'Garden of Dreams': (27.7140, 85.3150),
+    'Thamel Market': (27.7154, 85.3123),
+    'Kopan Monastery': (27.7426, 85.3623),
+    'Shuklaphanta National Park': (28.8500, 80.2333),
+    'Shey Phoksundo Lake Trek': (29.2000, 82.9500),
+    'Khaptad National Park': (29.3833, 81.1500),
+    'Mardi Himal Trek': (28.4500, 83.9000),
+    'Langtang Valley Trek': (28.2134, 85.5191),
+    'Ghale Gaun Homestay': (28.2833, 84.4167),
+    'Lumbini Monastic Zone': (27.4900, 83.2750),
+    'Chandragiri Cable Car': (27.6650, 85.2120),
+    'Kalinchowk Bhagwati Temple': (27.7800, 86.0300),
+    'Barun Valley Trek': (27.7500, 87.1000),
+    'Pikey Peak Trek': (27.5500, 86.5500),
+    'Tsho Rolpa Lake': (27.8667, 86.4833),
+}
+
+# Rough centre of each region, used for attractions without known coordinates
+REGION_CENTROIDS = {
+    'Kathmandu Valley': (27.70, 85.32),
+    'Pokhara Region': (28.21, 83.99),
+    'Annapurna Region': (28.53, 83.88),
+    'Everest Region': (27.85, 86.75),
+    'Mustang Region': (28.95, 83.85),
+    'Langtang Region': (28.20, 85.50),
+    'Manaslu Region': (28.55, 84.60),
+    'Chitwan': (27.55, 84.40),
+    'Lumbini': (27.48, 83.28),
+    'Far West Nepal': (29.00, 81.50),
+}
+
+
 
 def generate_attractions_data(num_attractions=None):
 
@@ -780,6 +860,14 @@ def generate_attractions_data(num_attractions=None):
         num_reviews = int(np.random.exponential(400) + 50)
         num_reviews = min(num_reviews, 5000)  # Cap at 5000 reviews
         
+        # Coordinates: known location, else scattered around the region centre
+        if name in ATTRACTION_COORDINATES:
+            latitude, longitude = ATTRACTION_COORDINATES[name]
+        else:
+            center_lat, center_lon = REGION_CENTROIDS[region]
+            latitude = round(center_lat + np.random.normal(0, 0.1), 4)
+            longitude = round(center_lon + np.random.normal(0, 0.1), 4)
+        
         # Create description
         description = f"A {difficulty.lower()} {category.lower()} experience in {region}."
         
@@ -796,6 +884,8 @@ def generate_attractions_data(num_attractions=None):
             'difficulty': difficulty,
             'best_season': best_season,
             'altitude_meters': altitude,
+            'latitude': latitude,
+            'longitude': longitude,
             'description': description
         }
         
@@ -0,0 +1,64 @@
+"""
+Single-flight coalescing of identical concurrent calls
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers arriving with the same
+    key while it is in flight wait for it and share its result (or its
+    exception) instead of recomputing. Nothing is kept once the call
+    returns, so this coalesces bursts without ever serving stale results.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """
+        Call function(), or wait for the identical call already in flight.
+
+        Parameters:
+            key: Hashable identity of the call (normalized request)
+            function: Zero-argument callable computing the result
+
+        Returns:
+            (result, shared) where shared is True if another caller computed it
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def __len__(self):
+        """Number of calls in flight."""
+        return len(self._calls)
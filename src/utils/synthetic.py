@@ -0,0 +1,308 @@
+"""
+Synthetic Datasets
+Seeded, vectorized generators for load-scale catalogs and ratings.
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.columnar import write_chunked_table, write_table
+from src.compact import widen
+
+
+OUTPUT_FORMATS = ('csv', 'npy')
+
+# Users generated (and written) per chunk; bounds memory regardless of dataset size
+DEFAULT_CHUNK_USERS = 50_000
+
+# Attractions generated per block. Each block has its own seed, so the
+# catalog does not depend on how many workers generated it.
+CATALOG_BLOCK_SIZE = 100_000
+
+# Place names are a prefix and a suffix; every attraction id maps to a
+# distinct (place, repeat) pair so names stay unique at any catalog size
+PLACE_PREFIXES = (
+    'Bhim', 'Chandra', 'Deu', 'Gauri', 'Hari', 'Indra', 'Jal', 'Kali', 'Laxmi', 'Mahendra',
+    'Nil', 'Phul', 'Ram', 'Shiva', 'Surya', 'Tara', 'Arun', 'Bal', 'Dhaulagiri', 'Ganesh',
+    'Himal', 'Jiri', 'Kanchan', 'Lali', 'Machha', 'Naya', 'Pati', 'Rato', 'Sano', 'Thulo',
+    'Bhairab', 'Durga', 'Gupha', 'Kumari', 'Mani', 'Panch', 'Sagar', 'Saptari', 'Tin', 'Ula',
+)
+PLACE_SUFFIXES = (
+    'pur', 'kot', 'gaun', 'tar', 'dhara', 'khola', 'danda', 'bas', 'pani', 'chowk',
+    'thok', 'bari', 'pokhari', 'phedi', 'deurali', 'kharka', 'besi', 'ghat', 'tol', 'nagar',
+    'garhi', 'dhunga', 'chaur', 'patan', 'shila',
+)
+
+# What a place of each category is called; unknown categories get 'Site'
+CATEGORY_SUFFIXES = {
+    'Trekking': ('Trek', 'Trail', 'Circuit', 'Ridge Walk'),
+    'Religious Site': ('Temple', 'Monastery', 'Stupa', 'Gumba'),
+    'Nature & Wildlife': ('Lake', 'Falls', 'Forest', 'Wetlands'),
+    'Cultural Heritage': ('Durbar Square', 'Old Bazaar', 'Palace'),
+    'Adventure Sports': ('Rafting', 'Paragliding', 'Zipline', 'Canyoning'),
+    'Hill Station': ('Hill', 'Viewpoint', 'Danda'),
+    'Market/Shopping': ('Bazaar', 'Market', 'Haat'),
+}
+
+# Multiplier coprime with the number of places, so consecutive ids get
+# scattered (but still distinct) places
+PLACE_STRIDE = 7919
+
+RATING_DTYPES = {
+    'user_id': np.int32,
+    'attraction_id': np.int32,
+    'rating': np.int8,
+    'timestamp': 'datetime64[s]',
+}
+
+
+def _place_names():
+    return np.array([prefix + suffix for prefix in PLACE_PREFIXES for suffix in PLACE_SUFFIXES], dtype=object)
+
+
+def _synthesize_block(template_df, first_id, size, seed, block_index):
+    """Attractions first_id .. first_id + size - 1, from their block's own seed."""
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(2, block_index)))
+    rows = rng.integers(0, len(template_df), size=size)
+    template = template_df.iloc[rows].reset_index(drop=True)
+    attraction_ids = np.arange(first_id, first_id + size)
+
+    # Name: distinct place for the id, then a word matching the sampled category
+    places = _place_names()
+    place_index = attraction_ids * PLACE_STRIDE % len(places)
+    repeat = attraction_ids // len(places)
+    categories = template['category'].to_numpy()
+    kinds = np.empty(size, dtype=object)
+    for category in pd.unique(categories):
+        mask = categories == category
+        options = np.array(CATEGORY_SUFFIXES.get(category, ('Site',)), dtype=object)
+        kinds[mask] = options[rng.integers(0, len(options), size=int(mask.sum()))]
+    names = pd.Series(places[place_index], dtype=str) + ' ' + pd.Series(kinds, dtype=str)
+    names = names.where(repeat == 0, names + ' ' + pd.Series(repeat + 1).astype(str))
+
+    # Same rating and review distributions as generate_attractions_data
+    rating = np.clip(np.round(rng.beta(8, 2, size=size) * 5, 1), 3.0, 5.0)
+    num_reviews = np.minimum((rng.exponential(400, size=size) + 50).astype(np.int64), 5000)
+
+    # Cost and altitude vary around the template attraction; location is
+    # scattered around it, which keeps it inside the template's region
+    cost = np.maximum(1, np.round(template['avg_cost_usd'].to_numpy() * rng.lognormal(0, 0.2, size=size)))
+    altitude = np.maximum(60, np.round(template['altitude_meters'].to_numpy() * rng.normal(1, 0.1, size=size)))
+    latitude = np.round(template['latitude'].to_numpy() + rng.normal(0, 0.1, size=size), 4)
+    longitude = np.round(template['longitude'].to_numpy() + rng.normal(0, 0.1, size=size), 4)
+
+    # description depends only on difficulty, category and region, so the
+    # template's is already correct
+    generated = {
+        'attraction_id': attraction_ids,
+        'name': names.to_numpy(),
+        'rating': rating,
+        'num_reviews': num_reviews,
+        'avg_cost_usd': cost.astype(np.int64),
+        'altitude_meters': altitude.astype(np.int64),
+        'latitude': latitude,
+        'longitude': longitude,
+    }
+    return pd.DataFrame({
+        column: generated[column] if column in generated else template[column].to_numpy()
+        for column in template_df.columns
+    })
+
+
+def synthesize_attractions(template_df, num_attractions, seed=42, workers=1):
+    """
+    Synthesize a catalog of any size that looks like the template catalog.
+
+    Region, category, difficulty, season and duration are sampled jointly
+    from the template's rows, so their distributions (and combinations)
+    match it. Ratings and review counts use generate_attractions_data's
+    distributions, while cost, altitude and location vary around the
+    sampled template attraction. Names are unique.
+
+    Parameters:
+        template_df: Catalog to imitate (e.g. data/processed/attractions.csv)
+        num_attractions: Size of the synthetic catalog
+        seed: Output is identical for the same seed and template
+        workers: Processes generating blocks in parallel (1: in-process)
+
+    Returns:
+        DataFrame with the template's columns and ids 0 .. num_attractions - 1
+    """
+    blocks = [
+        (template_df, first_id, min(CATALOG_BLOCK_SIZE, num_attractions - first_id), seed, block_index)
+        for block_index, first_id in enumerate(range(0, num_attractions, CATALOG_BLOCK_SIZE))
+    ]
+    if not blocks:
+        return template_df.iloc[:0].copy()
+
+    if workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(_synthesize_block, *zip(*blocks)))
+    else:
+        frames = [_synthesize_block(*block) for block in blocks]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _sample_distinct(rng, counts, population):
+    """
+    For each user, counts[u] distinct positions in [0, population).
+
+    Returns:
+        One int64 array with each user's positions in turn
+    """
+    if len(counts) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if counts.max() * 2 > population:
+        # Dense draws (small catalogs): rank random keys per user and keep the
+        # first counts[u]; memory is users x population, which is small here
+        order = np.argsort(rng.random((len(counts), population), dtype=np.float32), axis=1)
+        return order[np.arange(population) < counts[:, None]]
+
+    # Sparse draws: sample with replacement, then redraw the repeats within
+    # each user until none are left. Few positions collide when counts are
+    # small relative to the catalog, so this settles in a couple of passes.
+    owners = np.repeat(np.arange(len(counts)), counts)
+    picks = rng.integers(0, population, size=len(owners))
+    while True:
+        order = np.lexsort((picks, owners))
+        picks = picks[order]
+        repeats = np.flatnonzero((picks[1:] == picks[:-1]) & (owners[1:] == owners[:-1])) + 1
+        if len(repeats) == 0:
+            return picks
+        picks[repeats] = rng.integers(0, population, size=len(repeats))
+
+
+def plan_user_ratings(num_users, num_attractions, avg_ratings_per_user=14, seed=42):
+    """
+    Number of ratings each user gives, as in generate_user_ratings: normal
+    around the average (sd 5), at least 3 and at most the catalog size.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(0,)))
+    counts = rng.normal(avg_ratings_per_user, 5, size=num_users).astype(np.int64)
+    return np.clip(counts, 3, num_attractions)
+
+
+def iter_user_ratings(attractions_df, num_users, avg_ratings_per_user=14, seed=42,
+                      chunk_users=DEFAULT_CHUNK_USERS, reference_time=None):
+    """
+    Vectorized equivalent of generate_user_ratings, yielded in chunks.
+
+    Each user rates distinct attractions; a rating is the attraction's rating
+    plus normal noise (sd 0.7), clipped to 1-5 and rounded, dated up to a
+    year before reference_time.
+
+    Parameters:
+        attractions_df: Catalog to rate
+        num_users: Number of users
+        avg_ratings_per_user: Mean ratings per user
+        seed: Output is identical for the same seed, chunk_users and reference_time
+        chunk_users: Users per yielded chunk
+        reference_time: datetime the timestamps count back from (default: now)
+
+    Yields:
+        DataFrames with user_id, attraction_id, rating and timestamp columns
+    """
+    attraction_ids = attractions_df['attraction_id'].to_numpy()
+    base_ratings = widen(attractions_df['rating']).to_numpy()
+    reference = np.datetime64(reference_time or datetime.now(), 's')
+
+    counts = plan_user_ratings(num_users, len(attraction_ids), avg_ratings_per_user, seed)
+    for chunk_index, first_user in enumerate(range(0, num_users, chunk_users)):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(1, chunk_index)))
+        chunk_counts = counts[first_user:first_user + chunk_users]
+        positions = _sample_distinct(rng, chunk_counts, len(attraction_ids))
+        total = len(positions)
+
+        ratings = np.rint(np.clip(base_ratings[positions] + rng.normal(0, 0.7, size=total), 1, 5))
+        days_ago = rng.integers(1, 365, size=total).astype('timedelta64[D]')
+
+        yield pd.DataFrame({
+            'user_id': np.repeat(np.arange(first_user, first_user + len(chunk_counts), dtype=np.int32), chunk_counts),
+            'attraction_id': attraction_ids[positions].astype(np.int32),
+            'rating': ratings.astype(np.int8),
+            'timestamp': reference - days_ago,
+        })
+
+
+def write_user_ratings(path, attractions_df, num_users, avg_ratings_per_user=14, seed=42,
+                       output_format='csv', chunk_users=DEFAULT_CHUNK_USERS, reference_time=None):
+    """
+    Generate ratings with iter_user_ratings and write them chunk by chunk.
+
+    Parameters:
+        path: CSV file, or table directory for the 'npy' columnar format
+        output_format: 'csv' or 'npy' (see src.columnar)
+        Other parameters as for iter_user_ratings
+
+    Returns:
+        Number of ratings written
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    counts = plan_user_ratings(num_users, len(attractions_df), avg_ratings_per_user, seed)
+    chunks = iter_user_ratings(attractions_df, num_users, avg_ratings_per_user, seed,
+                               chunk_users, reference_time)
+
+    if output_format == 'npy':
+        write_chunked_table(chunks, path, int(counts.sum()), RATING_DTYPES)
+    else:
+        with open(path + '.tmp', 'w', newline='') as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, header=(i == 0), index=False)
+        os.replace(path + '.tmp', path)
+    return int(counts.sum())
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--catalog', default='data/processed/attractions.csv',
+                        help='Catalog to rate, or to imitate when synthesizing a catalog')
+    common.add_argument('--seed', type=int, default=42)
+    common.add_argument('--format', choices=OUTPUT_FORMATS, default='csv')
+
+    parser = argparse.ArgumentParser(description='Generate load-scale synthetic datasets.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    catalog_parser = commands.add_parser('catalog', parents=[common], help='Synthesize a large attractions catalog')
+    catalog_parser.add_argument('--attractions', type=int, default=1_000_000)
+    catalog_parser.add_argument('--workers', type=int, default=1)
+    catalog_parser.add_argument('--output', default=None,
+                                help='Default: data/synthetic/attractions.csv, or data/synthetic/attractions/ for npy')
+
+    ratings_parser = commands.add_parser('ratings', parents=[common], help='Generate user ratings for a catalog')
+    ratings_parser.add_argument('--users', type=int, default=1_000_000)
+    ratings_parser.add_argument('--avg-ratings', type=int, default=14, help='Mean ratings per user')
+    ratings_parser.add_argument('--chunk-users', type=int, default=DEFAULT_CHUNK_USERS)
+    ratings_parser.add_argument('--as-of', type=datetime.fromisoformat, default=None,
+                                help='Date the rating timestamps count back from (default: now)')
+    ratings_parser.add_argument('--output', default=None,
+                                help='Default: data/synthetic/user_ratings.csv, or data/synthetic/user_ratings/ for npy')
+    args = parser.parse_args()
+
+    name = 'attractions' if args.command == 'catalog' else 'user_ratings'
+    output = args.output or os.path.join('data', 'synthetic', name + '.csv' if args.format == 'csv' else name)
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    template_df = pd.read_csv(args.catalog)
+
+    if args.command == 'catalog':
+        attractions_df = synthesize_attractions(template_df, args.attractions, args.seed, args.workers)
+        if args.format == 'npy':
+            write_table(attractions_df, output, 'npy')
+        else:
+            attractions_df.to_csv(output, index=False)
+        print(f"Wrote {len(attractions_df):,} attractions to {output}")
+    else:
+        written = write_user_ratings(output, template_df, args.users, args.avg_ratings, args.seed,
+                                     args.format, args.chunk_users, args.as_of)
+        print(f"Wrote {written:,} ratings from {args.users:,} users to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Phase timer for reporting where startup time goes
+"""
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """Records wall time per named phase, in the order phases ran."""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def report(self):
+        """Milliseconds per phase and their total."""
+        return {
+            'phases_ms': {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            'total_ms': round(sum(self.phases.values()) * 1000, 1)
+        }
+
+    def summary(self):
+        report = self.report()
+        phases = ', '.join(f"{name} {ms:.0f} ms" for name, ms in report['phases_ms'].items())
+        return f"{report['total_ms']:.0f} ms ({phases})"
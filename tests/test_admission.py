@@ -0,0 +1,71 @@
+"""
+Admission control: token buckets, concurrency shedding and client identity
+"""
+import pytest
+
+from src.admission import (
+    AdmissionController, FileStore, MemoryStore, OVERLOADED, RATE_LIMITED, client_address, parse_costs
+)
+
+
+@pytest.fixture(params=['memory', 'file'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryStore()
+    return FileStore(str(tmp_path / 'admission.bin'), slots=64)
+
+
+def test_bucket_drains_and_refills(store):
+    # 1 token/s, 3 tokens of burst
+    assert [store.take('1.2.3.4', 1, 1.0, 3.0, now=100.0)[0] for _ in range(4)] == [True, True, True, False]
+    assert store.take('5.6.7.8', 1, 1.0, 3.0, now=100.0)[0]
+    assert store.take('1.2.3.4', 1, 1.0, 3.0, now=101.0)[0]
+    assert not store.take('1.2.3.4', 1, 1.0, 3.0, now=101.5)[0]
+    # Refills cap at the burst
+    allowed, tokens = store.take('1.2.3.4', 1, 1.0, 3.0, now=1000.0)
+    assert allowed and tokens == pytest.approx(2.0)
+
+
+def test_controller_sheds_by_cost_and_tells_when_to_retry(store):
+    admission = AdmissionController(store, rate=1.0, burst=10.0, costs={'get_all_attractions': 10})
+
+    assert admission.enter('1.2.3.4', 'get_all_attractions') == (None, 0)
+    status, retry_after = admission.enter('1.2.3.4', 'search_attractions')
+    assert status == RATE_LIMITED and retry_after == 2
+    # Free endpoints are never limited
+    assert admission.enter('1.2.3.4', 'get_metrics') == (None, 0)
+
+
+def test_concurrency_limit_sheds_until_a_request_leaves(store):
+    admission = AdmissionController(store, max_concurrent=2)
+
+    assert admission.enter('a', 'similar')[0] is None
+    assert admission.enter('b', 'similar')[0] is None
+    assert admission.enter('c', 'similar') == (OVERLOADED, 1)
+    admission.leave('similar')
+    assert admission.enter('c', 'similar')[0] is None
+
+
+def test_rate_limited_request_releases_its_concurrency_slot(store):
+    admission = AdmissionController(store, rate=1.0, burst=1.0, max_concurrent=1)
+
+    assert admission.enter('a', 'similar')[0] is None
+    admission.leave('similar')
+    assert admission.enter('a', 'similar')[0] == RATE_LIMITED
+    assert admission.enter('b', 'similar')[0] is None
+
+
+def test_client_address_ignores_client_chosen_identity():
+    headers = {'X-Session-Id': 'rotating', 'X-Forwarded-For': '6.6.6.6, 10.0.0.7'}
+
+    assert client_address('192.0.2.1', headers) == '192.0.2.1'
+    # Only the entry the trusted proxy appended counts
+    assert client_address('192.0.2.1', headers, 'X-Forwarded-For') == '10.0.0.7'
+    assert client_address('192.0.2.1', {}, 'X-Forwarded-For') == '192.0.2.1'
+
+
+def test_parse_costs():
+    assert parse_costs('get_all_attractions=20, search_attractions=1') == {
+        'get_all_attractions': 20.0, 'search_attractions': 1.0
+    }
+    assert parse_costs(None) == {}
@@ -0,0 +1,58 @@
+"""
+Async engines for the ASGI routes open the same databases as the Flask app
+"""
+import asyncio
+
+import pytest
+from flask import Flask
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.database import configure_database, create_async_engines
+from src.models import db, Lead, Analytics
+
+
+@pytest.fixture
+def app(tmp_path):
+    # Relative SQLite paths resolve against the instance folder, not the working directory
+    app = Flask(__name__, instance_path=str(tmp_path / 'instance'))
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI='sqlite:///relative_app.db',
+        ANALYTICS_DATABASE_URI='sqlite:///relative_analytics.db',
+    )
+    configure_database(app, db)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_async_engines_open_the_sync_databases(app):
+    engines = create_async_engines(app.config, db.engines)
+    for bind_key, engine in engines.items():
+        assert engine.url.database == db.engines[bind_key].url.database
+
+    Session = async_sessionmaker(binds={Lead: engines[None], Analytics: engines['analytics']})
+
+    async def write():
+        async with Session() as session:
+            session.add(Lead(name='Asha', email='asha@example.com', lead_type='quote'))
+            session.add(Analytics(session_id='s1', recommendation_type='similar', attraction_id=1))
+            await session.commit()
+        for engine in engines.values():
+            await engine.dispose()
+
+    asyncio.run(write())
+
+    assert [lead.email for lead in db.session.query(Lead)] == ['asha@example.com']
+    assert [event.session_id for event in db.session.query(Analytics)] == ['s1']
+
+
+def test_in_memory_sqlite_is_rejected(tmp_path):
+    app = Flask(__name__, instance_path=str(tmp_path))
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    configure_database(app, db)
+    with app.app_context():
+        with pytest.raises(ValueError, match=':memory:'):
+            create_async_engines(app.config, db.engines)
@@ -0,0 +1,42 @@
+"""
+Autocomplete: word-start matching, popularity order and long prefixes
+"""
+import pandas as pd
+
+from src.search.autocomplete import AutocompleteIndex, MAX_PREFIX_LENGTH
+
+
+def catalog(names, reviews):
+    return pd.DataFrame({
+        'attraction_id': range(1, len(names) + 1),
+        'name': names,
+        'region': ['Annapurna'] * len(names),
+        'rating': [4.5] * len(names),
+        'num_reviews': reviews,
+    })
+
+
+def labels(suggestions):
+    return [suggestion['label'] for suggestion in suggestions]
+
+
+def test_matches_every_word_start_in_popularity_order():
+    index = AutocompleteIndex(catalog(
+        ['Everest Base Camp Trek', 'Annapurna Base Camp', 'Poon Hill'], [100, 300, 200]
+    ))
+
+    assert labels(index.suggest('camp')) == ['Annapurna Base Camp', 'Everest Base Camp Trek']
+    assert labels(index.suggest('  PoOn')) == ['Poon Hill']
+    assert labels(index.suggest('annapurna', limit=1)) == ['Annapurna Base Camp']
+    assert index.suggest('ase') == []
+
+
+def test_long_prefixes_find_suggestions_outside_the_top_k():
+    # Names share more than MAX_PREFIX_LENGTH characters; the least popular come last
+    names = [f"Annapurna Circuit Trail Section {i:02d}" for i in range(1, 16)]
+    index = AutocompleteIndex(catalog(names, list(range(150, 0, -10))), k=5)
+    prefix = 'annapurna circuit trail section 1'
+    assert len(prefix) > MAX_PREFIX_LENGTH
+
+    assert labels(index.suggest(prefix)) == [f"Annapurna Circuit Trail Section {i}" for i in range(10, 15)]
+    assert labels(index.suggest('annapurna circuit trail section 15')) == ['Annapurna Circuit Trail Section 15']
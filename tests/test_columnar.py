@@ -0,0 +1,103 @@
+"""
+Columnar tables: round trip, manifest validation and the CSV staleness check
+"""
+import json
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.catalog import file_digest, read_catalog
+from src.columnar import MANIFEST_FILE, ColumnarError, read_table, write_table
+from src.compact import compact_frame
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'attraction_id': [1, 2, 3],
+        'name': ['Poon Hill', None, 'Phewa Lake'],
+        'category': ['Trekking', 'Lake', 'Lake'],
+        'rating': [4.5, 4.0, 4.7],
+        'latitude': [28.4, 28.2, 28.21],
+    })
+
+
+@pytest.fixture
+def catalog_csv(tmp_path, frame):
+    path = tmp_path / 'attractions.csv'
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def mapped(array):
+    """Whether an array's memory belongs to an mmap."""
+    while getattr(array, 'base', None) is not None:
+        array = array.base
+        if isinstance(array, mmap.mmap):
+            return True
+    return False
+
+
+def test_round_trip_keeps_values_and_dtypes(tmp_path, frame):
+    compact = compact_frame(frame)
+    write_table(compact, tmp_path / 'table', 'npy')
+
+    loaded, manifest = read_table(tmp_path / 'table')
+
+    assert loaded.equals(compact)
+    assert list(loaded.dtypes) == list(compact.dtypes)
+    assert manifest['num_rows'] == 3
+    # Numeric columns stay memory-mapped through compact_frame
+    reloaded = compact_frame(loaded)
+    assert mapped(reloaded['rating'].to_numpy()) and mapped(reloaded['latitude'].to_numpy())
+
+
+def test_damaged_file_fails_verification_only_when_verified(tmp_path, frame):
+    write_table(frame, tmp_path / 'table', 'npy')
+    manifest = json.loads((tmp_path / 'table' / MANIFEST_FILE).read_text())
+    strings_file = tmp_path / 'table' / 'strings.bin'
+    strings_file.write_bytes(strings_file.read_bytes().replace(b'Lake', b'Pond'))
+
+    with pytest.raises(ColumnarError, match='Checksum mismatch'):
+        read_table(tmp_path / 'table')
+    # Boot skips the checksums (see CatalogReloader.load)
+    loaded, _ = read_table(tmp_path / 'table', verify=False)
+    assert len(loaded) == manifest['num_rows']
+
+
+def test_missing_file_and_unknown_version_are_rejected(tmp_path, frame):
+    write_table(frame, tmp_path / 'table', 'npy')
+    manifest_path = tmp_path / 'table' / MANIFEST_FILE
+    manifest = json.loads(manifest_path.read_text())
+
+    os.remove(tmp_path / 'table' / manifest['columns'][0]['file'])
+    with pytest.raises(ColumnarError):
+        read_table(tmp_path / 'table', verify=False)
+
+    manifest['format_version'] = 999
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(ColumnarError, match='version'):
+        read_table(tmp_path / 'table', verify=False)
+
+
+def test_stale_table_falls_back_to_the_csv(tmp_path, frame, catalog_csv):
+    table = str(tmp_path / 'table')
+    write_table(frame, table, 'npy', source_path=catalog_csv)
+
+    df, version, source_format = read_catalog(catalog_csv, table, verify=False)
+    assert source_format == 'columnar'
+    assert version == file_digest(catalog_csv)[:12]
+
+    # Edit the CSV after the table was built
+    edited = frame.assign(rating=[1.0, 2.0, 3.0])
+    edited.to_csv(catalog_csv, index=False)
+    with pytest.raises(ColumnarError, match='stale'):
+        read_table(table, source_sha256=file_digest(catalog_csv))
+
+    df, version, source_format = read_catalog(catalog_csv, table, verify=False)
+    assert source_format == 'csv'
+    assert version == file_digest(catalog_csv)[:12]
+    assert np.allclose(df['rating'], [1.0, 2.0, 3.0])
@@ -0,0 +1,68 @@
+"""
+Two-file SQLite setup: analytics on its own database (ANALYTICS_DATABASE_URI)
+"""
+import sqlite3
+
+import pytest
+from flask import Flask
+
+from src.database import configure_database
+from src.models import db, Lead, Analytics
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'main.db'}",
+        ANALYTICS_DATABASE_URI=f"sqlite:///{tmp_path / 'analytics.db'}",
+        SQLITE_JOURNAL_MODE='WAL',
+        SQLITE_SYNCHRONOUS='FULL',
+        SQLITE_BUSY_TIMEOUT_MS=5000,
+        ANALYTICS_SQLITE_JOURNAL_MODE='TRUNCATE',
+        ANALYTICS_SQLITE_SYNCHRONOUS='OFF',
+        ANALYTICS_SQLITE_BUSY_TIMEOUT_MS=1234,
+    )
+    configure_database(app, db)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def table_rows(path):
+    """Row count of every table in a SQLite file."""
+    connection = sqlite3.connect(path)
+    try:
+        tables = [name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        return {table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+    finally:
+        connection.close()
+
+
+def test_analytics_rows_go_to_their_own_file(app, tmp_path):
+    db.session.add(Lead(name='Asha', email='asha@example.com', lead_type='email'))
+    db.session.add(Analytics(session_id='s1', recommendation_type='similar', attraction_id=1, clicked=True))
+    db.session.commit()
+
+    main_rows = table_rows(tmp_path / 'main.db')
+    analytics_rows = table_rows(tmp_path / 'analytics.db')
+
+    assert main_rows['leads'] == 1
+    assert 'analytics' not in main_rows
+    assert analytics_rows == {'analytics': 1}
+
+
+def test_each_engine_gets_its_own_pragmas(app):
+    def pragmas(engine):
+        with engine.connect() as connection:
+            return tuple(
+                connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in ('journal_mode', 'synchronous', 'busy_timeout')
+            )
+
+    # synchronous: 0 = OFF, 2 = FULL
+    assert pragmas(db.engines[None]) == ('wal', 2, 5000)
+    assert pragmas(db.engines['analytics']) == ('truncate', 0, 1234)
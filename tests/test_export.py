@@ -0,0 +1,60 @@
+"""
+Streaming exports: CSV encoding, formula defusing and chunking
+"""
+import csv
+import io
+import json
+
+import pytest
+
+from src.export import stream_csv, stream_ndjson
+
+COLUMNS = ['id', 'name', 'phone', 'notes', 'lead_metadata']
+
+
+def read_csv(chunks):
+    return list(csv.DictReader(io.StringIO(''.join(chunks))))
+
+
+@pytest.mark.parametrize('value', [
+    '=HYPERLINK("http://example.com","click")', '+977 1 4000000', '-2+3', '@SUM(A1:A2)', '\tcmd', '\r=1+1',
+])
+def test_formula_cells_are_defused(value):
+    rows = read_csv(stream_csv([{'id': 1, 'name': value}], COLUMNS))
+    assert rows[0]['name'] == "'" + value
+
+
+def test_ordinary_values_are_unchanged():
+    record = {'id': -5, 'name': 'Asha = guide', 'phone': '9841000000', 'notes': None,
+              'lead_metadata': {'source': 'web', 'ids': [1, 2]}}
+    rows = read_csv(stream_csv([record], COLUMNS))
+
+    assert rows == [{'id': '-5', 'name': 'Asha = guide', 'phone': '9841000000', 'notes': '',
+                     'lead_metadata': json.dumps({'source': 'web', 'ids': [1, 2]})}]
+
+
+def test_nested_values_are_defused_after_flattening():
+    rows = read_csv(stream_csv([{'id': 1, 'lead_metadata': ['=1+1']}], COLUMNS))
+    assert rows[0]['lead_metadata'] == '["=1+1"]'
+
+    rows = read_csv(stream_csv([{'id': 1, 'notes': '-1'}], COLUMNS))
+    assert rows[0]['notes'] == "'-1"
+
+
+def test_chunked_output_matches_a_single_chunk():
+    records = [{'id': i, 'name': f"Lead {i}", 'phone': '=cmd' if i % 7 == 0 else ''} for i in range(500)]
+
+    chunked = list(stream_csv(records, COLUMNS, chunk_chars=256))
+    whole = list(stream_csv(records, COLUMNS, chunk_chars=10 ** 9))
+
+    assert len(chunked) > 1 and len(whole) == 1
+    assert ''.join(chunked) == whole[0]
+    assert len(read_csv(chunked)) == 500
+
+
+def test_ndjson_round_trips_records():
+    records = [{'id': i, 'created_at': None, 'lead_metadata': {'n': i}} for i in range(100)]
+    chunks = list(stream_ndjson(records, chunk_chars=200))
+
+    assert len(chunks) > 1
+    assert [json.loads(line) for line in ''.join(chunks).splitlines()] == records
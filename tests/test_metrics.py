@@ -0,0 +1,36 @@
+"""
+Cache hit/miss counters fed by observe_cache
+"""
+import threading
+
+from src.observability.metrics import MetricsRegistry, observe_cache
+
+
+class FakeCache:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+
+def test_concurrent_observers_count_each_hit_once():
+    registry = MetricsRegistry()
+    counter = registry.counter('cache_requests_total', 'Cache lookups', ['cache', 'result'])
+    cache = FakeCache()
+    done = threading.Event()
+
+    def observe():
+        while not done.is_set():
+            observe_cache(counter, 'similar', cache)
+
+    # Stands in for the flusher thread and /metrics requests collecting at once
+    observers = [threading.Thread(target=observe) for _ in range(4)]
+    for thread in observers:
+        thread.start()
+    for _ in range(100_000):
+        cache.hits += 1
+    done.set()
+    for thread in observers:
+        thread.join()
+    observe_cache(counter, 'similar', cache)
+
+    assert counter.samples() == [[['similar', 'hit'], 100_000]]
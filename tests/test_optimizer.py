@@ -0,0 +1,65 @@
+"""
+Itinerary optimizer: days and budget bounds, and optimality of the knapsack
+"""
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.compact import compact_frame
+from src.itinerary.builder import ItineraryBuilder
+from src.itinerary.optimizer import ItineraryOptimizer, MAX_DAYS, validate_limits
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'processed', 'attractions.csv')
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    attractions_df = compact_frame(pd.read_csv(CATALOG_PATH))
+    builder = ItineraryBuilder(attractions_df)
+    return attractions_df, builder, ItineraryOptimizer(builder, attractions_df)
+
+
+@pytest.mark.parametrize('days, max_budget', [(1, 0), (3, 150), (7, 900), (30, 5000), (MAX_DAYS, 1_000_000)])
+def test_solution_stays_within_days_and_budget(catalog, days, max_budget):
+    _, builder, optimizer = catalog
+    positions, details = optimizer.optimize(days, max_budget)
+
+    assert builder.stop_days(positions).sum() <= days
+    assert builder.stop_costs(positions).sum() <= max_budget
+    assert details['days_used'] == builder.stop_days(positions).sum()
+    assert details['cost'] == builder.stop_costs(positions).sum()
+
+
+def test_solution_is_optimal_on_a_small_candidate_set(catalog):
+    attractions_df, builder, optimizer = catalog
+    attraction_ids = attractions_df['attraction_id'].tolist()[:10]
+    days, max_budget = 4, 400
+
+    positions, details = optimizer.optimize(days, max_budget, attraction_ids=attraction_ids)
+
+    candidates = builder.select(attraction_ids)
+    ratings = attractions_df['rating'].to_numpy(dtype=np.float64)
+    best = 0.0
+    for size in range(len(candidates) + 1):
+        for subset in itertools.combinations(candidates, size):
+            subset = np.array(subset, dtype=np.int64)
+            if builder.stop_days(subset).sum() <= days and builder.stop_costs(subset).sum() <= max_budget:
+                best = max(best, ratings[subset].sum())
+    assert details['objective_value'] == pytest.approx(best)
+
+
+@pytest.mark.parametrize('days, max_budget', [
+    ('x', 500), (None, 500), (0, 500), (MAX_DAYS + 1, 500), (float('inf'), 500), (float('nan'), 500),
+    (3, 'x'), (3, None), (3, -1), (3, float('inf')), (3, 1e999), (3, float('nan')),
+])
+def test_invalid_limits_are_rejected(catalog, days, max_budget):
+    _, _, optimizer = catalog
+    with pytest.raises(ValueError):
+        optimizer.optimize(days, max_budget)
+
+
+def test_numeric_strings_are_converted():
+    assert validate_limits('3', '800.5') == (3, 800.5)
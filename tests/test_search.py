@@ -0,0 +1,63 @@
+"""
+Full-text search: BM25 ranking and typo correction
+"""
+import pandas as pd
+import pytest
+
+from src.search.fuzzy import FuzzyMatcher, bounded_edit_distance
+from src.search.inverted_index import InvertedIndex, tokenize
+
+
+@pytest.fixture(scope='module')
+def index():
+    attractions_df = pd.DataFrame({
+        'name': ['Phewa Lake', 'Poon Hill Trek', 'Everest Base Camp Trek', 'Pashupatinath Temple'],
+        'category': ['Lake', 'Trekking', 'Trekking', 'Cultural'],
+        'region': ['Pokhara', 'Annapurna', 'Everest', 'Kathmandu'],
+        'description': [
+            'Boating on a calm lake below the Annapurna range',
+            'Short trek to a sunrise viewpoint over the lakes',
+            'Classic high-altitude trek to the foot of Everest',
+            'Hindu temple on the banks of the Bagmati',
+        ],
+    })
+    return InvertedIndex(attractions_df)
+
+
+def test_tokenize_drops_stop_words_and_folds_plurals():
+    assert tokenize('Treks to the Lakes, and Thorong Pass') == ['trek', 'lake', 'thorong', 'pass']
+    assert tokenize(None) == []
+
+
+def test_name_matches_outrank_description_matches(index):
+    positions, scores = index.search('lake')
+    # Phewa Lake has "lake" in its name, Poon Hill only in its description
+    assert positions.tolist() == [0, 1]
+    assert scores[0] > scores[1] > 0
+
+
+def test_more_matching_terms_rank_higher(index):
+    positions, _ = index.search('everest trek')
+    assert positions[0] == 2
+    assert set(positions.tolist()) == {1, 2}
+
+
+def test_limit_and_unknown_terms(index):
+    assert len(index.search('trek', limit=1)[0]) == 1
+    positions, scores = index.search('zzz')
+    assert len(positions) == 0 and len(scores) == 0
+
+
+def test_bounded_edit_distance():
+    assert bounded_edit_distance('everest', 'everst', 2) == 1
+    assert bounded_edit_distance('kathmandu', 'katmandu', 1) == 1
+    assert bounded_edit_distance('lake', 'temple', 2) is None
+
+
+def test_typos_are_corrected_to_indexed_terms(index):
+    matcher = FuzzyMatcher(index.terms())
+
+    terms, corrections = matcher.correct(['everst', 'pashupatinat', 'trek', 'xyzzy'])
+    assert corrections == {'everst': ['everest'], 'pashupatinat': ['pashupatinath']}
+    assert terms == ['everest', 'pashupatinath', 'trek']
+    assert {2, 3} <= set(index.search('', terms=terms)[0].tolist())
@@ -0,0 +1,47 @@
+"""
+Nearby search: KD-tree results against brute-force haversine distances
+"""
+import numpy as np
+import pytest
+
+from src.search.spatial import EARTH_RADIUS_KM, SpatialIndex
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    lat1, lon1, lat2, lon2 = map(np.radians, (latitude, longitude, latitudes, longitudes))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture(scope='module')
+def points():
+    rng = np.random.default_rng(0)
+    # Around Nepal, plus a few points across the antimeridian and near a pole
+    latitudes = np.concatenate([rng.uniform(26, 31, 300), [0, 0, 89.9]])
+    longitudes = np.concatenate([rng.uniform(80, 89, 300), [179.9, -179.9, 10]])
+    return latitudes, longitudes, SpatialIndex(latitudes, longitudes)
+
+
+@pytest.mark.parametrize('latitude, longitude', [(27.7, 85.3), (28.2, 83.98), (0, 179.95), (89.95, -170)])
+def test_nearest_matches_brute_force(points, latitude, longitude):
+    latitudes, longitudes, index = points
+    positions, distances = index.nearest(latitude, longitude, k=5)
+
+    expected = haversine_km(latitude, longitude, latitudes, longitudes)
+    assert np.allclose(distances, np.sort(expected)[:5], atol=1e-6)
+    assert np.allclose(expected[positions], distances, atol=1e-6)
+
+
+def test_radius_and_exclusions(points):
+    latitudes, longitudes, index = points
+    expected = haversine_km(27.7, 85.3, latitudes, longitudes)
+    inside = set(np.flatnonzero(expected <= 50).tolist())
+    excluded = sorted(inside)[:2]
+
+    positions, distances = index.within(27.7, 85.3, 50, exclude=excluded)
+    assert set(positions.tolist()) == inside - set(excluded)
+    assert np.all(np.diff(distances) >= 0)
+
+    positions, distances = index.nearest(27.7, 85.3, k=1000, radius_km=50, exclude=excluded)
+    assert set(positions.tolist()) == inside - set(excluded)
+    assert np.all(distances <= 50 + 1e-9)